@@ -0,0 +1,114 @@
+"""
+Benchmark: commands served by the background daemon against cold processes.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_daemon [--logs 2000] [--runs 5]
+
+Works in a temporary folder on a Unix socket, so nothing leaves the
+machine. Imports mission logs and journals through the command line,
+then times a few commands as fresh processes without a daemon, through
+the daemon's thin client, and as bare socket requests (the cost once
+Python is up). Exits with status 1 when a warm lookup takes longer than
+the budget; full listings grow with their output and are only reported.
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+from modules import daemon
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, 'main.py')
+# Median milliseconds a warm request may take over the socket
+REQUEST_BUDGET_MS = 10
+PASSWORD = 'bench-password'
+JOURNALS = 200
+# (command, held to the budget)
+COMMANDS = (
+    (["mission", "search", "ridge 42"], True),
+    (["journal", "tagged", "survey"], True),
+    (["journal", "list", "--from", "2024-01-01", "--to", "2024-01-01"], True),
+    (["mission", "list"], False),
+)
+
+
+def _run(workdir, argv, stdin=None):
+    return subprocess.run([sys.executable, MAIN] + argv, cwd=workdir, input=stdin,
+                          capture_output=True, check=True).stdout
+
+
+def _median_ms(function, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--logs', type=int, default=2000, help="mission logs to import")
+    parser.add_argument('--runs', type=int, default=5, help="timed runs per command")
+    args = parser.parse_args()
+    os.environ['ALLCLI_PASSWORD'] = PASSWORD
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.symlink(os.path.join(ROOT, 'templates'), os.path.join(workdir, 'templates'))
+        records = ''.join(
+            json.dumps({'mission_name': f"Op {n}", 'objective': f"survey ridge {n}", 'tasks': ["scout", "report"]}) + '\n'
+            for n in range(args.logs)
+        ).encode()
+        start = time.perf_counter()
+        _run(workdir, ["mission", "write", "--from-json", "-"], records)
+        print(f"{'import ' + str(args.logs) + ' logs (no daemon)':<58} {(time.perf_counter() - start) * 1000:6.0f} ms")
+        journals = ''.join(
+            json.dumps({'body': f"Day {n} at the ridge #survey", 'created': f"2024-01-01T00:{n // 60:02}:{n % 60:02}"}) + '\n'
+            for n in range(JOURNALS)
+        ).encode()
+        _run(workdir, ["journal", "new", "--jsonl"], journals)
+
+        cold = {}
+        for argv, _ in COMMANDS:
+            cold[' '.join(argv)] = _median_ms(lambda: _run(workdir, argv), args.runs)
+
+        _run(workdir, ["daemon", "start"])
+        socket_path = os.path.join(workdir, daemon.SOCKET_PATH)
+        failures = []
+        try:
+            for argv, budgeted in COMMANDS:
+                label = ' '.join(argv)
+                # The first request decrypts the catalogs; time the ones after it
+                _run(workdir, argv)
+                client = _median_ms(lambda: _run(workdir, argv), args.runs)
+
+                def request():
+                    output = io.BytesIO()
+                    status = daemon.forward(argv, stdin=io.BytesIO(), stdout=output, stderr=io.BytesIO(),
+                                            path=socket_path)
+                    assert status == 0 and output.getvalue(), f"'{label}' failed with status {status}"
+
+                bare = _median_ms(request, args.runs)
+                print(f"{label:<58} cold {cold[label]:6.0f} ms   client {client:5.0f} ms   socket {bare:5.1f} ms")
+                if budgeted and bare > REQUEST_BUDGET_MS:
+                    failures.append(f"'{label}' took {bare:.1f} ms over the socket, budget {REQUEST_BUDGET_MS} ms")
+            start = time.perf_counter()
+            subprocess.run([sys.executable, '-c', 'pass'], check=True)
+            print(f"{'(python interpreter start-up)':<58} {(time.perf_counter() - start) * 1000:6.0f} ms")
+        finally:
+            _run(workdir, ["daemon", "stop"])
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
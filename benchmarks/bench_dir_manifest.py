@@ -0,0 +1,66 @@
+"""
+Benchmark: picker listings from the cached directory manifest.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_dir_manifest [--files 50000]
+
+Writes journal-like files, then compares the old listdir + isfile + sort
+listing with the manifest: the first build, a refresh with nothing changed,
+a cold start from the cache file, and a refresh after one file was added.
+"""
+import os
+import time
+import argparse
+import tempfile
+
+from modules.dir_manifest import DirectoryManifest, first_line_title
+
+
+def _timed(label, function, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:<36} {elapsed * 1000:10.3f} ms  -> {len(result) if isinstance(result, list) else result}")
+
+
+def _listdir(directory):
+    return sorted(
+        (f for f in os.listdir(directory) if os.path.isfile(os.path.join(directory, f))),
+        reverse=True
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--files', type=int, default=50000, help="number of journal files")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        directory = os.path.join(root, 'journals')
+        os.makedirs(directory)
+        print(f"Writing {args.files} files...")
+        for index in range(args.files):
+            day, second = divmod(index, 86400)
+            name = f"journal_{2000 + day // 365:04}-01-01_{second // 3600:02}-{second // 60 % 60:02}-{second % 60:02}.txt"
+            with open(os.path.join(directory, name), 'w') as file:
+                file.write(f"Entry {index}\n\nbody\n")
+        # Old enough to be trusted, as it would be for a real journal folder
+        old = time.time_ns() - 10 * 10**9
+        os.utime(directory, ns=(old, old))
+
+        _timed("listdir + isfile + sort", lambda: _listdir(directory))
+        manifest = DirectoryManifest(directory, first_line_title)
+        _timed("manifest: first build", manifest.listing)
+        _timed("manifest: nothing changed", manifest.listing, 100)
+        _timed("manifest: cold start from cache", lambda: DirectoryManifest(directory, first_line_title).listing())
+
+        with open(os.path.join(directory, 'journal_2999-01-01_00-00-00.txt'), 'w') as file:
+            file.write("Newest\n")
+        os.utime(directory, ns=(old + 1, old + 1))
+        _timed("manifest: refresh after one new file", manifest.listing)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: the SQLite journal store on tens of thousands of entries.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_journal_store [--entries 30000]
+
+Imports loose .txt journals (the migration), then times ranked full-text
+search with snippets, prefix search, date-range listing, and search
+restricted to a date range.
+"""
+import os
+import random
+import time
+import itertools
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+from modules.custom_modules.journal.journal_store import JournalStore
+
+# Zipf-distributed vocabulary: word0 is in nearly every entry, word3000 in a few hundred
+VOCABULARY = [f"word{rank}" for rank in range(5000)]
+CUMULATIVE = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(VOCABULARY))))
+
+
+def _timed(label, function, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:<40} {elapsed * 1000:9.3f} ms  -> {len(result) if isinstance(result, list) else result}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--entries', type=int, default=30000, help="number of journal entries")
+    args = parser.parse_args()
+
+    random.seed(1)
+    first_day = datetime(2020, 1, 1)
+    with tempfile.TemporaryDirectory() as directory:
+        journals = os.path.join(directory, 'journals')
+        os.makedirs(journals)
+        print(f"Writing {args.entries} journal files...")
+        for index in range(args.entries):
+            day = first_day + timedelta(hours=index * 3)
+            words = random.choices(VOCABULARY, cum_weights=CUMULATIVE, k=150)
+            body = ' '.join(words) + f" marker{index}"
+            with open(os.path.join(journals, f"journal_{day:%Y-%m-%d_%H-%M-%S}.txt"), 'w') as file:
+                file.write(body)
+
+        store = JournalStore(os.path.join(directory, 'journals.db'))
+        _timed("import .txt files (migration)", lambda: store.import_directory(journals), 1)
+        _timed("search: word0 (in every entry)", lambda: store.search('word0'))
+        _timed("search: word50", lambda: store.search('word50'))
+        _timed("search: word3000", lambda: store.search('word3000'))
+        _timed("search: word5 word50 (AND)", lambda: store.search('word5 word50'))
+        _timed("search: unique marker12345", lambda: store.search('marker12345'))
+        _timed("prefix search: word30*", lambda: store.search('word30*'))
+        _timed("date range: one month", lambda: store.entries('2021-03-01', '2021-04-01'))
+        _timed("search in date range", lambda: store.search('word50', '2021-03-01', '2021-04-01'))
+        _timed("list newest 100", lambda: store.entries(limit=100))
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
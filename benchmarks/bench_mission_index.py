@@ -0,0 +1,79 @@
+"""
+Benchmark: mission log queries through the encrypted search index and listing
+through the encrypted manifest.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_mission_index [--logs 3000]
+
+Builds the index over freshly written logs, then times keyword, prefix and
+multi-word queries, a sync with nothing changed, the incremental update made
+after a save, and reloading the index from disk. Then lists and sorts the
+logs from a freshly decrypted manifest.
+"""
+import os
+import time
+import getpass
+import argparse
+import tempfile
+
+from modules import encryption
+from modules.encryption import encrypt_data_to_file, keyring
+from modules.custom_modules.mission.search_index import MissionIndex
+from modules.custom_modules.mission.manifest import MissionManifest
+from modules.custom_modules.mission.catalog import sync_catalogs
+
+PASSWORD = 'benchmark-password'
+WORDS = ("survey ridge river camp supply radio signal bridge convoy north south "
+         "east west storm patrol relay beacon cache scout harbor").split()
+
+
+def _log_text(index):
+    words = [WORDS[(index * 7 + n * 3) % len(WORDS)] for n in range(8)]
+    return f"Mission Name: Operation {index}\nObjective: {' '.join(words)}\nOutcome: code{index:05}\n"
+
+
+def _timed(label, function, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:<36} {elapsed * 1000:10.3f} ms  -> {len(result) if isinstance(result, list) else result}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--logs', type=int, default=3000, help="number of mission logs")
+    args = parser.parse_args()
+
+    encryption.getpass.getpass = getpass.getpass = lambda prompt='': PASSWORD
+
+    with tempfile.TemporaryDirectory() as root:
+        directory = os.path.join(root, 'mission_logs')
+        os.makedirs(directory)
+        print(f"Writing {args.logs} logs...")
+        for index in range(args.logs):
+            encrypt_data_to_file(os.path.join(directory, f'mission_log_{index:05}.txt'), _log_text(index).encode())
+
+        index = MissionIndex(directory + '.index', directory)
+        _timed("build index (sync from scratch)", index.sync)
+        _timed("sync, nothing changed", index.sync, 10)
+        _timed("keyword: radio", lambda: index.search('radio'), 1000)
+        _timed("prefix: sig*", lambda: index.search('sig*'), 1000)
+        _timed("two words: storm bridge", lambda: index.search('storm bridge'), 1000)
+        _timed("unique: code01234", lambda: index.search('code01234'), 1000)
+        _timed("update after saving one log", lambda: index.update('mission_log_00000.txt', {}, _log_text(1)) or 1, 10)
+        index.forget()
+        keyring.lock()
+        _timed("reload index from disk", lambda: index.load() or len(index.files))
+
+        manifest = MissionManifest(directory + '.manifest', directory)
+        sync_catalogs(index, manifest)
+        manifest.forget()
+        keyring.lock()
+        _timed("decrypt manifest, list by name", lambda: manifest.load() or manifest.listing('name'))
+        _timed("list newest first (in memory)", manifest.listing, 10)
+
+
+if __name__ == '__main__':
+    main()
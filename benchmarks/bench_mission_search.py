@@ -0,0 +1,103 @@
+"""
+Benchmark: keyword search over encrypted mission logs, before and after the session keyring.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_mission_search [--logs 1000]
+
+"before" replays the old search loop: one password prompt, one PBKDF2 run and
+one plaintext rewrite per log. "after" uses `read_encrypted` with the keyring,
+for logs that each have their own salt (written before the keyring existed)
+and for logs written this session, which share the session salt.
+"""
+import os
+import time
+import getpass
+import argparse
+import tempfile
+from cryptography.fernet import Fernet
+
+from modules import encryption
+from modules.encryption import SALT_SIZE, derive_key_from_password, read_encrypted, keyring
+
+PASSWORD = 'benchmark-password'
+LOG_TEXT = "Mission Name: Survey\nObjective: Map the ridge\nOutcome: {outcome}\n" * 20
+
+
+def _old_search(directory, keyword):
+    """The search loop as it was: decrypt_file on every log, then read it back."""
+    matches = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        password = getpass.getpass(prompt="Enter decryption password: ")
+        with open(path, 'rb') as file:
+            salt = file.read(SALT_SIZE)
+            encrypted_data = file.read()
+        data = Fernet(derive_key_from_password(password, salt)).decrypt(encrypted_data)
+        with open(path, 'wb') as file:
+            file.write(data)
+        if keyword in data.decode().lower():
+            matches.append(name)
+        # Put the log back the way it was for the next run
+        with open(path, 'wb') as file:
+            file.write(salt + encrypted_data)
+    return matches
+
+
+def _new_search(directory, keyword):
+    matches = []
+    for name in sorted(os.listdir(directory)):
+        data, _, _ = read_encrypted(os.path.join(directory, name))
+        if keyword in data.decode().lower():
+            matches.append(name)
+    return matches
+
+
+def _make_logs(directory, count, shared_salt):
+    """Write `count` logs, each with its own salt unless `shared_salt` is set."""
+    key, salt = None, None
+    for index in range(count):
+        if key is None or not shared_salt:
+            salt = os.urandom(SALT_SIZE)
+            key = derive_key_from_password(PASSWORD, salt)
+        data = LOG_TEXT.format(outcome='found it' if index % 10 == 0 else 'nothing').encode()
+        with open(os.path.join(directory, f'mission_log_{index:05}.txt'), 'wb') as file:
+            file.write(salt + Fernet(key).encrypt(data))
+
+
+def _timed(label, search, directory, prompts):
+    prompts.clear()
+    start = time.perf_counter()
+    matches = search(directory, 'found it')
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed:8.2f} s  {len(prompts):5} prompts  {len(matches)} matches")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--logs', type=int, default=1000, help="number of mission logs")
+    args = parser.parse_args()
+
+    # Answer password prompts automatically and count them
+    prompts = []
+    def fake_getpass(prompt=''):
+        prompts.append(prompt)
+        return PASSWORD
+    getpass.getpass = fake_getpass
+    encryption.getpass.getpass = fake_getpass
+
+    with tempfile.TemporaryDirectory() as legacy, tempfile.TemporaryDirectory() as session:
+        print(f"Writing {args.logs} logs per set...")
+        _make_logs(legacy, args.logs, shared_salt=False)
+        _make_logs(session, args.logs, shared_salt=True)
+
+        _timed("before (decrypt_file per log)", _old_search, legacy, prompts)
+        keyring.lock()
+        _timed("after, per-log salts, first search", _new_search, legacy, prompts)
+        _timed("after, per-log salts, repeated search", _new_search, legacy, prompts)
+        keyring.lock()
+        _timed("after, session salt, first search", _new_search, session, prompts)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark: the type-to-filter picker over a large list.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_picker [--candidates 100000]
+
+Builds journal-like labels, then times each keystroke of a query typed
+one character at a time, backspacing, a fresh query, and rendering the
+visible page.
+"""
+import time
+import argparse
+
+from modules.picker import FuzzyIndex, Picker
+from prompt_toolkit.input import create_pipe_input
+from prompt_toolkit.output import DummyOutput
+
+WORDS = ("survey ridge river camp supply radio signal bridge convoy north south "
+         "east west storm patrol relay beacon cache scout harbor").split()
+
+
+def _label(index):
+    words = [WORDS[(index * 7 + n * 3) % len(WORDS)] for n in range(4)]
+    return f"journal_{2000 + index // 8760}-{index % 12 + 1:02}-{index % 28 + 1:02} ({index:06}) - {' '.join(words)}"
+
+
+def _timed(label, function, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:<36} {elapsed * 1000:10.3f} ms  -> {len(result) if isinstance(result, list) else result}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--candidates', type=int, default=100000, help="number of list entries")
+    args = parser.parse_args()
+
+    labels = [_label(index) for index in range(args.candidates)]
+    start = time.perf_counter()
+    index = FuzzyIndex(labels)
+    print(f"{'build index':<36} {(time.perf_counter() - start) * 1000:10.3f} ms")
+    query = ''
+    for char in 'rdgcmp':
+        query += char
+        _timed(f"type '{query}'", lambda: index.filter(query))
+    _timed("backspace to 'rdg'", lambda: index.filter('rdg'))
+    _timed("new query '0421'", lambda: index.filter('0421'))
+    _timed("clear query", lambda: index.filter(''))
+
+    with create_pipe_input() as pipe:
+        picker = Picker("Pick:", labels, input=pipe, output=DummyOutput())
+        _timed("render visible page", picker._rows, 100)
+
+
+if __name__ == '__main__':
+    main()
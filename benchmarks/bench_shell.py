@@ -0,0 +1,83 @@
+"""
+Benchmark: menu navigation in the persistent shell.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_shell [--cycles 2000]
+
+Drives the real menu tree through a pipe: opening and leaving submenus
+inside the running application, then running a menu action (the
+application exits and starts again) many times, with the traced memory
+before and after. For comparison it also times what every menu used to
+do: a `clear` subprocess plus a freshly built questionary.select.
+"""
+import os
+import time
+import argparse
+import tracemalloc
+
+import questionary
+from prompt_toolkit.input import create_pipe_input
+from prompt_toolkit.output import DummyOutput
+
+from modules.menu import MENUS
+from modules.shell import Shell, Menu, EXIT
+
+
+def _report(label, seconds, count):
+    print(f"{label:<40} {seconds / count * 1000:10.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--cycles', type=int, default=2000, help="navigation and action round trips")
+    args = parser.parse_args()
+
+    # Personal > Journals > back > back, all inside one running application
+    with create_pipe_input() as pipe:
+        shell = Shell(MENUS, input=pipe, output=DummyOutput())
+        pipe.send_text('11\x1b\x1b' * args.cycles + 'q')
+        start = time.perf_counter()
+        shell.run()
+        _report("switch menu (in the running shell)", time.perf_counter() - start, args.cycles * 4)
+
+    # An action per round trip: the application exits, the action runs, the application restarts
+    with create_pipe_input() as pipe:
+        done = 0
+        samples = {}
+
+        def action():
+            nonlocal done
+            done += 1
+            if done in (100, args.cycles):
+                samples[done] = (time.perf_counter(), tracemalloc.get_traced_memory()[0])
+            pipe.send_text('1' if done < args.cycles else 'q')
+
+        shell = Shell({'main': Menu("Main", [("1: Action", action), ("2: Exit", EXIT)])},
+                      input=pipe, output=DummyOutput())
+        tracemalloc.start()
+        pipe.send_text('1')
+        shell.run()
+        tracemalloc.stop()
+        (start, before), (end, after) = samples[100], samples[args.cycles]
+        _report("run an action and return to the menu", end - start, args.cycles - 100)
+        print(f"{'traced memory growth over the session':<40} {(after - before) / 1024:10.1f} KiB "
+              f"({args.cycles - 100} round trips)")
+
+    # What each menu cost before: `clear` in a subprocess and a new questionary prompt
+    runs = 50
+    start = time.perf_counter()
+    for _ in range(runs):
+        os.system('clear >/dev/null 2>&1')
+    _report("previous: clear subprocess", time.perf_counter() - start, runs)
+    with create_pipe_input() as pipe:
+        start = time.perf_counter()
+        for _ in range(runs):
+            pipe.send_text('\r')
+            questionary.select("Choose an action:", choices=["1: Personal", "2: Work"],
+                               input=pipe, output=DummyOutput()).ask()
+        _report("previous: new questionary.select", time.perf_counter() - start, runs)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark: start-up cost of the app, checked against a budget.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_startup [--runs 5] [--budget 900]
+
+Imports the main menu under `-X importtime` and lists the slowest imports,
+then launches main.py on a pseudo-terminal and times how long it takes for
+the first menu to be drawn. Exits with status 1 when the median time to
+first menu is over budget, or when a module that should load on first use
+is imported at start-up.
+"""
+import os
+import re
+import pty
+import sys
+import time
+import select
+import argparse
+import tempfile
+import subprocess
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, 'main.py')
+# Median milliseconds from launching main.py to the main menu on screen
+STARTUP_BUDGET_MS = 900
+# Must not be imported before the main menu is shown
+LAZY_MODULES = (
+    'jinja2',
+    'cryptography',
+    'sqlite3',
+    'modules.editor_engine',
+    'modules.custom_modules.journal',
+    'modules.custom_modules.mission',
+    'modules.settings_modules.editor_settings',
+)
+# The main menu's first item, drawn once the menu is on screen
+MENU_PROMPT = b'1: Personal'
+IMPORT_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def import_times():
+    """Return [(cumulative_us, depth, module)] for importing the main menu."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import modules.menu'],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            times.append((int(match.group(2)), len(match.group(3)) // 2, match.group(4)))
+    return times
+
+
+def time_to_first_menu(workdir, timeout=30):
+    """Launch main.py on a pseudo-terminal; seconds until the main menu appears."""
+    master, slave = pty.openpty()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, MAIN], cwd=workdir, stdin=slave, stdout=slave, stderr=slave,
+        env=dict(os.environ, TERM=os.environ.get('TERM', 'xterm')), close_fds=True
+    )
+    os.close(slave)
+    output = b''
+    try:
+        while MENU_PROMPT not in output:
+            remaining = start + timeout - time.perf_counter()
+            if remaining <= 0 or process.poll() is not None:
+                raise RuntimeError(f"main menu never appeared; output: {output[-500:]!r}")
+            ready, _, _ = select.select([master], [], [], remaining)
+            if ready:
+                try:
+                    output += os.read(master, 65536)
+                except OSError:
+                    pass  # EIO once the child is gone; the poll above reports it
+        return time.perf_counter() - start
+    finally:
+        process.kill()
+        process.wait()
+        os.close(master)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=5, help="launches to take the median of")
+    parser.add_argument('--budget', type=float, default=STARTUP_BUDGET_MS, help="milliseconds allowed to first menu")
+    args = parser.parse_args()
+    failures = []
+
+    times = import_times()
+    total = next(cumulative for cumulative, depth, name in times if name == 'modules.menu')
+    print(f"import modules.menu: {total / 1000:.1f} ms; slowest top-level imports:")
+    for cumulative, depth, name in sorted((t for t in times if t[1] <= 1), reverse=True)[1:9]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+    eager = [
+        lazy for lazy in LAZY_MODULES
+        if any(name == lazy or name.startswith(lazy + '.') for _, _, name in times)
+    ]
+    if eager:
+        failures.append(f"imported before the main menu: {', '.join(eager)}")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # The first launch also creates the app folders; time the ones after it
+        time_to_first_menu(workdir)
+        samples = [time_to_first_menu(workdir) * 1000 for _ in range(args.runs)]
+    median = statistics.median(samples)
+    print(f"time to first menu: median {median:.0f} ms over {args.runs} runs "
+          f"(min {min(samples):.0f}, max {max(samples):.0f}), budget {args.budget:.0f} ms")
+    if median > args.budget:
+        failures.append(f"time to first menu {median:.0f} ms is over the {args.budget:.0f} ms budget")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
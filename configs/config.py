@@ -6,4 +6,31 @@ JOURNAL_DIRECTORY = 'statics/files/journals'
 MISSION_DIR = "statics/files/mission_logs"
 
 # Template path
+TEMPLATE_DIRECTORY = "templates"
 MISSION_LOG_TEMPLATE_PATH = "templates/mission_jinja/mission_log_template.jinja"
+TEMPLATE_BYTECODE_CACHE_DIRECTORY = "statics/cache/templates"  # Compiled templates persisted across runs (None to disable)
+
+# Editor settings
+EDITOR_UNDO_LIMIT_BYTES = 8 * 1024 * 1024  # Memory cap for the undo/redo history
+EDITOR_MMAP_THRESHOLD_BYTES = 32 * 1024 * 1024  # Larger files are memory-mapped and indexed lazily
+EDITOR_SWAP_INTERVAL = 2.0  # Seconds between swap-file checkpoints of unsaved edits
+
+# Encryption settings
+KEYRING_TTL = 5 * 60  # Seconds an unlocked mission-log password stays cached while unused
+ENCRYPTION_CHUNK_SIZE = 64 * 1024  # Plaintext bytes per independently authenticated chunk
+BULK_WORKERS = None  # Processes for bulk encrypt/export/re-key (None: one per CPU)
+PASSWORD_ENV = 'ALLCLI_PASSWORD'  # Environment variable the command line takes the mission log password from (unset: ask)
+
+# Journal settings
+JOURNAL_STORE = 'files'  # 'files' keeps loose .txt files; 'sqlite' uses the full-text searchable database
+JOURNAL_DB_PATH = 'statics/files/journals.db'
+JOURNAL_RANK_WINDOW = 5000  # Searches matching more entries rank only the newest this-many
+JOURNAL_TAG_INDEX_PATH = 'statics/files/journal_tags.json'  # #tag index over the journal files
+
+# UI settings
+PICKER_PAGE_SIZE = 15  # Rows shown at once by the type-to-filter pickers
+
+# Daemon settings
+DAEMON_SOCKET_PATH = 'statics/allcli.sock'  # Unix socket of the background daemon; commands use it when it is running
+DAEMON_LOCK_AFTER = 5 * 60  # Seconds without requests after which the daemon forgets the password and decrypted catalogs
+DAEMON_CLIENT_TIMEOUT = 60  # Seconds the daemon waits on a silent client (stdin, a password, reading output) before dropping it
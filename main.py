@@ -1,5 +1,4 @@
-from modules.menu import main_menu
-from modules.folder_init import initialize_folders, setup_logging
+import sys
 
 ''' TODO: Features to add: 
 * Notes takings, tagging journals and notes, Time Tracking
@@ -27,7 +26,20 @@ from modules.folder_init import initialize_folders, setup_logging
 '''
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # A running daemon answers from its warm caches; nothing else is imported for that
+        from modules.daemon import forward
+        status = forward(sys.argv[1:])
+        if status is not None:
+            sys.exit(status)
+
+    from modules.folder_init import initialize_folders, setup_logging
     initialize_folders()
     setup_logging()
-    while True:
+    if len(sys.argv) > 1:
+        # Subcommands run without the menus, e.g. `python main.py journal list`
+        from modules.cli import app
+        app(prog_name="allcli")
+    else:
+        from modules.menu import main_menu
         main_menu()
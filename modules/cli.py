@@ -0,0 +1,291 @@
+"""
+Non-interactive command line: `python main.py <group> <command>`.
+
+Every command calls the same functions as the menus and writes one JSON
+object per line to stdout, so results can be piped into other tools; bulk
+input is read from stdin. Errors go to stderr with exit status 1.
+"""
+import os
+import sys
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import typer
+
+from configs import config
+
+app = typer.Typer(help="AllCLI without the menus: JSON lines out, JSON or text in.", add_completion=False)
+journal_app = typer.Typer(help="Write, list and search journals.")
+mission_app = typer.Typer(help="Write, list and search mission logs.")
+crypto_app = typer.Typer(help="Mission log encryption.")
+daemon_app = typer.Typer(help="Background process that keeps caches warm for these commands.")
+app.add_typer(journal_app, name="journal")
+app.add_typer(mission_app, name="mission")
+app.add_typer(crypto_app, name="crypto")
+app.add_typer(daemon_app, name="daemon")
+
+
+# Shared: json.dumps with options sets up a new encoder per call, per printed line
+ENCODER = json.JSONEncoder(ensure_ascii=False)
+
+
+def emit(value):
+    """Write `value` to stdout as one JSON line."""
+    sys.stdout.write(ENCODER.encode(value) + '\n')
+
+
+def fail(message):
+    """Report `message` on stderr and stop with status 1."""
+    logging.error(f"Command line: {message}")
+    typer.echo(f"allcli: error: {message}", err=True)
+    raise typer.Exit(1)
+
+
+def read_json_objects(stream):
+    """
+    Yield the values of JSON lines from `stream`, one line at a time. Input
+    whose first line is not a whole JSON value is read as one document;
+    arrays yield their items.
+    """
+    first = next((line for line in stream if line.strip()), None)
+    if first is None:
+        return
+    try:
+        value = json.loads(first)
+    except ValueError:
+        value = json.loads(first + stream.read())
+    yield from value if isinstance(value, list) else [value]
+    for number, line in enumerate(stream, 2):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"line {number}: {e}")
+
+
+def date_range(start, end):
+    """ISO bounds for --from/--to dates (YYYY-MM-DD); the end date is included."""
+    try:
+        start = datetime.strptime(start, "%Y-%m-%d").isoformat() if start else None
+        end = (datetime.strptime(end, "%Y-%m-%d") + timedelta(days=1)).isoformat() if end else None
+    except ValueError:
+        fail("dates must look like 2024-08-20")
+    return start, end
+
+
+def unlock_from_env():
+    """Take the mission log password from the environment when set; otherwise it is asked on the terminal."""
+    password = os.environ.get(config.PASSWORD_ENV)
+    if password:
+        from .encryption import keyring
+        keyring.use_password(password)
+
+
+@journal_app.command("new")
+def journal_new(
+    name: Optional[str] = typer.Option(None, help="Journal name (default: journal_<timestamp>)."),
+    text: Optional[str] = typer.Option(None, help="Journal text (default: read from stdin)."),
+    created: Optional[str] = typer.Option(None, help="Creation time, ISO format (default: now)."),
+    jsonl: bool = typer.Option(False, "--jsonl", help="Read many {name?, body, created?} objects from stdin."),
+):
+    """Write new journals; prints {name, created} for each."""
+    from .custom_modules.journal.journals import create_journals
+
+    if jsonl:
+        entries = read_json_objects(sys.stdin)
+    else:
+        entries = [{'name': name, 'body': sys.stdin.read() if text is None else text, 'created': created}]
+    written = 0
+    try:
+        for journal in create_journals(entries):
+            emit(journal)
+            written += 1
+    except (ValueError, TypeError, AttributeError, FileExistsError) as e:
+        fail(f"{e} ({written} journals written)")
+
+
+@journal_app.command("list")
+def journal_list(
+    start: Optional[str] = typer.Option(None, "--from", help="Earliest creation date, YYYY-MM-DD."),
+    end: Optional[str] = typer.Option(None, "--to", help="Latest creation date, YYYY-MM-DD."),
+    body: bool = typer.Option(False, "--body", help="Include each journal's text (an export)."),
+):
+    """List journals, newest first."""
+    from .custom_modules.journal.journals import list_journals
+
+    for journal in list_journals(*date_range(start, end), bodies=body):
+        emit(journal)
+
+
+@journal_app.command("search")
+def journal_search(
+    keywords: str = typer.Argument(..., help="Words that must all appear; end a word with * for a prefix."),
+    start: Optional[str] = typer.Option(None, "--from", help="Earliest creation date, YYYY-MM-DD."),
+    end: Optional[str] = typer.Option(None, "--to", help="Latest creation date, YYYY-MM-DD."),
+    limit: int = typer.Option(20, help="Most results to print."),
+):
+    """Search journals; prints {name, created, snippet} per match."""
+    from .custom_modules.journal.journals import find_journals
+
+    for journal in find_journals(keywords, *date_range(start, end), limit=limit):
+        emit(journal)
+
+
+@journal_app.command("tagged")
+def journal_tagged(tags: List[str] = typer.Argument(..., help="Tags that must all be present, with or without #.")):
+    """List the journals carrying every given #tag."""
+    from .custom_modules.journal.journals import USE_JOURNAL_DB, get_store, tag_index
+
+    if USE_JOURNAL_DB:
+        for row in get_store().tagged(*tags):
+            emit(dict(row))
+    else:
+        for name in tag_index.tagged(*tags):
+            emit({'name': name})
+
+
+@mission_app.command("write")
+def mission_write(
+    from_json: str = typer.Option(..., "--from-json", help="File of mission records (a JSON object, array or JSON lines); - for stdin."),
+):
+    """Write new mission logs from JSON records; prints {name, created, mission_name} for each."""
+    from .custom_modules.mission.mission_logs import save_mission_logs
+    from .custom_modules.mission.records import record_from_json
+
+    unlock_from_env()
+    try:
+        source = sys.stdin if from_json == '-' else open(from_json, encoding='utf-8')
+    except OSError as e:
+        fail(f"cannot read '{from_json}': {e.strerror}")
+    written = 0
+    try:
+        with source:
+            records = (record_from_json(value) for value in read_json_objects(source))
+            for name, record in save_mission_logs(records):
+                emit({'name': name, 'created': record['created'], 'mission_name': record['mission_name']})
+                written += 1
+    except ValueError as e:
+        fail(f"{e} ({written} mission logs written)")
+
+
+def _mission_row(name, entry, records):
+    """A manifest entry as printed; the record only when asked for."""
+    row = {'name': name}
+    row.update({key: value for key, value in (entry or {}).items() if key not in ('record', 'sig')})
+    if records:
+        row['record'] = entry['record'] if entry else None
+    return row
+
+
+@mission_app.command("list")
+def mission_list(
+    sort: str = typer.Option('newest', help="newest, oldest or name."),
+    records: bool = typer.Option(False, "--records", help="Include each log's full record (an export)."),
+):
+    """List mission logs from the encrypted manifest."""
+    from .custom_modules.mission.mission_logs import list_mission_logs
+
+    unlock_from_env()
+    try:
+        for name, entry in list_mission_logs(sort):
+            emit(_mission_row(name, entry, records))
+    except ValueError as e:
+        fail(str(e))
+
+
+@mission_app.command("search")
+def mission_search(
+    keywords: str = typer.Argument(..., help="Words that must all appear; end a word with * for a prefix."),
+    records: bool = typer.Option(False, "--records", help="Include each log's full record."),
+):
+    """Search mission logs; prints the manifest entry of each match."""
+    from .custom_modules.mission.mission_logs import find_mission_logs
+
+    unlock_from_env()
+    try:
+        for name, entry in find_mission_logs(keywords):
+            emit(_mission_row(name, entry, records))
+    except ValueError as e:
+        fail(str(e))
+
+
+@crypto_app.command("rekey")
+def crypto_rekey():
+    """Re-encrypt every mission log under a new password; prints {files, failures, plaintext}."""
+    from .custom_modules.mission.bulk_operations import rekey_all
+    from .encryption import keyring
+
+    unlock_from_env()
+    new_password = keyring.ask(prompt="Enter new password: ")
+    if new_password != keyring.ask(prompt="Confirm new password: "):
+        fail("passwords do not match")
+    try:
+        count, failures, plaintext = rekey_all(new_password)
+    except ValueError as e:
+        fail(str(e))
+    emit({
+        'files': count,
+        'failures': [{'name': os.path.basename(f), 'error': str(e)} for f, e in failures],
+        'plaintext': [os.path.basename(f) for f in plaintext],
+    })
+    if failures:
+        raise typer.Exit(1)
+
+
+@daemon_app.command("run")
+def daemon_run():
+    """Serve commands in the foreground until `daemon stop`."""
+    from . import daemon
+
+    if daemon.server:
+        fail("a daemon is already running")
+    try:
+        daemon.Daemon().serve()
+    except RuntimeError as e:
+        fail(str(e))
+
+
+@daemon_app.command("start")
+def daemon_start():
+    """Start the daemon in the background; prints its status."""
+    from . import daemon
+
+    if daemon.server:
+        emit(daemon.server.status())
+        return
+    try:
+        emit({'running': True, 'pid': daemon.start()})
+    except RuntimeError as e:
+        fail(str(e))
+
+
+@daemon_app.command("stop")
+def daemon_stop():
+    """Stop the daemon once this command is answered; `stopped` is false if none was running."""
+    from . import daemon
+
+    if daemon.server:
+        daemon.server.stopping = True
+    emit({'running': False, 'stopped': bool(daemon.server)})
+
+
+@daemon_app.command("status")
+def daemon_status():
+    """Print whether the daemon runs, and its pid, uptime, requests served and lock state."""
+    from . import daemon
+
+    emit(daemon.server.status() if daemon.server else {'running': False})
+
+
+@daemon_app.command("lock")
+def daemon_lock():
+    """Make the daemon forget the password and decrypted catalogs now."""
+    from . import daemon
+
+    if daemon.server:
+        daemon.server.lock()
+        emit(daemon.server.status())
+    else:
+        emit({'running': False})
@@ -0,0 +1,231 @@
+import os
+import re
+import sqlite3
+import logging
+from datetime import datetime
+
+from .tag_index import parse_tags
+from configs import config
+
+JOURNAL_DIR = config.JOURNAL_DIRECTORY
+JOURNAL_DB_PATH = config.JOURNAL_DB_PATH
+# Ranking a term found in nearly every entry costs time per match, so only the
+# newest this-many matches are ranked
+RANK_WINDOW = config.JOURNAL_RANK_WINDOW
+NAME_TIME_RE = re.compile(r'(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})')
+# PRAGMA user_version of the current schema; 1 added the tags table
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    created TEXT NOT NULL,
+    modified TEXT NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_created ON entries(created);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    name, body, content='entries', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts(rowid, name, body) VALUES (new.id, new.name, new.body);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts(entries_fts, rowid, name, body) VALUES ('delete', old.id, old.name, old.body);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_au AFTER UPDATE ON entries BEGIN
+    INSERT INTO entries_fts(entries_fts, rowid, name, body) VALUES ('delete', old.id, old.name, old.body);
+    INSERT INTO entries_fts(rowid, name, body) VALUES (new.id, new.name, new.body);
+END;
+CREATE TABLE IF NOT EXISTS tags (
+    tag TEXT NOT NULL,
+    entry_id INTEGER NOT NULL REFERENCES entries(id) ON DELETE CASCADE,
+    PRIMARY KEY (tag, entry_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tags_entry ON tags(entry_id);
+"""
+
+
+def _now():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+def fts_query(text):
+    """
+    Turn user input into an FTS5 query: every word is quoted (so punctuation
+    cannot break the syntax) and all must match; a trailing * keeps prefix search.
+    """
+    terms = []
+    for word in text.split():
+        prefix = word.endswith('*')
+        word = word.rstrip('*').replace('"', '""')
+        if word:
+            terms.append(f'"{word}"*' if prefix else f'"{word}"')
+    return ' '.join(terms)
+
+
+class JournalStore:
+    """
+    Journal entries in SQLite with an FTS5 full-text index.
+
+    The database runs in WAL mode; triggers keep the external-content FTS
+    table in step with `entries`, so search is a ranked index lookup and
+    listing or date filtering uses the `created` index instead of the
+    file system.
+    """
+
+    def __init__(self, path=JOURNAL_DB_PATH):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("PRAGMA foreign_keys=ON")
+        self.db.executescript(SCHEMA)
+        if self.db.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            # Databases from before the tags table: tag the existing entries once
+            with self.db:
+                for row in self.db.execute("SELECT id, body FROM entries").fetchall():
+                    self._set_tags(row['id'], row['body'])
+                self.db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def close(self):
+        self.db.close()
+
+    def _set_tags(self, entry_id, body):
+        """Replace the #tags of an entry with those in `body`; call inside a transaction."""
+        self.db.execute("DELETE FROM tags WHERE entry_id = ?", (entry_id,))
+        self.db.executemany(
+            "INSERT INTO tags(tag, entry_id) VALUES (?, ?)", [(tag, entry_id) for tag in parse_tags(body)]
+        )
+
+    def import_directory(self, directory):
+        """Import the .txt journals in `directory`; names already in the store are skipped."""
+        rows = []
+        for filename in sorted(os.listdir(directory)):
+            filepath = os.path.join(directory, filename)
+            if not filename.endswith('.txt') or not os.path.isfile(filepath):
+                continue
+            with open(filepath, encoding='utf-8', errors='replace') as file:
+                body = file.read()
+            modified = datetime.fromtimestamp(os.path.getmtime(filepath)).isoformat(timespec='seconds')
+            match = NAME_TIME_RE.search(filename)
+            created = datetime.strptime(match.group(1), "%Y-%m-%d_%H-%M-%S").isoformat() if match else modified
+            rows.append((filename[:-4], created, modified, body))
+        count = "SELECT count(*) FROM entries"
+        with self.db:
+            before = self.db.execute(count).fetchone()[0]
+            for row in rows:
+                cursor = self.db.execute(
+                    "INSERT OR IGNORE INTO entries(name, created, modified, body) VALUES (?, ?, ?, ?)", row
+                )
+                if cursor.rowcount:
+                    self._set_tags(cursor.lastrowid, row[3])
+            return self.db.execute(count).fetchone()[0] - before
+
+    def add(self, name, body, created=None):
+        """Store a new entry; returns its id."""
+        created = created or _now()
+        with self.db:
+            cursor = self.db.execute(
+                "INSERT INTO entries(name, created, modified, body) VALUES (?, ?, ?, ?)",
+                (name, created, created, body)
+            )
+            self._set_tags(cursor.lastrowid, body)
+        return cursor.lastrowid
+
+    def update(self, entry_id, body):
+        with self.db:
+            self.db.execute("UPDATE entries SET body = ?, modified = ? WHERE id = ?", (body, _now(), entry_id))
+            self._set_tags(entry_id, body)
+
+    def delete(self, entry_id):
+        with self.db:
+            self.db.execute("DELETE FROM entries WHERE id = ?", (entry_id,))
+
+    def get(self, entry_id):
+        return self.db.execute("SELECT * FROM entries WHERE id = ?", (entry_id,)).fetchone()
+
+    def find(self, name):
+        """Return the entry called `name`, or None."""
+        return self.db.execute("SELECT * FROM entries WHERE name = ?", (name,)).fetchone()
+
+    def entries(self, start=None, end=None, limit=None, bodies=False):
+        """Entries created in [start, end) (ISO dates or times), newest first; bodies only if asked."""
+        columns = "id, name, created, modified" + (", body" if bodies else "")
+        sql = f"SELECT {columns} FROM entries WHERE created >= ? AND created < ? ORDER BY created DESC"
+        params = [start or '', end or '9999']
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self.db.execute(sql, params).fetchall()
+
+    def tagged(self, *tags):
+        """Entries carrying every one of `tags`, newest first, without bodies."""
+        tags = sorted({tag.lstrip('#').lower() for tag in tags})
+        if not tags:
+            return []
+        return self.db.execute(
+            f"""
+            SELECT e.id, e.name, e.created, e.modified
+            FROM tags AS t JOIN entries AS e ON e.id = t.entry_id
+            WHERE t.tag IN ({', '.join('?' * len(tags))})
+            GROUP BY e.id HAVING count(*) = ?
+            ORDER BY e.created DESC
+            """,
+            tags + [len(tags)]
+        ).fetchall()
+
+    def tag_counts(self):
+        """{tag: number of entries}."""
+        return dict(self.db.execute("SELECT tag, count(*) FROM tags GROUP BY tag ORDER BY tag").fetchall())
+
+    def search(self, text, start=None, end=None, limit=20):
+        """
+        Ranked full-text search (bm25, best first) with a highlighted snippet
+        per hit, optionally restricted to entries created in [start, end).
+        When more than RANK_WINDOW entries match, only the newest RANK_WINDOW
+        of them are ranked.
+        """
+        query = fts_query(text)
+        if not query:
+            return []
+        params = (query, start or '', end or '9999')
+        # Walking the match list by rowid is cheap; computing bm25 for every match is not
+        window = self.db.execute(
+            """
+            SELECT entries_fts.rowid
+            FROM entries_fts JOIN entries AS e ON e.id = entries_fts.rowid
+            WHERE entries_fts MATCH ? AND e.created >= ? AND e.created < ?
+            ORDER BY entries_fts.rowid DESC
+            LIMIT 1 OFFSET ?
+            """,
+            params + (RANK_WINDOW,)
+        ).fetchone()
+        return self.db.execute(
+            """
+            SELECT e.id, e.name, e.created,
+                   snippet(entries_fts, 1, '[', ']', '...', 12) AS snippet
+            FROM entries_fts JOIN entries AS e ON e.id = entries_fts.rowid
+            WHERE entries_fts MATCH ? AND e.created >= ? AND e.created < ?
+              AND entries_fts.rowid > ?
+            ORDER BY bm25(entries_fts)
+            LIMIT ?
+            """,
+            params + (window[0] if window else 0, limit)
+        ).fetchall()
+
+
+_store = None
+
+def get_store():
+    """Return the shared journal store, creating (and migrating into) it on first use."""
+    global _store
+    if _store is None:
+        created = not os.path.exists(JOURNAL_DB_PATH)
+        _store = JournalStore()
+        if created and os.path.isdir(JOURNAL_DIR):
+            count = _store.import_directory(JOURNAL_DIR)
+            logging.info(f"Imported {count} journal files into '{JOURNAL_DB_PATH}'.")
+    return _store
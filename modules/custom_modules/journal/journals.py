@@ -1,7 +1,8 @@
 import questionary
 import os
 import logging
-from datetime import datetime
+import tempfile
+from datetime import datetime, timedelta
 from prompt_toolkit import PromptSession
 from prompt_toolkit.key_binding import KeyBindings
 
@@ -10,79 +11,155 @@ from ...ui import (
     display_panel,
     display_journal_saved_message,
     display_error_message,
-    clear_screen
 )
 from ...editor_engine.main_e import e_main
+from ...picker import pick
+from ...shell import Menu, ReturnToMainMenu
+from .journal_store import get_store
+from .tag_index import tag_index, normalize_tags
+from ...dir_manifest import get_manifest, first_line_title
+from ...editor_engine.file_io import write_lines_atomic
 from configs import config
 
 bindings = KeyBindings()
 
 JOURNAL_DIR = config.JOURNAL_DIRECTORY
+USE_JOURNAL_DB = config.JOURNAL_STORE == 'sqlite'
 SAVE_FLAG = False
 
-def journal_menu():
-    """Display the journal menu and handle user input."""
-    clear_screen()
-    options = [
-        "1: Write Journal",
-        "2: My Journals",
-        "3: Main Menu"
-    ]
-
-    choice = questionary.select(
-        "Choose an action:",
-        choices=options,
-        style=questionary.Style([
-            ('qmark', 'fg:#E91E63 bold'),
-            ('question', 'fg:#673AB7 bold'),
-            ('answer', 'fg:#2196F3 bold'),
-            ('pointer', 'fg:#03A9F4 bold'),
-            ('highlighted', 'fg:#03A9F4 bold'),
-            ('selected', 'fg:#4CAF50 bold'),
-            ('separator', 'fg:#E0E0E0'),
-            ('instruction', 'fg:#9E9E9E'),
-            ('text', 'fg:#FFFFFF'),
-            ('disabled', 'fg:#757575 italic')
-        ])
-    ).ask()
-
-    if choice == options[0]:
-        write_journal()
-    elif choice == options[1]:
-        clear_screen()
-        read_or_edit_journal()
-    elif choice == options[2]:
-        return_to_main_menu()
-
 def write_journal():
     """Create a new journal entry using the custom editor engine."""
     journal_filepath = get_journal_filepath()
+    if USE_JOURNAL_DB:
+        name = os.path.basename(journal_filepath)[:-len('.txt')]
+        store = get_store()
+        existing = store.find(name)
+        if existing:
+            edit_journal_entry(existing['id'])
+            return
+        body = edit_in_temp_file('', name)
+        if body.strip():
+            store.add(name, body)
+        return
     e_main(journal_filepath)
+    tag_index.update_file(journal_filepath)
+
+def edit_in_temp_file(text, name):
+    """
+    Edit `text` with the editor through a private temp file and return the
+    result. Used by the database store, where entries have no file of their own.
+    """
+    fd, temp_path = tempfile.mkstemp(prefix=f'{name}.', suffix='.txt')
+    try:
+        with os.fdopen(fd, 'w') as file:
+            file.write(text)
+        # No swap journal: the temp file is gone after this call anyway
+        e_main(temp_path, swap=False)
+        with open(temp_path) as file:
+            return file.read()
+    finally:
+        os.remove(temp_path)
+
+def edit_journal_entry(entry_id):
+    """Edit a database journal entry; the store is only written when the text changed."""
+    try:
+        store = get_store()
+        entry = store.get(entry_id)
+        body = edit_in_temp_file(entry['body'], entry['name'])
+        if body != entry['body']:
+            store.update(entry_id, body)
+    except Exception as e:
+        logging.error(f"Error editing journal entry {entry_id}: {e}")
+        display_error_message("Failed to edit journal entry.")
+
+def read_date(prompt):
+    """Ask for an optional YYYY-MM-DD date; returns a datetime, None for blank, or raises ValueError."""
+    answer = questionary.text(prompt).ask()
+    return datetime.strptime(answer.strip(), "%Y-%m-%d") if answer and answer.strip() else None
+
+def search_journals():
+    """Ranked full-text search over the journal database, optionally limited to a date range."""
+    if not USE_JOURNAL_DB:
+        display_error_message("Journal search needs JOURNAL_STORE = 'sqlite' in configs/config.py.")
+        return
+    try:
+        keywords = questionary.text("Enter keywords to search for (end a word with * to match a prefix):").ask()
+        if not keywords:
+            return
+        start = read_date("From date (YYYY-MM-DD, blank for any):")
+        end = read_date("To date (YYYY-MM-DD, blank for any):")
+        results = get_store().search(
+            keywords,
+            start=start.isoformat() if start else None,
+            end=(end + timedelta(days=1)).isoformat() if end else None
+        )
+        if not results:
+            display_error_message("No matching journal entries found.")
+            return
+
+        # Best match first; typing filters the ranked results further
+        choices = [
+            (f"{row['name']} ({row['created'][:10]}): {row['snippet'].replace(chr(10), ' ')}", row['id'])
+            for row in results
+        ]
+        selected = pick("Select a journal entry to edit:", choices)
+
+        if selected:
+            edit_journal_entry(selected)
+
+    except ValueError:
+        display_error_message("Dates must look like 2024-08-20.")
+    except Exception as e:
+        logging.error(f"Error searching journal entries: {e}")
+        display_error_message("Failed to search journal entries.")
+
+def tagged_journals():
+    """List the journal entries carrying all of the given #tags and edit the one picked."""
+    try:
+        counts = get_store().tag_counts() if USE_JOURNAL_DB else tag_index.counts()
+        if not counts:
+            display_error_message("No tagged journal entries found. Add #tags to an entry's text.")
+            return
+        known = ', '.join(f"#{tag} ({count})" for tag, count in counts.items())
+        tags = normalize_tags(questionary.text(f"Tags to match, e.g. #health #2024 [{known}]:").ask() or '')
+        if not tags:
+            return
+
+        if USE_JOURNAL_DB:
+            choices = [(f"{row['name']} ({row['created'][:10]})", row['id']) for row in get_store().tagged(*tags)]
+        else:
+            choices = tag_index.tagged(*tags)
+        if not choices:
+            display_error_message(f"No journal entries tagged {' '.join('#' + tag for tag in tags)}.")
+            return
+
+        selected = pick("Select a journal entry to edit:", choices)
+
+        if selected and USE_JOURNAL_DB:
+            edit_journal_entry(selected)
+        elif selected:
+            edit_journal(selected)
+
+    except Exception as e:
+        logging.error(f"Error listing tagged journal entries: {e}")
+        display_error_message("Failed to list tagged journal entries!")
 
 def read_or_edit_journal():
     """Display a list of journal entries for the user to select and edit."""
+    if USE_JOURNAL_DB:
+        read_or_edit_journal_entry()
+        return
     try:
-        journal_files = [f for f in os.listdir(JOURNAL_DIR) if os.path.isfile(os.path.join(JOURNAL_DIR, f))]
+        # Cached listing, newest first: no per-file stat unless the folder changed
+        journal_files = [
+            (describe_journal(name, entry), name)
+            for name, entry in get_manifest(JOURNAL_DIR, title=first_line_title).listing()
+        ]
         if not journal_files:
             display_error_message("No journal entries found.")
             return
 
-        selected_journal = questionary.select(
-            "Select a journal entry to edit:",
-            choices=journal_files,
-            style=questionary.Style([
-                ('qmark', 'fg:#E91E63 bold'),
-                ('question', 'fg:#673AB7 bold'),
-                ('answer', 'fg:#2196F3 bold'),
-                ('pointer', 'fg:#03A9F4 bold'),
-                ('highlighted', 'fg:#03A9F4 bold'),
-                ('selected', 'fg:#4CAF50 bold'),
-                ('separator', 'fg:#E0E0E0'),
-                ('instruction', 'fg:#9E9E9E'),
-                ('text', 'fg:#FFFFFF'),
-                ('disabled', 'fg:#757575 italic')
-            ])
-        ).ask()
+        selected_journal = pick("Select a journal entry to edit:", journal_files)
 
         if selected_journal:
             edit_journal(selected_journal)
@@ -91,11 +168,35 @@ def read_or_edit_journal():
         logging.error(f"Error listing journal entries: {e}")
         display_error_message("Failed to list journal entries!")
 
+def describe_journal(name, entry):
+    """One-line picker label for a journal file."""
+    label = f"{name} ({entry['created'][:10]})"
+    return f"{label} - {entry['title']}" if entry['title'] else label
+
+def read_or_edit_journal_entry():
+    """Pick a database journal entry, newest first, and edit it."""
+    try:
+        entries = get_store().entries()
+        if not entries:
+            display_error_message("No journal entries found.")
+            return
+
+        choices = [(f"{row['name']} ({row['created'][:10]})", row['id']) for row in entries]
+        selected = pick("Select a journal entry to edit:", choices)
+
+        if selected:
+            edit_journal_entry(selected)
+
+    except Exception as e:
+        logging.error(f"Error listing journal entries: {e}")
+        display_error_message("Failed to list journal entries!")
+
 def edit_journal(filename):
     """Edit the selected journal entry using the custom editor engine."""
     try:
         journal_filepath = os.path.join(JOURNAL_DIR, filename)
         e_main(journal_filepath)
+        tag_index.update_file(journal_filepath)
     except Exception as e:
         logging.error(f"Error editing journal entry '{filename}': {e}")
         display_error_message("Failed to edit journal entry.")
@@ -112,7 +213,104 @@ def get_journal_filepath():
     else:
         return f"{JOURNAL_DIR}/journal_{timestamp}.txt"
 
+def new_journal_name(created=None):
+    """Default name of a journal created at `created` (ISO time, default now); unique in the store."""
+    moment = datetime.fromisoformat(created) if created else datetime.now()
+    base = name = f"journal_{moment.strftime('%Y-%m-%d_%H-%M-%S')}"
+    count = 1
+    while journal_exists(name):
+        count += 1
+        name = f"{base}_{count}"
+    return name
+
+def journal_exists(name):
+    """Whether a journal called `name` is already stored."""
+    if USE_JOURNAL_DB:
+        return get_store().find(name) is not None
+    return os.path.exists(os.path.join(JOURNAL_DIR, f"{name}.txt"))
+
+def create_journals(entries):
+    """
+    Store each {'body', 'name'?, 'created'?} entry as a new journal, yielding
+    {'name', 'created'} as each is written. Existing names raise FileExistsError.
+    In the file store the #tag index is saved once when the batch ends.
+    """
+    written = []
+    try:
+        for entry in entries:
+            moment = datetime.fromisoformat(entry['created']) if entry.get('created') else datetime.now()
+            created = moment.isoformat(timespec='seconds')
+            name = entry.get('name') or new_journal_name(created)
+            if journal_exists(name):
+                raise FileExistsError(f"journal '{name}' already exists")
+            body = entry.get('body') or ''
+            if USE_JOURNAL_DB:
+                get_store().add(name, body, created)
+                yield {'name': name, 'created': created}
+                continue
+            filepath = os.path.join(JOURNAL_DIR, f"{name}.txt")
+            write_lines_atomic(filepath, body.rstrip('\n').split('\n'))
+            # Named journals are dated by their mtime
+            os.utime(filepath, (moment.timestamp(), moment.timestamp()))
+            written.append(filepath)
+            yield {'name': f"{name}.txt", 'created': created}
+    finally:
+        if written:
+            tag_index.update_files(written)
+
+def list_journals(start=None, end=None, bodies=False):
+    """
+    Journals created in [start, end) (ISO dates or times), newest first, as
+    dicts of name, created, modified and (file store) title, plus the body if asked.
+    """
+    if USE_JOURNAL_DB:
+        for row in get_store().entries(start, end, bodies=bodies):
+            yield dict(row)
+        return
+    for name, entry in get_manifest(JOURNAL_DIR, title=first_line_title).listing():
+        if start and entry['created'] < start or end and entry['created'] >= end:
+            continue
+        journal = {
+            'name': name,
+            'created': entry['created'],
+            'modified': datetime.fromtimestamp(entry['mtime'] / 1e9).isoformat(timespec='seconds'),
+            'title': entry['title'],
+        }
+        if bodies:
+            with open(os.path.join(JOURNAL_DIR, name), encoding='utf-8', errors='replace') as file:
+                journal['body'] = file.read()
+        yield journal
+
+def find_journals(keywords, start=None, end=None, limit=20):
+    """
+    Journals matching every word of `keywords` as dicts of name, created and
+    snippet. Ranked full-text search with the database store; the file store
+    is scanned newest first (a trailing * is implied there).
+    """
+    if USE_JOURNAL_DB:
+        return [dict(row) for row in get_store().search(keywords, start, end, limit)]
+    words = [word.rstrip('*').lower() for word in keywords.split() if word.rstrip('*')]
+    if not words:
+        return []
+    results = []
+    for journal in list_journals(start, end, bodies=True):
+        text = journal['body'].lower()
+        if all(word in text for word in words):
+            line = next(line for line in journal['body'].splitlines() if words[0] in line.lower())
+            results.append({'name': journal['name'], 'created': journal['created'], 'snippet': line.strip()})
+            if len(results) == limit:
+                break
+    return results
+
 def return_to_main_menu():
     """Return to the main menu."""
-    from ...menu import main_menu
-    main_menu()
+    raise ReturnToMainMenu()
+
+
+JOURNAL_MENU = Menu("Journals", [
+    ("1: Write Journal", write_journal),
+    ("2: My Journals", read_or_edit_journal),
+    ("3: Search Journals", search_journals),
+    ("4: Journals by Tag", tagged_journals),
+    ("5: Main Menu", 'main'),
+])
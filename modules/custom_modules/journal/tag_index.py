@@ -0,0 +1,157 @@
+import os
+import re
+import json
+import logging
+
+from ...editor_engine.file_io import write_lines_atomic
+from ...dir_manifest import is_listed
+from configs import config
+
+JOURNAL_DIR = config.JOURNAL_DIRECTORY
+JOURNAL_TAG_INDEX_PATH = config.JOURNAL_TAG_INDEX_PATH
+TAG_INDEX_VERSION = 1
+# "#health", "#2024", "#side-project"; not "a#b" or "##"
+TAG_RE = re.compile(r'(?<![\w#])#(\w[\w-]*)')
+
+
+def parse_tags(text):
+    """Return the sorted, lowercased inline #tags in `text`."""
+    return sorted({tag.lower() for tag in TAG_RE.findall(text)})
+
+
+def normalize_tags(text):
+    """Turn user input like "#health 2024" into tag names."""
+    return sorted({word.lstrip('#').lower() for word in text.split() if word.lstrip('#')})
+
+
+class TagIndex:
+    """
+    Persistent tag index for the journal files.
+
+    `tags` maps tag -> entry names and `entries` maps entry name -> its size,
+    mtime and tags. Saves re-index only the saved file, and only when its
+    size or mtime moved; a query for several tags is a set intersection.
+    """
+
+    def __init__(self, path=JOURNAL_TAG_INDEX_PATH, directory=JOURNAL_DIR):
+        self.path = path
+        self.directory = directory
+        self.loaded = False
+        self.stamp = None
+
+    def _stamp(self):
+        """[size, mtime_ns] of the index file, or None."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def load(self):
+        """
+        Read the index, building it from the journal directory the first time;
+        it is read again when another process (the menus or the daemon) saved it.
+        """
+        stamp = self._stamp()
+        if self.loaded and stamp == self.stamp:
+            return
+        self.entries, self.tags = {}, {}
+        self.loaded = True
+        self.stamp = stamp
+        try:
+            with open(self.path) as file:
+                payload = json.load(file)
+            if payload.get('version') == TAG_INDEX_VERSION:
+                self.entries = payload['entries']
+                self.tags = {tag: set(names) for tag, names in payload['tags'].items()}
+                return
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError) as e:
+            logging.error(f"Rebuilding unreadable tag index '{self.path}': {e}")
+        self.sync()
+
+    def save(self):
+        payload = {
+            'version': TAG_INDEX_VERSION,
+            'entries': self.entries,
+            'tags': {tag: sorted(names) for tag, names in self.tags.items()},
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        write_lines_atomic(self.path, [json.dumps(payload)])
+        self.stamp = self._stamp()
+
+    def _remove(self, name):
+        entry = self.entries.pop(name, None)
+        for tag in entry['tags'] if entry else ():
+            names = self.tags.get(tag)
+            names.discard(name)
+            if not names:
+                del self.tags[tag]
+
+    def _update(self, name, filepath):
+        """Re-read `filepath` if its size or mtime changed; returns True if it did."""
+        stat = os.stat(filepath)
+        signature = [stat.st_size, stat.st_mtime_ns]
+        entry = self.entries.get(name)
+        if entry and entry['sig'] == signature:
+            return False
+        with open(filepath, encoding='utf-8', errors='replace') as file:
+            tags = parse_tags(file.read())
+        self._remove(name)
+        self.entries[name] = {'sig': signature, 'tags': tags}
+        for tag in tags:
+            self.tags.setdefault(tag, set()).add(name)
+        return True
+
+    def update_file(self, filepath):
+        """Index a journal file that was just saved (or drop it if it is gone)."""
+        self.load()
+        name = os.path.basename(filepath)
+        if not os.path.exists(filepath):
+            if name in self.entries:
+                self._remove(name)
+                self.save()
+        elif self._update(name, filepath):
+            self.save()
+
+    def update_files(self, filepaths):
+        """Index many saved journal files with one save of the index."""
+        self.load()
+        changed = False
+        for filepath in filepaths:
+            changed = self._update(os.path.basename(filepath), filepath) or changed
+        if changed:
+            self.save()
+
+    def sync(self):
+        """Check every journal file against the index; only changed files are read."""
+        # Editor swap files and atomic-save temp files are not journals
+        names = {
+            f for f in os.listdir(self.directory)
+            if is_listed(f) and os.path.isfile(os.path.join(self.directory, f))
+        } if os.path.isdir(self.directory) else set()
+        changed = False
+        for name in [name for name in self.entries if name not in names]:
+            self._remove(name)
+            changed = True
+        for name in sorted(names):
+            changed = self._update(name, os.path.join(self.directory, name)) or changed
+        if changed:
+            self.save()
+
+    def tagged(self, *tags):
+        """Names of the entries carrying every one of `tags`, sorted."""
+        self.load()
+        if not tags:
+            return []
+        sets = sorted((self.tags.get(tag.lstrip('#').lower(), set()) for tag in tags), key=len)
+        return sorted(sets[0].intersection(*sets[1:]))
+
+    def counts(self):
+        """{tag: number of entries}, for showing the known tags."""
+        self.load()
+        return {tag: len(names) for tag, names in sorted(self.tags.items())}
+
+
+tag_index = TagIndex()
@@ -0,0 +1,232 @@
+import os
+import hmac
+import json
+import getpass
+import hashlib
+import logging
+import questionary
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from rich.console import Console
+from rich.progress import Progress
+
+from ...ui import display_panel, display_error_message, clear_screen
+from ...encryption import (
+    SALT_SIZE,
+    derive_key_from_password,
+    encrypt_stream,
+    decrypt_chunks,
+    rekey_file,
+    is_encrypted,
+    key_params,
+    keyring,
+    lock_keyring,
+)
+from ...editor_engine.file_io import write_lines_atomic
+from .catalog import log_names
+from .records import decode_record
+from .search_index import mission_index
+from .manifest import mission_manifest
+from configs import config
+
+MISSION_DIR = config.MISSION_DIR
+# Progress of an interrupted password rotation, kept next to (not in) the log directory
+REKEY_STATE_PATH = MISSION_DIR.rstrip('/') + '.rekey'
+
+
+def _mission_files(directory=MISSION_DIR):
+    return sorted(os.path.join(directory, f) for f in log_names(directory))
+
+
+def _encrypt_one(filepath, key, salt):
+    with open(filepath, 'rb') as source:
+        encrypt_stream(source, filepath, key, salt)
+
+
+def _export_one(filepath, key, export_dir):
+    _, text = decode_record(b''.join(decrypt_chunks(filepath, key)))
+    write_lines_atomic(os.path.join(export_dir, os.path.basename(filepath)), text.rstrip('\n').split('\n'))
+
+
+def _run_parallel(description, worker, jobs, workers=None):
+    """
+    Run `worker(*args)` for every (filepath, args) job on a process pool with a
+    progress bar. Returns the list of (filepath, error) failures.
+    """
+    failures = []
+    if not jobs:
+        return failures
+    # On stderr, so the command line can stream results on stdout
+    with ProcessPoolExecutor(max_workers=workers or config.BULK_WORKERS) as pool, \
+            Progress(console=Console(stderr=True)) as progress:
+        task = progress.add_task(description, total=len(jobs))
+        futures = {pool.submit(worker, *args): filepath for filepath, args in jobs}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                logging.error(f"{description} failed for '{futures[future]}': {e}")
+                failures.append((futures[future], e))
+            progress.advance(task)
+    return failures
+
+
+def derive_keys(password, params, workers=None):
+    """
+    Derive the key for every distinct (salt, iterations) in `params` once,
+    in parallel; returns a dict keyed by (salt, iterations).
+    """
+    params = sorted(set(params))
+    if len(params) <= 1:
+        return {p: derive_key_from_password(password, *p) for p in params}
+    with ProcessPoolExecutor(max_workers=workers or config.BULK_WORKERS) as pool:
+        keys = pool.map(derive_key_from_password, [password] * len(params), *zip(*params))
+        return dict(zip(params, keys))
+
+
+def _session_keys(files):
+    """Keys for `files` under the session password; already cached keys are reused."""
+    password = keyring.unlock("Enter mission log password: ")
+    params = {filepath: key_params(filepath) for filepath in files}
+    missing = [p for p in set(params.values()) if p not in keyring.keys]
+    keyring.keys.update(derive_keys(password, missing))
+    return {filepath: keyring.keys[p] for filepath, p in params.items()}
+
+
+def encrypt_all(directory=MISSION_DIR):
+    """Encrypt every plaintext file in `directory`; already encrypted files are skipped."""
+    files = [f for f in _mission_files(directory) if not is_encrypted(f)]
+    if files and keyring.locked:
+        # A typo here would lock every log under a password nobody knows
+        password = keyring.ask(prompt="Enter encryption password: ")
+        if password != keyring.ask(prompt="Confirm encryption password: "):
+            raise ValueError("passwords do not match")
+        keyring.use_password(password)
+    key, salt = keyring.write_key()
+    return len(files), _run_parallel("Encrypting", _encrypt_one, [(f, (f, key, salt)) for f in files])
+
+
+def export_all(export_dir, directory=MISSION_DIR):
+    """
+    Decrypt every log into `export_dir`. Each export is written atomically, so
+    logs already present there are complete and skipped when re-run.
+    """
+    os.makedirs(export_dir, exist_ok=True)
+    files = [
+        f for f in _mission_files(directory)
+        if not os.path.exists(os.path.join(export_dir, os.path.basename(f)))
+    ]
+    keys = _session_keys(files)
+    jobs = [(f, (f, keys[f], export_dir)) for f in files]
+    return len(files), _run_parallel("Exporting", _export_one, jobs)
+
+
+def _rekey_check(key):
+    return hmac.new(key, b'allcli-rekey', hashlib.sha256).hexdigest()
+
+
+def _load_rekey_state(new_password):
+    """
+    Return the salt of an interrupted rotation, or a fresh one. The state file
+    stores the new salt and a check value, so a restarted rotation must use
+    the same new password and can skip logs that were already re-keyed.
+    """
+    if os.path.exists(REKEY_STATE_PATH):
+        with open(REKEY_STATE_PATH) as file:
+            state = json.load(file)
+        salt = bytes.fromhex(state['salt'])
+        key = derive_key_from_password(new_password, salt)
+        if not hmac.compare_digest(_rekey_check(key), state['check']):
+            raise ValueError("the new password differs from the one used by the interrupted rotation")
+        return salt, key
+    salt = os.urandom(SALT_SIZE)
+    key = derive_key_from_password(new_password, salt)
+    with open(REKEY_STATE_PATH, 'w') as file:
+        json.dump({'salt': salt.hex(), 'check': _rekey_check(key)}, file)
+    return salt, key
+
+
+def rekey_all(new_password, directory=MISSION_DIR):
+    """
+    Re-encrypt every log under `new_password`. Safe to interrupt: re-running
+    with the same new password resumes where the last run stopped.
+    Plaintext logs are left alone and returned separately.
+    """
+    new_salt, new_key = _load_rekey_state(new_password)
+    files = _mission_files(directory)
+    plaintext = [f for f in files if not is_encrypted(f)]
+    files = [f for f in files if f not in plaintext]
+    if directory == MISSION_DIR:
+        # The catalogs are encrypted under the same password
+        files += [c.path for c in (mission_index, mission_manifest) if os.path.exists(c.path)]
+    files = [f for f in files if key_params(f)[0] != new_salt]
+    keys = _session_keys(files)
+    failures = _run_parallel("Changing password", rekey_file, [(f, (f, keys[f], new_key, new_salt)) for f in files])
+    if not failures:
+        os.remove(REKEY_STATE_PATH)
+        # The old password no longer opens anything
+        lock_keyring()
+        mission_index.forget()
+        mission_manifest.forget()
+    return len(files), failures, plaintext
+
+
+def bulk_operations_menu():
+    """Encrypt, export or re-key every mission log at once."""
+    clear_screen()
+    options = [
+        "1: Encrypt All Mission Logs",
+        "2: Export Decrypted Mission Logs",
+        "3: Change Mission Log Password"
+    ]
+
+    choice = questionary.select(
+        "Choose a bulk operation:",
+        choices=options,
+        style=questionary.Style([
+            ('qmark', 'fg:#E91E63 bold'),
+            ('question', 'fg:#673AB7 bold'),
+            ('answer', 'fg:#2196F3 bold'),
+            ('pointer', 'fg:#03A9F4 bold'),
+            ('highlighted', 'fg:#03A9F4 bold'),
+            ('selected', 'fg:#4CAF50 bold'),
+            ('separator', 'fg:#E0E0E0'),
+            ('instruction', 'fg:#9E9E9E'),
+            ('text', 'fg:#FFFFFF'),
+            ('disabled', 'fg:#757575 italic')
+        ])
+    ).ask()
+
+    try:
+        if choice == options[0]:
+            count, failures = encrypt_all()
+            action = "encrypted"
+        elif choice == options[1]:
+            export_dir = questionary.text("Export folder:", default=MISSION_DIR.rstrip('/') + '_export').ask()
+            if not export_dir:
+                return
+            count, failures = export_all(export_dir)
+            action = f"exported to '{export_dir}'"
+        elif choice == options[2]:
+            new_password = getpass.getpass(prompt="Enter new password: ")
+            if new_password != getpass.getpass(prompt="Confirm new password: "):
+                display_error_message("Passwords do not match.")
+                return
+            count, failures, plaintext = rekey_all(new_password)
+            action = "re-encrypted"
+            if plaintext:
+                action += f"; {len(plaintext)} plaintext logs skipped, use 'Encrypt All' for those"
+        else:
+            return
+    except Exception as e:
+        logging.error(f"Bulk operation failed: {e}")
+        display_error_message(f"Bulk operation failed: {e}")
+        return
+
+    if failures:
+        # Usually a mistyped password; do not keep it around
+        lock_keyring()
+        mission_index.forget()
+        mission_manifest.forget()
+        display_error_message(f"{len(failures)} of {count} mission logs failed; run it again to retry them.")
+    else:
+        display_panel(f"{count} mission logs {action}.", title="Done", style="bold green")
@@ -0,0 +1,201 @@
+import os
+import json
+import logging
+import threading
+
+from .records import decode_record
+from ...dir_manifest import get_manifest
+from ...encryption import read_encrypted, write_encrypted, is_encrypted, keyring
+from configs import config
+
+MISSION_DIR = config.MISSION_DIR
+
+
+def log_names(directory=MISSION_DIR):
+    """Names of the mission logs in `directory`."""
+    return get_manifest(directory).names()
+
+
+class LogCatalog:
+    """
+    Base for the encrypted per-log catalogs kept next to the log directory.
+
+    A catalog is a JSON document with one entry per log, stored encrypted
+    under the session password. Each entry remembers the size and mtime the
+    log had when it was catalogued, so `sync_catalogs` only decrypts logs
+    that changed behind the app's back; the sizes and mtimes on disk come
+    from the shared directory manifest. Subclasses build entries in `_entry`.
+    """
+
+    version = 1
+
+    def __init__(self, path, directory=MISSION_DIR):
+        self.path = path
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.loaded = False
+        self.stamp = None
+        # (directory generation, catalog stamp) as of the last complete sync
+        self.synced = None
+
+    def _stamp(self):
+        """[size, mtime_ns] of the catalog file, or None."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def load(self):
+        """
+        Decrypt the catalog (or start an empty one) unless the copy in memory
+        is current; another process (the menus or the daemon) may have saved it.
+        """
+        stamp = self._stamp()
+        if self.loaded and stamp == self.stamp:
+            return
+        if os.path.exists(self.path):
+            data, self.key, self.salt = read_encrypted(self.path)
+            payload = json.loads(data)
+            if payload.get('version') != self.version:
+                # Older layout: start over, the next sync re-reads every log
+                payload = dict(payload, files={})
+        else:
+            self.key, self.salt = keyring.write_key()
+            payload = {'files': {}}
+        self.files = {}
+        self._loaded(payload)
+        for name, entry in payload['files'].items():
+            self._store(name, entry)
+        self.loaded = True
+        self.stamp = stamp
+
+    def _loaded(self, payload):
+        """Hook: read extra fields from a freshly decrypted payload."""
+
+    def _payload(self):
+        return {'version': self.version, 'files': self.files}
+
+    def forget(self):
+        """Drop the decrypted catalog from memory."""
+        self.loaded = False
+        self.files = self.key = self.salt = None
+
+    def save(self):
+        write_encrypted(self.path, json.dumps(self._payload()).encode(), self.key, self.salt)
+        self.stamp = self._stamp()
+
+    def _signature(self, name):
+        stat = os.stat(os.path.join(self.directory, name))
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def _entry(self, name, record, text):
+        raise NotImplementedError
+
+    def _store(self, name, entry):
+        self.files[name] = entry
+
+    def _remove(self, name):
+        return self.files.pop(name, None)
+
+    def _add(self, name, record, text):
+        self._remove(name)
+        entry = self._entry(name, record, text)
+        entry['sig'] = self._signature(name)
+        self._store(name, entry)
+
+    def _changes(self, names):
+        """Return (stale, deleted) log names relative to the logs on disk."""
+        listing = get_manifest(self.directory)
+        stale = {name for name in names if self.files.get(name, {}).get('sig') != listing.signature(name)}
+        deleted = [name for name in self.files if name not in names]
+        return stale, deleted
+
+    def update(self, name, record, text):
+        """Re-catalogue log `name` after it was saved with `record` / `text`."""
+        with self.lock:
+            self.load()
+            self._add(name, record, text)
+            self.save()
+
+    def update_many(self, items):
+        """Re-catalogue many saved logs, given as (name, record, text), with one save."""
+        with self.lock:
+            self.load()
+            for name, record, text in items:
+                self._add(name, record, text)
+            self.save()
+
+    def remove(self, name):
+        """Drop a deleted log."""
+        with self.lock:
+            self.load()
+            self._remove(name)
+            self.save()
+
+    def sync(self):
+        return sync_catalogs(self)
+
+
+def sync_catalogs(*catalogs):
+    """
+    Bring `catalogs` (all over the same directory) up to date with the logs
+    on disk, decrypting each new or changed log once for all of them.
+    Returns the number of logs read.
+    """
+    listing = get_manifest(catalogs[0].directory)
+    names = listing.names()
+    changes = []
+    for catalog in catalogs:
+        catalog.lock.acquire()
+    try:
+        for catalog in catalogs:
+            catalog.load()
+            if catalog.synced == (listing.generation, catalog.stamp):
+                # Neither the logs nor the catalog moved since the last sync
+                changes.append((set(), []))
+            else:
+                changes.append(catalog._changes(names))
+        stale = sorted(set().union(*(stale for stale, _ in changes)))
+        changed = set()
+        read = 0
+        unreadable = []
+        try:
+            for catalog, (_, deleted) in zip(catalogs, changes):
+                for name in deleted:
+                    catalog._remove(name)
+                    changed.add(catalog)
+            for name in stale:
+                if not is_encrypted(os.path.join(catalogs[0].directory, name)):
+                    continue  # Plaintext left behind by an old version; listed by name only
+                try:
+                    data, _, _ = read_encrypted(os.path.join(catalogs[0].directory, name), lock_on_failure=False)
+                except ValueError:
+                    # E.g. left under another password by an interrupted rekey; listed by name only
+                    unreadable.append(name)
+                    continue
+                record, text = decode_record(data)
+                read += 1
+                for catalog, (catalog_stale, _) in zip(catalogs, changes):
+                    if name in catalog_stale:
+                        catalog._add(name, record, text)
+                        changed.add(catalog)
+            if unreadable:
+                if not read and all(catalog.stamp is None for catalog in catalogs):
+                    # No catalog or log confirms the password: most likely it was mistyped
+                    keyring.lock()
+                    for catalog in catalogs:
+                        catalog.forget()
+                    changed.clear()
+                    raise ValueError("wrong password or corrupted file")
+                logging.error(f"Mission logs that do not decrypt with this password: {', '.join(unreadable)}")
+        finally:
+            # Keep whatever was catalogued before a failure (e.g. a wrong password)
+            for catalog in changed:
+                catalog.save()
+        for catalog in catalogs:
+            catalog.synced = (listing.generation, catalog.stamp)
+        return read
+    finally:
+        for catalog in catalogs:
+            catalog.lock.release()
@@ -0,0 +1,73 @@
+import hashlib
+
+from .catalog import LogCatalog
+from ...dir_manifest import get_manifest
+from .records import created_from_name
+from configs import config
+
+MISSION_DIR = config.MISSION_DIR
+# Kept next to (not in) the log directory so it never shows up as a log
+MANIFEST_PATH = MISSION_DIR.rstrip('/') + '.manifest'
+# Objectives are cut to this many characters in the manifest
+OBJECTIVE_LENGTH = 120
+
+class MissionManifest(LogCatalog):
+    """
+    Encrypted manifest of per-log metadata: mission name, objective, date,
+    plaintext size, task count, content hash and the structured record.
+    Listing, sorting or querying the logs decrypts this one small file
+    instead of every log.
+    """
+
+    def __init__(self, path=MANIFEST_PATH, directory=MISSION_DIR):
+        super().__init__(path, directory)
+
+    version = 2
+
+    def _entry(self, name, record, text):
+        data = text.encode()
+        record = dict(record, created=record.get('created') or created_from_name(name))
+        return {
+            'mission_name': record.get('mission_name') or '',
+            'date': record.get('date') or '',
+            'objective': (record.get('objective') or '')[:OBJECTIVE_LENGTH],
+            'tasks': len(record.get('tasks') or ()),
+            'size': len(data),
+            'sha256': hashlib.sha256(data).hexdigest(),
+            'record': record,
+        }
+
+    def query(self, predicate):
+        """
+        Return [(name, record)] for the logs whose structured record satisfies
+        `predicate`, e.g. open next steps this month:
+
+            manifest.query(lambda r: r['next_steps'] and (r['created'] or '') >= '2024-08')
+        """
+        return [(name, entry['record']) for name, entry in sorted(self.files.items()) if predicate(entry['record'])]
+
+    def listing(self, sort='newest'):
+        """
+        Return [(name, entry)] for every log on disk, sorted by `sort`:
+        'newest' (the directory manifest's order), 'oldest' or 'name'.
+        Logs missing from the manifest come with a None entry.
+        """
+        items = [(name, self.files.get(name)) for name, _ in get_manifest(self.directory).listing()]
+        if sort == 'name':
+            items.sort(key=lambda item: ((item[1] or {}).get('mission_name', '').lower(), item[0]))
+        elif sort == 'oldest':
+            items.reverse()
+        return items
+
+
+mission_manifest = MissionManifest()
+
+
+def describe(name, entry):
+    """One-line picker label for a log."""
+    if not entry or not entry['mission_name']:
+        return name
+    label = f"{entry['mission_name']} ({entry['date'] or name})"
+    if entry['objective']:
+        label += f" - {entry['objective'][:50]}"
+    return label
@@ -2,7 +2,6 @@ import os
 import questionary
 import logging
 from datetime import datetime
-from jinja2 import Template
 from prompt_toolkit.key_binding import KeyBindings
 
 from ...ui import (
@@ -13,13 +12,27 @@ from ...ui import (
     clear_screen,
 )
 from ...editor_engine.main_e import e_main
-from ...encryption import encrypt_file, decrypt_file
+from ...template_engine import render_template, render_many
+from ...editor_engine.documents import MemoryDocument
+from ...picker import pick
+from ...shell import Menu
+from .catalog import sync_catalogs
+from .search_index import mission_index
+from .manifest import mission_manifest, describe
+from .records import new_record, encode_record, decode_record, edited_payload
+from ...encryption import read_encrypted, write_encrypted, encrypt_data_to_file, lock_keyring
 from configs import config
 
 # Global Constants
 MISSION_DIR = config.MISSION_DIR
 MISSION_LOG_TEMPLATE_PATH = config.MISSION_LOG_TEMPLATE_PATH
 
+# Encrypted catalogs kept in step with every write, edit and delete
+CATALOGS = (mission_index, mission_manifest)
+
+# Highest file name counter handed out per timestamp this session
+_last_counter = {}
+
 # Initialize KeyBindings
 bindings = KeyBindings()
 
@@ -33,16 +46,13 @@ def get_user_list_input(prompt_text):
         items.append(item)
     return items
 
-def render_mission_log_template(output_filepath, mission_data):
-    """Render and save the mission log using the Jinja2 template."""
-    with open(MISSION_LOG_TEMPLATE_PATH, "r") as template_file:
-        mission_template = template_file.read()
-
-    template = Template(mission_template)
-    rendered_mission_log = template.render(mission_data)
+def render_mission_log_template(mission_data):
+    """Render the mission log with the Jinja2 template and return the text."""
+    return render_template(MISSION_LOG_TEMPLATE_PATH, mission_data)
 
-    with open(output_filepath, "w") as file:
-        file.write(rendered_mission_log)
+def render_mission_logs(mission_records):
+    """Render many mission records with one compiled template, yielding each text."""
+    return render_many(MISSION_LOG_TEMPLATE_PATH, mission_records)
 
 def collect_mission_data():
     """Collect mission details from the user."""
@@ -62,70 +72,30 @@ def collect_mission_data():
     
     return mission_data
 
-def mission():
-    """Main menu to write, edit, search, or delete mission logs."""
-    clear_screen()
-    options = [
-        "1: Write Mission Log", 
-        "2: Read / Edit Mission Log", 
-        "3: Search Mission Logs", 
-        "4: Delete Mission Log"
-    ]
-
-    choice = questionary.select(
-        "Choose an action:",
-        choices=options,
-        style=questionary.Style([
-            ('qmark', 'fg:#E91E63 bold'),
-            ('question', 'fg:#673AB7 bold'),
-            ('answer', 'fg:#2196F3 bold'),
-            ('pointer', 'fg:#03A9F4 bold'),
-            ('highlighted', 'fg:#03A9F4 bold'),
-            ('selected', 'fg:#4CAF50 bold'),
-            ('separator', 'fg:#E0E0E0'),
-            ('instruction', 'fg:#9E9E9E'),
-            ('text', 'fg:#FFFFFF'),
-            ('disabled', 'fg:#757575 italic')
-        ])
-    ).ask()
-
-    if choice == options[0]:
-        write_mission_log()
-    elif choice == options[1]:
-        edit_existing_mission_log()
-    elif choice == options[2]:
-        search_mission_logs() # TODO: Not working
-    elif choice == options[3]:
-        delete_mission_log()
+def lock_mission_logs():
+    """Forget the cached mission log password and the decrypted catalogs."""
+    lock_keyring()
+    for catalog in CATALOGS:
+        catalog.forget()
+    display_panel("Mission log password forgotten.", title="Locked", style="bold green")
 
 def edit_existing_mission_log():
     """Allow the user to select and edit an existing mission log."""
     clear_screen()
     try:
-        files = [f for f in os.listdir(MISSION_DIR) if os.path.isfile(os.path.join(MISSION_DIR, f))]
+        # One manifest decrypt instead of one per log
+        sync_catalogs(*CATALOGS)
+        files = [
+            (describe(name, entry), name)
+            for name, entry in mission_manifest.listing()
+        ]
         if not files:
             display_error_message("No mission logs found.")
             return
 
-        selected_file = questionary.select(
-            "Select a mission log to edit:",
-            choices=files,
-            style=questionary.Style([
-                ('qmark', 'fg:#E91E63 bold'),
-                ('question', 'fg:#673AB7 bold'),
-                ('answer', 'fg:#2196F3 bold'),
-                ('pointer', 'fg:#03A9F4 bold'),
-                ('highlighted', 'fg:#03A9F4 bold'),
-                ('selected', 'fg:#4CAF50 bold'),
-                ('separator', 'fg:#E0E0E0'),
-                ('instruction', 'fg:#9E9E9E'),
-                ('text', 'fg:#FFFFFF'),
-                ('disabled', 'fg:#757575 italic')
-            ])
-        ).ask()
+        selected_file = pick("Select a mission log to edit:", files)
 
         if selected_file:
-            decrypt_file(os.path.join(MISSION_DIR, selected_file))
             edit_mission_log(selected_file)
 
     except Exception as e:
@@ -136,33 +106,53 @@ def edit_mission_log(filename):
     """Use the custom editor engine to edit a mission log."""
     try:
         file_path = os.path.join(MISSION_DIR, filename)
-        e_main(file_path)
-        display_panel("Enter new password", title="Encrypt", style="bold green")
-        encrypt_file(file_path)
+        data, key, salt = read_encrypted(file_path)
+        record, text = decode_record(data)
+        # Loaded up front: saves run while the editor owns the terminal
+        for catalog in CATALOGS:
+            catalog.load()
+
+        def save(text):
+            nonlocal record
+            payload, record = edited_payload(record, text)
+            write_encrypted(file_path, payload, key, salt)
+            for catalog in CATALOGS:
+                catalog.update(filename, record, text)
+
+        # Decrypted into RAM and re-encrypted on every save with the same key,
+        # so the plaintext never reaches the disk
+        document = MemoryDocument(text, save, name=filename)
+        e_main(document=document)
     except Exception as e:
         logging.error(f"Error editing mission log '{filename}': {e}")
         display_error_message("Failed to edit mission log.")
 
+def find_mission_logs(keywords):
+    """[(name, manifest entry)] of the logs matching `keywords`."""
+    # Only logs changed outside the app since the last search are decrypted
+    sync_catalogs(*CATALOGS)
+    return [(name, mission_manifest.files.get(name)) for name in mission_index.search(keywords)]
+
+def list_mission_logs(sort='newest'):
+    """[(name, manifest entry)] of every mission log, in `sort` order."""
+    sync_catalogs(*CATALOGS)
+    return mission_manifest.listing(sort)
+
 def search_mission_logs():
     """Search for mission logs containing a specific keyword."""
     clear_screen()
-    keyword = questionary.text("Enter a keyword to search for:").ask()
+    keyword = questionary.text("Enter keywords to search for (end a word with * to match a prefix):").ask()
+    if not keyword:
+        return
 
     try:
-        files = [f for f in os.listdir(MISSION_DIR) if os.path.isfile(os.path.join(MISSION_DIR, f))]
-        matching_files = []
-
-        for file in files:
-            decrypt_file(os.path.join(MISSION_DIR, file))
-            with open(os.path.join(MISSION_DIR, file), "r") as f:
-                content = f.read()
-                if keyword.lower() in content.lower():
-                    matching_files.append(file)
-        
-        if not matching_files:
+        matches = find_mission_logs(keyword)
+
+        if not matches:
             display_error_message("No matching mission logs found.")
         else:
-            display_panel("\n".join(matching_files), title="Search Results", style="bold green")
+            results = [describe(name, entry) for name, entry in matches]
+            display_panel("\n".join(results), title="Search Results", style="bold green")
 
     except Exception as e:
         logging.error(f"Error searching mission logs: {e}")
@@ -172,30 +162,22 @@ def delete_mission_log():
     """Delete a selected mission log."""
     clear_screen()
     try:
-        files = [f for f in os.listdir(MISSION_DIR) if os.path.isfile(os.path.join(MISSION_DIR, f))]
+        # One manifest decrypt instead of one per log
+        sync_catalogs(*CATALOGS)
+        files = [
+            (describe(name, entry), name)
+            for name, entry in mission_manifest.listing()
+        ]
         if not files:
             display_error_message("No mission logs found.")
             return
 
-        selected_file = questionary.select(
-            "Select a mission log to delete:",
-            choices=files,
-            style=questionary.Style([
-                ('qmark', 'fg:#E91E63 bold'),
-                ('question', 'fg:#673AB7 bold'),
-                ('answer', 'fg:#2196F3 bold'),
-                ('pointer', 'fg:#03A9F4 bold'),
-                ('highlighted', 'fg:#03A9F4 bold'),
-                ('selected', 'fg:#4CAF50 bold'),
-                ('separator', 'fg:#E0E0E0'),
-                ('instruction', 'fg:#9E9E9E'),
-                ('text', 'fg:#FFFFFF'),
-                ('disabled', 'fg:#757575 italic')
-            ])
-        ).ask()
+        selected_file = pick("Select a mission log to delete:", files)
 
         if selected_file:
             os.remove(os.path.join(MISSION_DIR, selected_file))
+            for catalog in CATALOGS:
+                catalog.remove(selected_file)
             display_panel(f"Mission log '{selected_file}' deleted.", title="Delete Confirmation", style="bold red")
 
     except Exception as e:
@@ -207,13 +189,52 @@ def write_mission_log():
     display_panel("Mission Log", title="Log Your Mission", style="bold green")
 
     mission_details = collect_mission_data()
-
-    filepath = generate_mission_log_filepath()
-    render_mission_log_template(filepath, mission_details)
-    encrypt_file(filepath)
-
-def generate_mission_log_filepath():
-    """Generate a unique file path for the new mission log."""
-    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    for _ in save_mission_logs([mission_details]):
+        pass
+
+def save_mission_logs(missions):
+    """
+    Encrypt and store each mission's data as a new log, yielding
+    (filename, record) as each one is written. The catalogs are saved once
+    when the batch ends (or stops early), not once per log. The catalogs are
+    loaded first, so a wrong password fails before any log is written.
+    """
+    sync_catalogs(*CATALOGS)
+    saved = []
+    try:
+        for mission_data in missions:
+            # Only the structured record is stored; the text is rendered when needed
+            record = new_record(mission_data)
+            filepath = generate_mission_log_filepath(record['created'])
+            encrypt_data_to_file(filepath, encode_record(record))
+            saved.append((os.path.basename(filepath), record))
+            yield saved[-1]
+    finally:
+        if saved:
+            texts = render_mission_logs([record for _, record in saved])
+            items = [(name, record, text) for (name, record), text in zip(saved, texts)]
+            for catalog in CATALOGS:
+                catalog.update_many(items)
+
+def generate_mission_log_filepath(created=None):
+    """Generate a unique file path for a new mission log created at `created` (ISO time, default now)."""
+    moment = datetime.fromisoformat(created) if created else datetime.now()
+    timestamp = moment.strftime("%Y-%m-%d_%H-%M-%S")
     filename = f"{MISSION_DIR}/mission_log_{timestamp}.txt"
+    # Logs written within the same second (imports) get a counter; the last
+    # one used is remembered so a batch does not probe every taken name again
+    count = _last_counter.get(timestamp, 1)
+    while os.path.exists(filename):
+        count += 1
+        filename = f"{MISSION_DIR}/mission_log_{timestamp}_{count}.txt"
+    _last_counter[timestamp] = count
     return filename
+
+MISSION_MENU = Menu("Missions", [
+    ("1: Write Mission Log", write_mission_log),
+    ("2: Read / Edit Mission Log", edit_existing_mission_log),
+    ("3: Search Mission Logs", search_mission_logs),
+    ("4: Delete Mission Log", delete_mission_log),
+    ("5: Lock Mission Logs", lock_mission_logs),
+    ("6: Bulk Operations", 'modules.custom_modules.mission.bulk_operations:bulk_operations_menu'),
+])
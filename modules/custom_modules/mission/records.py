@@ -0,0 +1,139 @@
+import re
+import json
+import struct
+from datetime import datetime
+
+from ...template_engine import render_template
+from configs import config
+
+MISSION_LOG_TEMPLATE_PATH = config.MISSION_LOG_TEMPLATE_PATH
+
+# Decrypted payload of a structured log: MAGIC, then version and JSON length,
+# the JSON record, and (only once the text was edited by hand) the text itself.
+# Payloads without MAGIC are plain rendered text from older versions.
+MAGIC = b'ALLCLI-REC'
+VERSION = 1
+LENGTH = struct.Struct('<BI')
+
+FIELDS = {
+    'Mission Name': 'mission_name',
+    'Date': 'date',
+    'Objective': 'objective',
+    'Tasks': 'tasks',
+    'Challenges': 'challenges',
+    'Outcome': 'outcome',
+    'Next Steps': 'next_steps',
+}
+LIST_FIELDS = ('tasks', 'challenges')
+FIELD_RE = re.compile(r'^\**\s*(' + '|'.join(FIELDS) + r')\s*:\**\s*(.*)$')
+NAME_TIME_RE = re.compile(r'(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})')
+
+
+def new_record(mission_data):
+    """Return the stored record for freshly collected (or imported) `mission_data`."""
+    return dict(mission_data, created=mission_data.get('created') or datetime.now().isoformat(timespec='seconds'))
+
+
+def record_from_json(data):
+    """
+    Return the mission data in an imported JSON object: the known fields,
+    missing ones blank, and the date and time taken from `created` (default
+    now) unless given. Raises ValueError for anything else.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("a mission record must be a JSON object")
+    record = {'mission_name': '', 'date': '', 'time': '', 'objective': '',
+              'tasks': [], 'challenges': [], 'outcome': '', 'next_steps': ''}
+    for field in record:
+        value = data.get(field)
+        if value is None:
+            continue
+        if field in LIST_FIELDS:
+            if not isinstance(value, list):
+                raise ValueError(f"'{field}' must be a list")
+            record[field] = [str(item) for item in value]
+        else:
+            record[field] = str(value)
+    moment = datetime.fromisoformat(str(data['created'])) if data.get('created') else datetime.now()
+    record['created'] = moment.isoformat(timespec='seconds')
+    # As the menus fill them in when a mission is logged
+    record['date'] = record['date'] or moment.strftime("%B %d, %Y")
+    record['time'] = record['time'] or moment.strftime("%I:%M %p")
+    return record
+
+
+def render_record(record):
+    """Render a record as the mission log text."""
+    return render_template(MISSION_LOG_TEMPLATE_PATH, record)
+
+
+def parse_mission_log(text):
+    """
+    Rebuild a record from mission log text rendered from the template,
+    tolerating hand edits and missing bold. Only needed for logs written
+    before records existed and for text edited in the editor.
+    """
+    record = {'mission_name': '', 'date': '', 'time': '', 'objective': '',
+              'tasks': [], 'challenges': [], 'outcome': '', 'next_steps': ''}
+    field = None
+    for line in text.splitlines():
+        line = line.strip()
+        match = FIELD_RE.match(line)
+        if match:
+            field, value = FIELDS[match.group(1)], match.group(2).strip()
+            if field == 'date':
+                date, _, time = value.partition('Time:')
+                record['date'] = date.replace('**|**', '').strip(' *|')
+                record['time'] = time.strip(' *')
+            elif field not in LIST_FIELDS:
+                record[field] = value
+        elif not line or line == '---' or line.startswith('==') or field is None:
+            continue
+        elif field in LIST_FIELDS:
+            if line.startswith('- '):
+                record[field].append(line[2:].strip())
+        elif field != 'date':
+            record[field] = f"{record[field]}\n{line}" if record[field] else line
+    return record
+
+
+def encode_record(record, text=None):
+    """Pack `record` (plus hand-edited `text`, if any) into a log payload."""
+    body = json.dumps(record, separators=(',', ':')).encode()
+    payload = MAGIC + LENGTH.pack(VERSION, len(body)) + body
+    return payload + text.encode() if text is not None else payload
+
+
+def decode_record(data):
+    """
+    Return (record, text) for a decrypted log payload. Text is rendered from
+    the record unless it was edited by hand; old text-only logs are parsed.
+    """
+    if not data.startswith(MAGIC):
+        text = data.decode()
+        return parse_mission_log(text), text
+    version, length = LENGTH.unpack_from(data, len(MAGIC))
+    if version != VERSION:
+        raise ValueError(f"unsupported mission record version {version}")
+    start = len(MAGIC) + LENGTH.size
+    record = json.loads(data[start:start + length])
+    text = data[start + length:]
+    return record, text.decode() if text else render_record(record)
+
+
+def edited_payload(record, text):
+    """
+    Return (payload, record) for `text` saved from the editor over a log
+    that had `record`: fields are re-read from the text, and the text is
+    kept verbatim only when it is not exactly what the template renders.
+    """
+    updated = dict(parse_mission_log(text), created=record.get('created'))
+    return encode_record(updated, None if render_record(updated) == text.rstrip('\n') else text), updated
+
+
+def created_from_name(name):
+    """Creation time carried in a log file name, for logs without a record timestamp."""
+    match = NAME_TIME_RE.search(name)
+    if not match:
+        return None
+    return datetime.strptime(match.group(1), "%Y-%m-%d_%H-%M-%S").isoformat(timespec='seconds')
@@ -0,0 +1,99 @@
+import os
+import re
+import hmac
+import hashlib
+
+from .catalog import LogCatalog
+from configs import config
+
+MISSION_DIR = config.MISSION_DIR
+# Kept next to (not in) the log directory so it never shows up as a log
+INDEX_PATH = MISSION_DIR.rstrip('/') + '.index'
+# Shortest prefix that can be searched with "pre*"
+MIN_PREFIX = 2
+TOKEN_RE = re.compile(r'\w+')
+# Terms kept in the token cache; a long-running daemon would otherwise grow it forever
+TOKEN_CACHE_SIZE = 100_000
+
+
+class MissionIndex(LogCatalog):
+    """
+    Encrypted inverted index over the words of every mission log.
+
+    Words are stored only as truncated HMACs under a random token key that
+    lives inside the encrypted index file, and every prefix of a word is
+    indexed as well, so keyword and "prefix*" queries are a few dictionary
+    lookups.
+    """
+
+    def __init__(self, path=INDEX_PATH, directory=MISSION_DIR):
+        super().__init__(path, directory)
+
+    def _loaded(self, payload):
+        self.token_key = bytes.fromhex(payload['token_key']) if 'token_key' in payload else os.urandom(32)
+        self.postings = {}
+        # Words recur across logs, so a batch of writes hashes each one once
+        self.token_cache = {}
+
+    def _payload(self):
+        return dict(super()._payload(), token_key=self.token_key.hex())
+
+    def forget(self):
+        super().forget()
+        self.postings = self.token_key = self.token_cache = None
+
+    def _token(self, kind, word):
+        term = f'{kind}:{word}'
+        token = self.token_cache.get(term)
+        if token is None:
+            if len(self.token_cache) >= TOKEN_CACHE_SIZE:
+                self.token_cache.clear()
+            token = self.token_cache[term] = hmac.new(self.token_key, term.encode(), hashlib.sha256).hexdigest()[:16]
+        return token
+
+    def _tokens(self, text):
+        tokens = set()
+        for word in set(TOKEN_RE.findall(text.lower())):
+            tokens.add(self._token('w', word))
+            for end in range(MIN_PREFIX, len(word) + 1):
+                tokens.add(self._token('p', word[:end]))
+        return tokens
+
+    def _entry(self, name, record, text):
+        return {'tokens': sorted(self._tokens(text))}
+
+    def _store(self, name, entry):
+        super()._store(name, entry)
+        for token in entry['tokens']:
+            self.postings.setdefault(token, set()).add(name)
+
+    def _remove(self, name):
+        entry = super()._remove(name)
+        for token in entry['tokens'] if entry else ():
+            names = self.postings.get(token)
+            names.discard(name)
+            if not names:
+                del self.postings[token]
+        return entry
+
+    def search(self, query):
+        """
+        Return the sorted names of logs containing every word of `query`.
+        A trailing '*' on a word matches it as a prefix.
+        """
+        names = None
+        for word in query.lower().split():
+            parts = TOKEN_RE.findall(word)
+            for position, part in enumerate(parts):
+                if word.endswith('*') and position == len(parts) - 1:
+                    if len(part) < MIN_PREFIX:
+                        continue
+                    token = self._token('p', part)
+                else:
+                    token = self._token('w', part)
+                found = self.postings.get(token, set())
+                names = found if names is None else names & found
+        return sorted(names or ())
+
+
+mission_index = MissionIndex()
@@ -0,0 +1,501 @@
+"""
+Optional background daemon that keeps the app warm: modules imported, the
+password and derived keys cached, the mission catalogs decrypted, directory
+listings and compiled templates in memory. `python main.py <command>` hands
+the command to it over a Unix socket when it is running, and runs it in its
+own process otherwise.
+
+Both directions are frames of a one-byte kind, a 4-byte big-endian length
+and the payload:
+
+    client -> daemon   k  password (optional, first)
+                       a  the arguments, NUL-separated
+                       i  stdin data       z  end of stdin
+                       t  stdin is a terminal (instead of i / z)
+                       r  answer to a password prompt
+    daemon -> client   o  stdout data      e  stderr data
+                       p  password prompt  x  exit status (4-byte int)
+                       n  run the command in the client instead
+
+This module is imported by every forwarded command, so the client side
+sticks to a few small standard modules (no json, no typer).
+"""
+import os
+import sys
+import time
+import socket
+import struct
+import threading
+
+from configs import config
+
+SOCKET_PATH = config.DAEMON_SOCKET_PATH
+LOCK_AFTER = config.DAEMON_LOCK_AFTER
+CLIENT_TIMEOUT = config.DAEMON_CLIENT_TIMEOUT
+# Seconds a client has to send its command line after connecting
+REQUEST_TIMEOUT = 2.0
+FRAME = struct.Struct('>cI')
+STATUS = struct.Struct('>i')
+# Most bytes of stdin or output per frame
+CHUNK_SIZE = 64 * 1024
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'main.py')
+
+# The Daemon serving in this process, if any
+server = None
+
+
+def send_frame(sock, kind, payload=b''):
+    sock.sendall(FRAME.pack(kind, len(payload)) + payload)
+
+
+def read_frame(file):
+    """(kind, payload) read from a socket file; (None, b'') once the peer is gone."""
+    try:
+        header = file.read(FRAME.size)
+        if len(header) < FRAME.size:
+            return None, b''
+        kind, size = FRAME.unpack(header)
+        payload = file.read(size)
+    except OSError:
+        return None, b''
+    return (kind, payload) if len(payload) == size else (None, b'')
+
+
+class _SocketFrames:
+    """
+    Frames read straight from a socket with a timeout. Unlike a socket file,
+    it can be read again after a timeout, which is raised as socket.timeout.
+    """
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.data = bytearray()
+
+    def _fill(self, size):
+        while len(self.data) < size:
+            chunk = self.sock.recv(max(CHUNK_SIZE, size - len(self.data)))
+            if not chunk:
+                raise ConnectionResetError
+            self.data += chunk
+
+    def read(self):
+        """(kind, payload), or (None, b'') once the peer is gone."""
+        try:
+            self._fill(FRAME.size)
+            kind, size = FRAME.unpack_from(self.data)
+            self._fill(FRAME.size + size)
+        except socket.timeout:
+            raise
+        except OSError:
+            return None, b''
+        payload = bytes(self.data[FRAME.size:FRAME.size + size])
+        del self.data[:FRAME.size + size]
+        return kind, payload
+
+
+def connect(path=SOCKET_PATH):
+    """A connection to the running daemon, or None if there is none."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        # No socket file, or a stale one left by a daemon that was killed
+        sock.close()
+        return None
+    return sock
+
+
+def forward(argv, stdin=None, stdout=None, stderr=None, path=SOCKET_PATH):
+    """
+    Run a command line in the daemon, streaming stdin to it and its output
+    back. Returns the exit status, or None when there is no daemon or the
+    command reads terminal input, which is not forwarded: the caller then
+    runs it itself. Password prompts are asked here.
+    """
+    sock = connect(path)
+    if sock is None:
+        return None
+    stdin = stdin or sys.stdin.buffer
+    stdout = stdout or sys.stdout.buffer
+    stderr = stderr or sys.stderr.buffer
+    sending = threading.Lock()
+
+    def send(kind, payload=b''):
+        with sending:
+            send_frame(sock, kind, payload)
+
+    try:
+        # Read below the buffered file: the thread may still be waiting on a
+        # pipe when this process exits, and must not hold the stdin lock then
+        descriptor = stdin.fileno()
+        read = lambda: os.read(descriptor, CHUNK_SIZE)
+    except OSError:
+        read = lambda: stdin.read1(CHUNK_SIZE)
+
+    def pump():
+        try:
+            if stdin.isatty():
+                send(b't')
+            else:
+                for chunk in iter(read, b''):
+                    send(b'i', chunk)
+                send(b'z')
+        except OSError:
+            pass  # The daemon has finished the command and hung up
+
+    try:
+        password = os.environ.get(config.PASSWORD_ENV)
+        if password:
+            send(b'k', password.encode())
+        send(b'a', b'\0'.join(os.fsencode(arg) for arg in argv))
+        threading.Thread(target=pump, daemon=True).start()
+        replies = sock.makefile('rb')
+        while True:
+            kind, payload = read_frame(replies)
+            if kind == b'o':
+                try:
+                    stdout.write(payload)
+                    stdout.flush()
+                except BrokenPipeError:
+                    # The reader (head, grep -m ...) is done; hanging up stops the command
+                    if stdout is sys.stdout.buffer:
+                        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+                    return 1
+            elif kind == b'e':
+                stderr.write(payload)
+                stderr.flush()
+            elif kind == b'p':
+                import getpass
+                send(b'r', getpass.getpass(prompt=payload.decode()).encode())
+            elif kind == b'x':
+                return STATUS.unpack(payload)[0]
+            elif kind == b'n':
+                return None
+            else:
+                stderr.write(b"allcli: error: the daemon closed the connection\n")
+                return 1
+    finally:
+        sock.close()
+
+
+def start(timeout=10.0):
+    """Launch `main.py daemon run` in the background; returns its pid once it answers."""
+    import subprocess
+    process = subprocess.Popen(
+        [sys.executable, MAIN, 'daemon', 'run'], stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        sock = connect()
+        if sock:
+            sock.close()
+            return process.pid
+        if process.poll() is not None:
+            raise RuntimeError(f"the daemon exited with status {process.returncode}; see the error log")
+        time.sleep(0.02)
+    raise RuntimeError("the daemon did not start in time")
+
+
+def _frame_output(send, kind, line_buffering=False):
+    """A text stream whose writes become `kind` frames."""
+    import io
+
+    class FrameWriter(io.RawIOBase):
+        def writable(self):
+            return True
+
+        def write(self, data):
+            send(kind, bytes(data))
+            return len(data)
+
+    return io.TextIOWrapper(io.BufferedWriter(FrameWriter(), CHUNK_SIZE), encoding='utf-8',
+                            errors='replace', line_buffering=line_buffering)
+
+
+class TerminalInput(Exception):
+    """A forwarded command read stdin while the client's stdin is a terminal."""
+
+
+# Put on the stdin queue when the client's stdin is a terminal
+TERMINAL = object()
+
+
+def _frame_input(chunks, timeout):
+    """
+    A text stream reading the stdin frames put on the queue `chunks` (None
+    ends it); waiting more than `timeout` seconds for the next one is an
+    error, and so is reading once TERMINAL was queued.
+    """
+    import io
+    import queue
+
+    class FrameReader(io.RawIOBase):
+        pending = b''
+        ended = False
+
+        def readable(self):
+            return True
+
+        def readinto(self, buffer):
+            while not self.pending and not self.ended:
+                try:
+                    chunk = chunks.get(timeout=timeout)
+                except queue.Empty:
+                    raise TimeoutError(f"no input from the client for {timeout:g} seconds")
+                if chunk is TERMINAL:
+                    raise TerminalInput()
+                self.ended = chunk is None
+                self.pending = chunk or b''
+            size = min(len(buffer), len(self.pending))
+            buffer[:size] = self.pending[:size]
+            self.pending = self.pending[size:]
+            return size
+
+    return io.TextIOWrapper(io.BufferedReader(FrameReader(), CHUNK_SIZE), encoding='utf-8', errors='replace')
+
+
+class Daemon:
+    """
+    Serves command lines from the socket one at a time in this process, so
+    whatever one command decrypted, listed or compiled is ready for the next.
+    After `lock_after` seconds without a request the password, keys and
+    decrypted catalogs are forgotten. Only the user running the daemon can
+    connect: the socket is private to them and peers are checked. A client
+    that stops sending or reading is dropped after `client_timeout` seconds
+    (at most `lock_after`), so it cannot hold up the others or the lock.
+    """
+
+    def __init__(self, path=SOCKET_PATH, lock_after=LOCK_AFTER, client_timeout=CLIENT_TIMEOUT):
+        self.path = path
+        self.lock_after = lock_after
+        self.client_timeout = min(client_timeout, lock_after)
+        self.started = time.time()
+        self.last_request = time.monotonic()
+        self.requests = 0
+        self.stopping = False
+
+    def warm(self):
+        """Import the commands and build the listings and templates before the first request."""
+        import typer
+        from .cli import app
+        from .custom_modules.journal import journals
+        from .custom_modules.mission import mission_logs, bulk_operations  # noqa: F401
+        from .template_engine import get_template
+        from .dir_manifest import get_manifest, first_line_title
+        get_template(config.MISSION_LOG_TEMPLATE_PATH)
+        get_manifest(config.MISSION_DIR).refresh()
+        get_manifest(config.JOURNAL_DIRECTORY, title=first_line_title).refresh()
+        if journals.USE_JOURNAL_DB:
+            journals.get_store()
+        # typer builds the click command tree on every call; build it once
+        self.command = typer.main.get_command(app)
+
+    def lock(self):
+        """Forget the password, the derived keys and the decrypted catalogs."""
+        from .encryption import lock_keyring
+        from .custom_modules.mission.mission_logs import CATALOGS
+        lock_keyring()
+        for catalog in CATALOGS:
+            catalog.forget()
+
+    def _lock_timeout(self):
+        """Seconds until the auto-lock is due (0 or less: now), or None while there is nothing to lock."""
+        from .encryption import keyring
+        from .custom_modules.mission.mission_logs import CATALOGS
+        if keyring.password is None and not any(catalog.loaded for catalog in CATALOGS):
+            return None
+        return self.last_request + self.lock_after - time.monotonic()
+
+    def status(self):
+        from .encryption import keyring
+        return {
+            'running': True,
+            'pid': os.getpid(),
+            'uptime': round(time.time() - self.started),
+            'requests': self.requests,
+            'locked': keyring.locked,
+        }
+
+    def _listen(self):
+        sock = connect(self.path)
+        if sock:
+            sock.close()
+            raise RuntimeError(f"a daemon is already running on '{self.path}'")
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Created 0600: the daemon holds the unlocked keys
+        umask = os.umask(0o177)
+        try:
+            sock.bind(self.path)
+        finally:
+            os.umask(umask)
+        sock.listen(16)
+        return sock
+
+    def _same_user(self, conn):
+        if not hasattr(socket, 'SO_PEERCRED'):
+            return True
+        _, uid, _ = struct.unpack('3i', conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i')))
+        return uid == os.getuid()
+
+    def serve(self):
+        """Answer requests until `daemon stop` or SIGTERM."""
+        import signal
+        import logging
+        global server
+        sock = self._listen()
+        server = self
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        logging.info(f"Daemon {os.getpid()} listening on '{self.path}'.")
+        try:
+            self.warm()
+            while not self.stopping:
+                timeout = self._lock_timeout()
+                # Never 0, which would make accept() non-blocking
+                sock.settimeout(None if timeout is None else max(0.01, timeout))
+                try:
+                    conn, _ = sock.accept()
+                except socket.timeout:
+                    conn = None
+                if conn:
+                    with conn:
+                        try:
+                            if self._same_user(conn) and self.handle(conn):
+                                self.requests += 1
+                                self.last_request = time.monotonic()
+                        except Exception as e:
+                            # One broken request must not take the daemon down
+                            logging.error(f"Daemon request failed: {e}", exc_info=True)
+                        try:
+                            # Wakes the thread still reading from the client
+                            conn.shutdown(socket.SHUT_RDWR)
+                        except OSError:
+                            pass
+                # Checked after every connection too, so a stream of them cannot postpone it
+                timeout = self._lock_timeout()
+                if timeout is not None and timeout <= 0:
+                    self.lock()
+                    logging.info("Daemon locked after inactivity.")
+        finally:
+            server = None
+            sock.close()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            logging.info(f"Daemon {os.getpid()} stopped.")
+
+    def handle(self, conn):
+        """
+        Run one forwarded command line with its stdin, output and prompts on
+        `conn`. Returns False when the client sent no command line in time.
+        """
+        import queue
+        import logging
+        from .encryption import keyring
+
+        conn.settimeout(min(REQUEST_TIMEOUT, self.client_timeout))
+        frames = _SocketFrames(conn)
+        try:
+            kind, payload = frames.read()
+            password = None
+            if kind == b'k':
+                password = payload.decode()
+                kind, payload = frames.read()
+        except socket.timeout:
+            return False
+        if kind != b'a':
+            return False
+        argv = [os.fsdecode(arg) for arg in payload.split(b'\0')]
+        # From here the timeout bounds each send to a client that stopped
+        # reading; stdin and prompt replies time out on their queues
+        conn.settimeout(self.client_timeout)
+        chunks, replies = queue.Queue(), queue.Queue()
+        sending = threading.Lock()
+        failed = []
+        sent = set()
+
+        def send(kind, payload=b''):
+            with sending:
+                if failed:
+                    # Do not wait out the timeout again for every later write
+                    raise failed[0]
+                try:
+                    send_frame(conn, kind, payload)
+                except OSError as e:
+                    failed.append(e)
+                    raise
+                sent.add(kind)
+
+        def receive():
+            # Stdin is queued in memory, so a prompt's answer never waits behind it
+            while True:
+                try:
+                    kind, payload = frames.read()
+                except socket.timeout:
+                    continue  # A quiet client, e.g. one waiting for output
+                if kind == b'i':
+                    chunks.put(payload)
+                elif kind == b'z':
+                    chunks.put(None)
+                elif kind == b't':
+                    chunks.put(TERMINAL)
+                elif kind == b'r':
+                    replies.put(payload.decode())
+                elif kind is None:
+                    chunks.put(None)
+                    replies.put(None)
+                    return
+
+        def ask(prompt="Password: "):
+            sys.stdout.flush()
+            send(b'p', prompt.encode())
+            try:
+                answer = replies.get(timeout=self.client_timeout)
+            except queue.Empty:
+                raise EOFError(f"no answer to the password prompt for {self.client_timeout:g} seconds")
+            if answer is None:
+                raise EOFError("the client closed the connection")
+            return answer
+
+        threading.Thread(target=receive, daemon=True).start()
+        streams = sys.stdin, sys.stdout, sys.stderr
+        sys.stdin = _frame_input(chunks, self.client_timeout)
+        sys.stdout = _frame_output(send, b'o')
+        sys.stderr = _frame_output(send, b'e', line_buffering=True)
+        keyring.ask = ask
+        status = 1
+        try:
+            if password:
+                keyring.use_password(password)
+            self.command.main(args=argv, prog_name='allcli')
+            status = 0
+        except SystemExit as e:
+            status = e.code if isinstance(e.code, int) else int(e.code is not None)
+        except TerminalInput:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            if sent & {b'o', b'e'}:
+                sys.stderr.write("allcli: error: this command reads stdin; pipe its input in or stop the daemon\n")
+            else:
+                # Nothing was printed yet: the client runs it and reads its own terminal
+                status = None
+        except Exception as e:
+            logging.error(f"Daemon request {argv} failed: {e}", exc_info=True)
+            sys.stderr.write(f"allcli: error: {e}\n")
+        finally:
+            try:
+                sys.stdout.flush()
+                sys.stderr.flush()
+            except OSError:
+                pass  # The client is gone
+            sys.stdin, sys.stdout, sys.stderr = streams
+            del keyring.ask
+        try:
+            if status is None:
+                send(b'n')
+            else:
+                send(b'x', STATUS.pack(status))
+        except OSError:
+            pass
+        return True
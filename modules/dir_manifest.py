@@ -0,0 +1,183 @@
+import os
+import re
+import json
+import logging
+import time
+import heapq
+import threading
+from datetime import datetime
+
+from .editor_engine.file_io import write_lines_atomic
+
+LISTING_VERSION = 1
+# Picker titles are cut to this many characters
+TITLE_LENGTH = 60
+# A directory mtime this recent may be followed by another change within the
+# same timestamp tick, so it is not trusted to mean "unchanged" later
+RACY_WINDOW_NS = 2 * 10**9
+NAME_TIME_RE = re.compile(r'(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})')
+
+
+def is_listed(name):
+    """Skip hidden files and the temp files of atomic saves."""
+    return not name.startswith('.') and not name.endswith('.tmp')
+
+
+def first_line_title(filepath):
+    """Title of a plain text file: its first non-blank line."""
+    with open(filepath, 'rb') as file:
+        head = file.read(4096).decode('utf-8', errors='replace')
+    for line in head.splitlines():
+        if line.strip():
+            return line.strip()[:TITLE_LENGTH]
+    return ''
+
+
+def _newest_key(item):
+    return item[1]['created'], item[0]
+
+
+def _created(name, stat):
+    """Creation time from the timestamp in the file name, else the mtime."""
+    match = NAME_TIME_RE.search(name)
+    if match:
+        return datetime.strptime(match.group(1), "%Y-%m-%d_%H-%M-%S").isoformat(timespec='seconds')
+    return datetime.fromtimestamp(stat.st_mtime).isoformat(timespec='seconds')
+
+
+class DirectoryManifest:
+    """
+    Cached listing of one directory: name, size, mtime, created date and
+    (optionally) title per file, persisted next to the directory.
+
+    `refresh` stats only the directory while its mtime is unchanged; when it
+    moved, files are stat'ed and only new or changed ones are re-read for
+    their title. The app saves through temp files renamed into place, which
+    always bumps the directory mtime.
+    """
+
+    def __init__(self, directory, title=None, path=None):
+        self.directory = directory
+        self.title = title
+        self.path = path or directory.rstrip('/') + '.listing'
+        self.lock = threading.Lock()
+        self.entries = None
+        self.dir_mtime = None
+        self._newest = None
+        # Bumped whenever a refresh finds changed files, so callers can tell
+        # that nothing moved since they last looked
+        self.generation = 0
+
+    def _load(self):
+        self.entries, self.dir_mtime, self._newest = {}, None, None
+        try:
+            with open(self.path) as file:
+                payload = json.load(file)
+            if payload.get('version') == LISTING_VERSION and payload.get('titled') == bool(self.title):
+                # Rows are stored newest first, so a cold start skips the sort
+                self._newest = [
+                    (name, {'size': size, 'mtime': mtime, 'created': created, 'title': title})
+                    for name, size, mtime, created, title in payload['rows']
+                ]
+                self.entries, self.dir_mtime = dict(self._newest), payload['dir_mtime']
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError) as e:
+            logging.error(f"Rebuilding unreadable listing cache '{self.path}': {e}")
+
+    def _sorted(self):
+        if self._newest is None:
+            self._newest = sorted(self.entries.items(), key=_newest_key, reverse=True)
+        return self._newest
+
+    def _save(self):
+        payload = {
+            'version': LISTING_VERSION,
+            'titled': bool(self.title),
+            'dir_mtime': self.dir_mtime,
+            'rows': [
+                [name, entry['size'], entry['mtime'], entry['created'], entry['title']]
+                for name, entry in self._sorted()
+            ],
+        }
+        try:
+            write_lines_atomic(self.path, [json.dumps(payload, separators=(',', ':'))])
+        except OSError as e:
+            logging.error(f"Could not save listing cache '{self.path}': {e}")
+
+    def _scan(self):
+        """Stat every file; returns (entries, names of new or changed files)."""
+        entries = {}
+        fresh = []
+        with os.scandir(self.directory) as items:
+            for item in items:
+                if not is_listed(item.name) or not item.is_file():
+                    continue
+                stat = item.stat()
+                old = self.entries.get(item.name)
+                if old and old['size'] == stat.st_size and old['mtime'] == stat.st_mtime_ns:
+                    entries[item.name] = old
+                    continue
+                entries[item.name] = {
+                    'size': stat.st_size,
+                    'mtime': stat.st_mtime_ns,
+                    'created': _created(item.name, stat),
+                    'title': self.title(item.path) if self.title else None,
+                }
+                fresh.append(item.name)
+        return entries, fresh
+
+    def refresh(self):
+        """Bring the listing up to date; returns True if any file changed."""
+        with self.lock:
+            if self.entries is None:
+                self._load()
+            try:
+                # Read before scanning: a change during the scan shows up next time
+                dir_mtime = os.stat(self.directory).st_mtime_ns
+            except FileNotFoundError:
+                changed = bool(self.entries)
+                self.entries, self.dir_mtime, self._newest = {}, None, None
+                self.generation += changed
+                return changed
+            if dir_mtime == self.dir_mtime:
+                return False
+            entries, fresh = self._scan()
+            changed = bool(fresh) or len(entries) - len(fresh) != len(self.entries)
+            if changed and self._newest is not None:
+                # Merge the few changed files into the sorted list instead of re-sorting it
+                kept = [item for item in self._newest if entries.get(item[0]) is item[1]]
+                added = sorted(((name, entries[name]) for name in fresh), key=_newest_key, reverse=True)
+                self._newest = list(heapq.merge(kept, added, key=_newest_key, reverse=True))
+            self.entries = entries
+            self.generation += changed
+            trusted = dir_mtime if time.time_ns() - dir_mtime > RACY_WINDOW_NS else None
+            if changed or trusted != self.dir_mtime:
+                self.dir_mtime = trusted
+                self._save()
+            return changed
+
+    def names(self):
+        """Names of the files in the directory."""
+        self.refresh()
+        return set(self.entries)
+
+    def signature(self, name):
+        """[size, mtime_ns] of `name` as of the last refresh, or None."""
+        entry = self.entries.get(name) if self.entries else None
+        return [entry['size'], entry['mtime']] if entry else None
+
+    def listing(self):
+        """[(name, entry)] newest first; the sorted list is reused until something changes."""
+        self.refresh()
+        return self._sorted()
+
+
+_manifests = {}
+
+def get_manifest(directory, title=None):
+    """Return the shared manifest of `directory`, so every picker reuses one cache."""
+    key = os.path.abspath(directory)
+    if key not in _manifests:
+        _manifests[key] = DirectoryManifest(directory, title)
+    return _manifests[key]
@@ -0,0 +1,25 @@
+class MemoryDocument:
+    """
+    A document that lives only in memory.
+
+    The editor reads its initial text from `text` and hands the saved text to
+    `on_save` instead of writing a file, so callers such as the encrypted
+    mission logs can decrypt into RAM, edit, and encrypt straight back
+    without plaintext ever touching the disk. `name` is shown on the status
+    line.
+    """
+
+    def __init__(self, text, on_save, name='memory'):
+        self.text = text
+        self.on_save = on_save
+        self.name = name
+
+    def read(self):
+        return self.text
+
+    def write(self, lines):
+        """Join `lines` into the saved text, pass it to `on_save` and return the line count."""
+        lines = list(lines)
+        self.text = ''.join(line + '\n' for line in lines)
+        self.on_save(self.text)
+        return len(lines)
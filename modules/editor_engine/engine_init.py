@@ -1,9 +1,7 @@
 import sys
 import os
-import time
-from copy import deepcopy
-from rich import print as r_print
-from rich.panel import Panel
+import logging
+from concurrent.futures import ThreadPoolExecutor
 
 
 try:
@@ -17,35 +15,103 @@ except ImportError:
             print("Failed to install windows-curses:", e)
             sys.exit(1)
 
+from .text_buffer import TextBuffer
+from .mapped_source import MappedSource
+from .undo import UndoHistory
+from .renderer import ScreenRenderer
+from .input_reader import InputReader
+from .search import BufferSearch
+from .swap import SwapJournal
+from .file_io import ENCODING, ERRORS, write_lines_atomic, iter_snapshot_lines
+from configs import config
+
+# Terminal escape sequences for bracketed paste mode
+BRACKETED_PASTE_ON = '\x1b[?2004h'
+BRACKETED_PASTE_OFF = '\x1b[?2004l'
+PASTE_START = [27, ord('['), ord('2'), ord('0'), ord('0'), ord('~')]
+PASTE_END = [27, ord('['), ord('2'), ord('0'), ord('1'), ord('~')]
+# Seconds between pulls of newly indexed lines while a large file loads
+LOAD_POLL = 0.2
+# Seconds between checks on saves running in the background
+SAVE_POLL = 0.1
+RECOVER_PROMPT = "Unsaved changes from an earlier session were found. Recover them? (y/n)"
+
+
+def _is_text_key(key):
+    return 32 <= key < 127 or key in [10, 13]
+
+
+def _find_sequence(keys, sequence, start):
+    """Return the index of `sequence` in `keys` at or after `start`, or -1."""
+    try:
+        index = keys.index(sequence[0], start)
+        while keys[index:index + len(sequence)] != sequence:
+            index = keys.index(sequence[0], index + 1)
+        return index
+    except ValueError:
+        return -1
+
+
+def _decode_keys(keys):
+    """Turn raw key codes (UTF-8 bytes) back into text."""
+    return bytes(key for key in keys if key < 256).decode('utf-8', 'replace')
+
 
 
 class TerminalTextEditor:
-    def __init__(self, filepath=None):
-        self.filepath = filepath if filepath else 'noname.txt'
+    def __init__(self, filepath=None, swap=True, document=None):
+        self.document = document
+        self.filepath = document.name if document else filepath if filepath else 'noname.txt'
         self.mode = 'normal'
-        self.buffer = []
+        self.buffer = TextBuffer()
         self.yank_buffer = []
-        self.undo_buffer = []
-        self.undo_index = -1
         self.rows = 0
         self.cols = 0
         self.view_x, self.view_y, self.cursor_row, self.cursor_col = [0] * 4
         self.input_buffer = ''
-
-        if self.filepath:
+        self.message = ''
+        self.message_timer = None
+        self.reader = None
+        self.paste = None
+        self.pending_jump = None
+        self.saver = ThreadPoolExecutor(max_workers=1)
+        self.saves = []
+        self.save_requested = False
+        # False while the most recent save attempt has failed
+        self.last_save_ok = True
+
+        if self.document:
+            content = self.document.read()
+            content = content[:-1] if content.endswith('\n') else content
+            self.buffer = TextBuffer(content)
+        elif self.filepath:
             try:
-                with open(self.filepath) as file:
-                    content = file.read().split('\n')
-                    content = content[:-1] if len(content) > 1 else content
-                    for line in content:
-                        self.buffer.append([ord(c) for c in line])
+                if os.path.getsize(self.filepath) >= config.EDITOR_MMAP_THRESHOLD_BYTES:
+                    # Large files are mapped and indexed lazily instead of read up front
+                    self.buffer = TextBuffer(source=MappedSource(self.filepath))
+                else:
+                    # Only CRLF pairs become newlines, as in MappedSource
+                    with open(self.filepath, newline='', encoding=ENCODING, errors=ERRORS) as file:
+                        content = file.read().replace('\r\n', '\n')
+                        content = content[:-1] if content.endswith('\n') else content
+                        self.buffer = TextBuffer(content)
             except:
-                self.buffer.append([])
-        else:
-            self.buffer.append([])
-
-        self.undo_index += 1
-        self.undo_buffer.insert(self.undo_index, [deepcopy(self.buffer), [self.cursor_row, self.cursor_col]])
+                self.buffer = TextBuffer()
+
+        self.undo = UndoHistory(self.buffer, config.EDITOR_UNDO_LIMIT_BYTES)
+        self.search = BufferSearch(self.buffer)
+        self.search_query = ''
+        self.search_forward = True
+        self.search_origin = (0, 0)
+        self.last_search = ''
+        self.show_matches = False
+
+        # Journal edits next to the document so they survive a crash
+        self.swap = SwapJournal(self.filepath) if swap and not self.document else None
+        if self.swap and self.swap.recoverable():
+            self.mode = 'recover'
+        elif self.swap:
+            self.start_swap(keep=False)
 
     def run(self):
         curses.wrapper(self.main)
@@ -58,9 +124,16 @@ class TerminalTextEditor:
 
         self.rows, self.cols = screen.getmaxyx()
         self.rows -= 1
+        renderer = ScreenRenderer(screen, self.buffer)
+        renderer.resize(self.rows, self.cols)
+        self.reader = InputReader(screen)
+        sys.stdout.write(BRACKETED_PASTE_ON)
+        sys.stdout.flush()
+        if self.buffer.loading:
+            self.reader.call_later(LOAD_POLL, self.poll_loading)
+        self.reader.call_later(config.EDITOR_SWAP_INTERVAL, self.flush_swap)
 
         while True:
-            screen.move(0, 0)
             if self.cursor_row < self.view_y:
                 self.view_y = self.cursor_row
             if self.cursor_row >= self.view_y + self.rows:
@@ -69,229 +142,459 @@ class TerminalTextEditor:
                 self.view_x = self.cursor_col
             if self.cursor_col >= self.view_x + self.cols:
                 self.view_x = self.cursor_col - self.cols + 1
-            
-            for row in range(self.rows):
-                buffer_row = row + self.view_y
-                for col in range(self.cols):
-                    buffer_col = col + self.view_x
-                    try:
-                        screen.addch(row, col, self.buffer[buffer_row][buffer_col])
-                    except:
-                        pass 
-                screen.clrtoeol()
-                try:
-                    screen.addstr('\n') if buffer_row < len(self.buffer) else screen.addstr('~\n')
-                except:
-                    pass
-            
-            status = f"Mode: {self.mode} | File: '{self.filepath}' | Line: {self.cursor_row + 1}/{len(self.buffer)} ({int((self.cursor_row + 1) * 100 / len(self.buffer))}%) | Col: {self.cursor_col}"
-            screen.addstr(status)
-            screen.clrtoeol()
-            curses.curs_set(0)
-            screen.move(self.cursor_row - self.view_y, self.cursor_col - self.view_x)
-            curses.curs_set(1)
-            screen.refresh()
-
-            key = -1
-            while key == -1:
-                key = screen.getch()
-
-            if key == curses.KEY_RESIZE:
+
+            cursor = (self.cursor_row - self.view_y, self.cursor_col - self.view_x)
+            if self.mode == 'recover':
+                status = RECOVER_PROMPT
+            elif self.mode == 'search':
+                status = ('/' if self.search_forward else '?') + self.search_query
+                cursor = (self.rows, min(len(status), self.cols - 1))
+                if self.search.error:
+                    status += f"  [invalid pattern: {self.search.error}]"
+            else:
+                status = self.message or f"Mode: {self.mode} | File: '{self.filepath}' | Line: {self.cursor_row + 1}/{len(self.buffer)}{'+' if self.buffer.loading else ''} ({int((self.cursor_row + 1) * 100 / len(self.buffer))}%) | Col: {self.cursor_col}"
+            highlight = self.search if self.show_matches and self.search.regex else None
+            renderer.draw(self.view_y, self.view_x, status, cursor, highlight)
+
+            keys = self.reader.read_keys()
+            if not keys:
+                continue  # A timer fired; redraw and keep waiting
+
+            if curses.KEY_RESIZE in keys:
                 self.rows, self.cols = screen.getmaxyx()
                 self.rows -= 1
-                screen.refresh()
+                renderer.resize(self.rows, self.cols)
                 self.view_y = 0
+                keys = [key for key in keys if key != curses.KEY_RESIZE]
+
+            if not self.handle_keys(keys):
+                break
 
-            if chr(key).isdigit() and chr(key) != '0' and self.mode not in ['insert', 'replace', 'open']:
-                self.input_buffer += chr(key)
-
-            elif self.mode == 'normal':
-                if key == ord('i'):
-                    self.mode = 'insert'
-                elif key == ord('a'):
-                    self.cursor_col += 1
-                    self.mode = 'insert'
-                elif key == ord('A'):
-                    self.cursor_col = len(self.buffer[self.cursor_row])
-                    self.mode = 'insert'
-                elif key == ord('o'):
-                    self.buffer.insert(self.cursor_row + 1, [])
-                    self.cursor_row += 1
-                    self.mode = 'open'
-                elif key == ord('O'):
-                    self.buffer.insert(self.cursor_row, [])
-                    self.mode = 'open'
-                elif key == ord('r'):
-                    self.mode = 'replace_char'
-                elif key == ord('R'):
-                    self.mode = 'replace'
-                elif key == ord('x') and len(self.buffer[self.cursor_row]):
-                    del self.buffer[self.cursor_row][self.cursor_col]
-                elif key == ord('G'):
-                    self.cursor_row = int(self.input_buffer) - 1 if len(self.input_buffer) and int(self.input_buffer) - 1 < len(self.buffer) else len(self.buffer) - 1
-                elif key == ord('g'):
-                    self.cursor_row = 0
+        sys.stdout.write(BRACKETED_PASTE_OFF)
+        sys.stdout.flush()
+        self.reader.close()
+        if self.save_requested:
+            renderer.draw(self.view_y, self.view_x, 'Waiting for the file to finish loading, then saving...', cursor)
+        self.close()
+
+    def close(self):
+        """
+        Finish saving and release the document. The swap file is only deleted
+        once the last save asked for has succeeded.
+        """
+        # Let in-flight saves finish before the editor goes away
+        self.saver.shutdown(wait=True)
+        for future, _ in self.saves:
+            self.last_save_ok = future.exception() is None
+        if self.save_requested:
+            # Ctrl+S came while the file was still loading: finish that save now
+            self.save_requested = False
+            try:
+                self.save_file()
+                self.last_save_ok = True
+            except Exception as e:
+                logging.error(f"Error saving '{self.filepath}': {e}")
+                self.last_save_ok = False
+        if isinstance(self.buffer.source, MappedSource):
+            self.buffer.source.close()
+        if self.swap and self.last_save_ok:
+            self.swap.discard()
+        elif self.swap:
+            # The save the user asked for did not happen; keep the edits for recovery
+            self.swap.checkpoint((self.cursor_row, self.cursor_col))
+            self.swap.close()
+
+    def handle_keys(self, keys):
+        """Dispatch a burst of keys; returns False once the user asks to quit."""
+        index = 0
+        while index < len(keys):
+            if self.paste is None and keys[index] == 27 and keys[index:index + len(PASTE_START)] == PASTE_START:
+                self.paste = []
+                index += len(PASTE_START)
+                continue
+            if self.paste is not None:
+                end = _find_sequence(keys, PASTE_END, index)
+                if end == -1:
+                    # The rest of the paste arrives with the next burst
+                    self.paste.extend(keys[index:])
+                    break
+                self.paste.extend(keys[index:end])
+                self.insert_bulk(_decode_keys(self.paste).replace('\r\n', '\n').replace('\r', '\n'))
+                self.paste = None
+                index = end + len(PASTE_END)
+                continue
+            if self.mode in ['insert', 'open']:
+                run_end = index
+                while run_end < len(keys) and _is_text_key(keys[run_end]):
+                    run_end += 1
+                if run_end - index > 1:
+                    # Typed-ahead or unbracketed pasted text: insert it in one go, undone like a paste
+                    self.insert_bulk(''.join('\n' if key in [10, 13] else chr(key) for key in keys[index:run_end]))
+                    index = run_end
+                    continue
+            if not self.handle_key(keys[index]):
+                return False
+            index += 1
+        return True
+
+    def insert_bulk(self, text):
+        """Insert a block of text at the cursor as a single edit; in replace mode it overwrites."""
+        self.undo.mark((self.cursor_row, self.cursor_col))
+        if self.mode == 'replace':
+            # As if typed: each character replaces one, line breaks replace nothing
+            end = min(len(self.buffer.line(self.cursor_row)), self.cursor_col + len(text) - text.count('\n'))
+            if end > self.cursor_col:
+                self.buffer.delete_text(self.cursor_row, self.cursor_col, self.cursor_row, end)
+        self.cursor_row, self.cursor_col = self.buffer.insert_text(self.cursor_row, self.cursor_col, text)
+        if self.mode == 'normal':
+            self.undo.commit((self.cursor_row, self.cursor_col))
+
+    def handle_key(self, key):
+        """Apply a single key press; returns False once the user asks to quit."""
+        self.undo.mark((self.cursor_row, self.cursor_col))
+        self.pending_jump = None
+
+        if chr(key).isdigit() and chr(key) != '0' and self.mode not in ['insert', 'replace', 'open', 'search']:
+            self.input_buffer += chr(key)
+
+        elif self.mode == 'normal':
+            if key == ord('i'):
+                self.mode = 'insert'
+            elif key == ord('a'):
+                self.cursor_col += 1
+                self.mode = 'insert'
+            elif key == ord('A'):
+                self.cursor_col = len(self.buffer.line(self.cursor_row))
+                self.mode = 'insert'
+            elif key == ord('o'):
+                self.buffer.insert_lines(self.cursor_row + 1, [''])
+                self.cursor_row += 1
+                self.mode = 'open'
+            elif key == ord('O'):
+                self.buffer.insert_lines(self.cursor_row, [''])
+                self.mode = 'open'
+            elif key == ord('r'):
+                self.mode = 'replace_char'
+            elif key == ord('R'):
+                self.mode = 'replace'
+            elif key == ord('x') and len(self.buffer.line(self.cursor_row)):
+                self.buffer.delete_text(self.cursor_row, self.cursor_col, self.cursor_row, self.cursor_col + 1)
+            elif key == ord('G'):
+                self.cursor_row = int(self.input_buffer) - 1 if len(self.input_buffer) and int(self.input_buffer) - 1 < len(self.buffer) else len(self.buffer) - 1
+                if len(self.input_buffer) and int(self.input_buffer) > len(self.buffer) and self.buffer.loading:
+                    # Finish the jump once the background index reaches the line
+                    self.pending_jump = int(self.input_buffer) - 1
+                    self.show_message(f"Indexing... jumping to line {self.pending_jump + 1} when loaded", 3.0)
+            elif key == ord('g'):
+                self.cursor_row = 0
+                self.cursor_col = 0
+            elif key == ord('0'):
+                if self.input_buffer == '':
                     self.cursor_col = 0
-                elif key == ord('0'):
-                    if self.input_buffer == '':
-                        self.cursor_col = 0
-                    else:
-                        self.input_buffer += chr(key)
-                elif key == ord('$'):
-                    if len(self.input_buffer):
-                        self.cursor_row = self.cursor_row + int(self.input_buffer) - 1 if (self.cursor_row + int(self.input_buffer) - 1) < len(self.buffer) else self.cursor_row
-                    self.cursor_col = len(self.buffer[self.cursor_row]) - 1
-                elif key == ord('d'):
-                    self.mode = 'delete'
-                elif key == ord('y'):
-                    self.mode = 'yank'
-                elif key == ord('p'):
-                    for line in self.yank_buffer:
-                        if len(self.buffer) > 1:
-                            self.cursor_row += 1
-                        self.buffer.insert(self.cursor_row, deepcopy(line))
-                    self.undo_index += 1
-                    self.undo_buffer.insert(self.undo_index, [deepcopy(self.buffer), [self.cursor_row, self.cursor_col]])
-                elif key == ord('u'):
-                    if self.undo_index >= 1:
-                        self.undo_index -= 1
-                        self.buffer = deepcopy(self.undo_buffer[self.undo_index][0])
-                        self.cursor_row, self.cursor_col = self.undo_buffer[self.undo_index][1]
-                elif key == (ord('r') & 0x1f):
-                    if self.undo_index < len(self.undo_buffer) - 1:
-                        self.undo_index += 1
-                        self.buffer = deepcopy(self.undo_buffer[self.undo_index][0])
-                        self.cursor_row, self.cursor_col = self.undo_buffer[self.undo_index][1]
-                elif key == ord('h'):
-                    self.cursor_col -= 1 if self.cursor_col else 0
-                elif key == ord('l'):
-                    self.cursor_col += 1 if self.cursor_col < len(self.buffer[self.cursor_row]) - 1 else 0
-                elif key == ord('k'):
-                    self.cursor_row -= 1 if self.cursor_row else 0
-                elif key == ord('j'):
-                    self.cursor_row += 1 if self.cursor_row < len(self.buffer) - 1 else 0
-                current_row = self.buffer[self.cursor_row] if self.cursor_row < len(self.buffer) else None
-                len_current_row = len(current_row) if current_row is not None else 0
-                if self.cursor_col > len_current_row - 1:
-                    self.cursor_col = len_current_row - 1 if len_current_row else len_current_row
-                if key == ord('A'):
-                    self.cursor_col = len_current_row
-                if key != ord('0') and self.mode not in ['delete', 'yank']:
-                    self.input_buffer = ''
+                else:
+                    self.input_buffer += chr(key)
+            elif key == ord('$'):
+                if len(self.input_buffer):
+                    self.cursor_row = self.cursor_row + int(self.input_buffer) - 1 if (self.cursor_row + int(self.input_buffer) - 1) < len(self.buffer) else self.cursor_row
+                self.cursor_col = len(self.buffer.line(self.cursor_row)) - 1
+            elif key == ord('d'):
+                self.mode = 'delete'
+            elif key == ord('y'):
+                self.mode = 'yank'
+            elif key == ord('p'):
+                for line in self.yank_buffer:
+                    if len(self.buffer) > 1:
+                        self.cursor_row += 1
+                    self.buffer.insert_lines(self.cursor_row, [line])
+            elif key == ord('u'):
+                cursor = self.undo.undo()
+                if cursor:
+                    self.cursor_row, self.cursor_col = cursor
+            elif key == (ord('r') & 0x1f):
+                cursor = self.undo.redo()
+                if cursor:
+                    self.cursor_row, self.cursor_col = cursor
+            elif key == ord('h'):
+                self.cursor_col -= 1 if self.cursor_col else 0
+            elif key == ord('l'):
+                self.cursor_col += 1 if self.cursor_col < len(self.buffer.line(self.cursor_row)) - 1 else 0
+            elif key == ord('k'):
+                self.cursor_row -= 1 if self.cursor_row else 0
+            elif key == ord('j'):
+                self.cursor_row += 1 if self.cursor_row < len(self.buffer) - 1 else 0
+            elif key in [ord('/'), ord('?')]:
+                self.mode = 'search'
+                self.search_forward = key == ord('/')
+                self.search_query = ''
+                self.search_origin = (self.cursor_row, self.cursor_col)
+            elif key in [ord('n'), ord('N')]:
+                self.jump_to_match(self.search_forward == (key == ord('n')))
+            elif key == 27:  # ESC clears search highlighting
+                self.show_matches = False
+            current_row = self.buffer.line(self.cursor_row) if self.cursor_row < len(self.buffer) else None
+            len_current_row = len(current_row) if current_row is not None else 0
+            if self.cursor_col > len_current_row - 1:
+                self.cursor_col = len_current_row - 1 if len_current_row else len_current_row
+            if key == ord('A'):
+                self.cursor_col = len_current_row
+            if key != ord('0') and self.mode not in ['delete', 'yank']:
+                self.input_buffer = ''
             
-            elif self.mode in ['insert', 'open']:
-                if key == 27:  # ESC key
-                    self.mode = 'normal'
-                    self.cursor_col -= 1 if self.cursor_col else 0
-
-                elif key in [curses.KEY_ENTER, 10, 13]:  # Handle the 'Enter' key
-                    line_content = self.buffer[self.cursor_row][self.cursor_col:]
-                    self.buffer[self.cursor_row] = self.buffer[self.cursor_row][:self.cursor_col]
-                    self.cursor_row += 1
-                    self.cursor_col = 0
-                    self.buffer.insert(self.cursor_row, [] + line_content)
-
-                elif key in [curses.KEY_BACKSPACE, 8]:  # Handle the 'Backspace' key
-                    if self.cursor_col > 0:  # If not at the beginning of the line
-                        self.cursor_col -= 1
-                        del self.buffer[self.cursor_row][self.cursor_col]
-                    elif self.cursor_row > 0:  # If at the beginning of the line, join with the previous line
-                        # Save the remaining content of the current line
-                        line_content = self.buffer[self.cursor_row]
-                        # Delete the current line
-                        del self.buffer[self.cursor_row]
-                        # Move to the end of the previous line
-                        self.cursor_row -= 1
-                        self.cursor_col = len(self.buffer[self.cursor_row])
-                        # Append the saved content to the previous line
-                        self.buffer[self.cursor_row].extend(line_content)
-
-
-                elif key == curses.KEY_DC:  # Handle the 'Delete' key
-                    if self.cursor_col < len(self.buffer[self.cursor_row]):
-                        del self.buffer[self.cursor_row][self.cursor_col]
-                    elif self.cursor_row < len(self.buffer) - 1:
-                        line_content = self.buffer[self.cursor_row + 1]
-                        del self.buffer[self.cursor_row + 1]
-                        self.buffer[self.cursor_row] += line_content
-
-                elif key != ((key) & 0x1f) and key < 128:
-                    self.buffer[self.cursor_row].insert(self.cursor_col, key)
-                    self.cursor_col += 1
-
-
-            elif self.mode == 'replace_char':
-                try:
-                    self.buffer[self.cursor_row][self.cursor_col] = key
-                except:
-                    pass
+        elif self.mode in ['insert', 'open']:
+            if key == 27:  # ESC key
                 self.mode = 'normal'
-
-            elif self.mode == 'replace':
-                if key == 27:  # ESC key
-                    self.mode = 'normal'
-                    self.cursor_col -= 1 if self.cursor_col else 0
-                elif key != ((key) & 0x1f) and key < 128:
-                    self.buffer[self.cursor_row][self.cursor_col] = key
-                    self.cursor_col += 1
-                elif key == curses.KEY_BACKSPACE:
-                    self.cursor_col -= 1 if self.cursor_col else 0
-
-            elif self.mode == 'delete':
-                if key == ord('d'):
-                    self.yank_buffer = []
-                    num_lines = int(self.input_buffer) if len(self.input_buffer) else 1
-                    for i in range(num_lines):
-                        if len(self.buffer) == 1 and self.buffer[0] == []:
-                            break
-                        self.yank_buffer.append(self.buffer[self.cursor_row])
-                        if len(self.buffer) > 1:
-                            del self.buffer[self.cursor_row]
-                        elif len(self.buffer) == 1:
-                            self.buffer[self.cursor_row] = []
-                        if self.cursor_row and self.cursor_row == len(self.buffer):
-                            self.cursor_row -= 1
-                            self.cursor_col = 0
-                            
+                self.cursor_col -= 1 if self.cursor_col else 0
+
+            elif key in [curses.KEY_ENTER, 10, 13]:  # Handle the 'Enter' key
+                self.cursor_row, self.cursor_col = self.buffer.insert_text(self.cursor_row, self.cursor_col, '\n')
+                # Each typed line is its own undo step
+                self.undo.commit((self.cursor_row, self.cursor_col))
+
+            elif key in [curses.KEY_BACKSPACE, 8]:  # Handle the 'Backspace' key
+                if self.cursor_col > 0:  # If not at the beginning of the line
+                    self.cursor_col -= 1
+                    self.buffer.delete_text(self.cursor_row, self.cursor_col, self.cursor_row, self.cursor_col + 1)
+                elif self.cursor_row > 0:  # If at the beginning of the line, join with the previous line
+                    # Move to the end of the previous line and join the current line onto it
+                    self.cursor_row -= 1
+                    self.cursor_col = len(self.buffer.line(self.cursor_row))
+                    self.buffer.delete_text(self.cursor_row, self.cursor_col, self.cursor_row + 1, 0)
+
+
+            elif key == curses.KEY_DC:  # Handle the 'Delete' key
+                if self.cursor_col < len(self.buffer.line(self.cursor_row)):
+                    self.buffer.delete_text(self.cursor_row, self.cursor_col, self.cursor_row, self.cursor_col + 1)
+                elif self.cursor_row < len(self.buffer) - 1:
+                    self.buffer.delete_text(self.cursor_row, self.cursor_col, self.cursor_row + 1, 0)
+
+            elif key != ((key) & 0x1f) and key < 128:
+                self.buffer.insert_text(self.cursor_row, self.cursor_col, chr(key))
+                self.cursor_col += 1
+
+
+        elif self.mode == 'replace_char':
+            if 0 <= self.cursor_col < len(self.buffer.line(self.cursor_row)):
+                self.buffer.set_char(self.cursor_row, self.cursor_col, chr(key))
+            self.mode = 'normal'
+
+        elif self.mode == 'replace':
+            if key == 27:  # ESC key
                 self.mode = 'normal'
-                self.input_buffer = ''
-                screen.move(self.rows, 0)
-
-            elif self.mode == 'yank':
-                if key == ord('y'):
-                    self.yank_buffer = []
-                    num_lines = int(self.input_buffer) if len(self.input_buffer) else 1
-                    for i in range(num_lines):
-                        if self.cursor_row + i >= len(self.buffer):
-                            break
-                        self.yank_buffer.append(self.buffer[self.cursor_row + i])
+                self.cursor_col -= 1 if self.cursor_col else 0
+            elif key != ((key) & 0x1f) and key < 128:
+                self.buffer.set_char(self.cursor_row, self.cursor_col, chr(key))
+                self.cursor_col += 1
+            elif key == curses.KEY_BACKSPACE:
+                self.cursor_col -= 1 if self.cursor_col else 0
+
+        elif self.mode == 'delete':
+            if key == ord('d'):
+                self.yank_buffer = []
+                num_lines = int(self.input_buffer) if len(self.input_buffer) else 1
+                for i in range(num_lines):
+                    if len(self.buffer) == 1 and self.buffer.line(0) == '':
+                        break
+                    self.yank_buffer.extend(self.buffer.delete_lines(self.cursor_row, 1))
+                    if self.cursor_row and self.cursor_row == len(self.buffer):
+                        self.cursor_row -= 1
+                        self.cursor_col = 0
+                            
+            self.mode = 'normal'
+            self.input_buffer = ''
+
+        elif self.mode == 'recover':
+            if key in [ord('y'), ord('Y')]:
+                self.recover_swap()
+            elif key in [ord('n'), ord('N'), 27]:
+                self.start_swap(keep=False)
                 self.mode = 'normal'
-                self.input_buffer = ''
-                screen.move(self.rows, 0)
 
-            if key != 27 and self.mode in ['insert', 'replace', 'open', 'delete', 'yank']:
-                self.undo_index += 1
-                self.undo_buffer.insert(self.undo_index, [deepcopy(self.buffer), [self.cursor_row, self.cursor_col]])
-
-            if key == (ord('q') & 0x1f) or key == (ord('c') & 0x1f):  # Ctrl+Q
-                # from ..custom_modules.journals import journal
-                # journal()
-                break
-
-            if key == (ord('s') & 0x1f):  # Ctrl+S
-                self.save_file()
-                screen.move(self.rows, 0)
-                screen.addstr('Saved')
-                screen.clrtoeol()
-                screen.refresh()
-                time.sleep(1)
+        elif self.mode == 'search':
+            if key == 27:  # ESC cancels and returns to where the search started
+                self.cancel_search()
+            elif key in [curses.KEY_ENTER, 10, 13]:
+                self.mode = 'normal'
+                self.cursor_row, self.cursor_col = self.search_origin
+                if self.search_query:
+                    self.last_search = self.search_query
+                self.search.set_pattern(self.last_search)
+                self.jump_to_match(self.search_forward)
+            elif key in [curses.KEY_BACKSPACE, 8, 127]:
+                if not self.search_query:
+                    self.cancel_search()
+                else:
+                    self.search_query = self.search_query[:-1]
+                    self.preview_search()
+            elif 32 <= key < 127:
+                self.search_query += chr(key)
+                self.preview_search()
+
+        elif self.mode == 'yank':
+            if key == ord('y'):
+                self.yank_buffer = []
+                num_lines = int(self.input_buffer) if len(self.input_buffer) else 1
+                for i in range(num_lines):
+                    if self.cursor_row + i >= len(self.buffer):
+                        break
+                    self.yank_buffer.append(self.buffer.line(self.cursor_row + i))
+            self.mode = 'normal'
+            self.input_buffer = ''
+
+        # Edits made since the last return to normal mode form one undo step
+        if self.mode == 'normal':
+            self.undo.commit((self.cursor_row, self.cursor_col))
+
+        if key == (ord('q') & 0x1f) or key == (ord('c') & 0x1f):  # Ctrl+Q
+            return False
+
+        if key == (ord('s') & 0x1f):  # Ctrl+S
+            self.request_save()
+
+        return True
+
+    def preview_search(self):
+        """Incremental search: move to the first match of the pattern typed so far."""
+        self.search.set_pattern(self.search_query)
+        self.show_matches = True
+        match = self.search.find(*self.search_origin, self.search_forward)
+        self.cursor_row, self.cursor_col = match[:2] if match else self.search_origin
+
+    def cancel_search(self):
+        self.mode = 'normal'
+        self.cursor_row, self.cursor_col = self.search_origin
+        self.search.set_pattern(self.last_search)
+        self.show_matches = False
+
+    def jump_to_match(self, forward):
+        """Move to the next match of the current pattern (`n` / `N`)."""
+        if self.search.error:
+            self.show_message(f"Invalid pattern: {self.search.error}", 3.0)
+            return
+        if self.search.regex is None:
+            self.show_message("No previous search pattern")
+            return
+        self.show_matches = True
+        match = self.search.find(self.cursor_row, self.cursor_col, forward)
+        if match is None:
+            self.show_message(f"Pattern not found: {self.search.pattern}", 2.0)
+            return
+        self.cursor_row, self.cursor_col, wrapped = match
+        if wrapped:
+            self.show_message("search hit BOTTOM, continuing at TOP" if forward else "search hit TOP, continuing at BOTTOM")
+
+    def poll_loading(self):
+        """Timer: pull in newly indexed lines and complete a pending jump."""
+        still_loading = self.buffer.loading
+        self.buffer.sync_source()
+        if self.pending_jump is not None and (self.pending_jump < len(self.buffer) or not still_loading):
+            self.cursor_row = min(self.pending_jump, len(self.buffer) - 1)
+            self.cursor_col = 0
+            self.pending_jump = None
+            self.clear_message()
+        if still_loading:
+            self.reader.call_later(LOAD_POLL, self.poll_loading)
+        elif self.save_requested:
+            self.save_requested = False
+            self.request_save()
+
+    def start_swap(self, keep):
+        self.swap.start(keep=keep)
+        self.buffer.listeners.append(self.swap.record)
+
+    def recover_swap(self):
+        """Replay the swap journal on top of the document as one undoable step."""
+        if self.buffer.loading:
+            self.buffer.source.wait()
+        self.buffer.sync_source()
+        self.undo.mark((0, 0))
+        try:
+            cursor = self.swap.replay(self.buffer)
+            self.show_message("Recovered unsaved changes", 2.0)
+        except (IndexError, ValueError) as e:
+            logging.error(f"Error replaying swap file '{self.swap.path}': {e}")
+            cursor = None
+            self.show_message("Swap file did not apply cleanly; recovered what it could", 3.0)
+        if cursor:
+            self.cursor_row = min(cursor[0], len(self.buffer) - 1)
+            self.cursor_col = min(cursor[1], len(self.buffer.line(self.cursor_row)))
+        self.mode = 'normal'
+        self.undo.commit((self.cursor_row, self.cursor_col))
+        self.start_swap(keep=True)
+
+    def flush_swap(self):
+        """Timer: write journalled edits to the swap file."""
+        if self.swap:
+            self.swap.checkpoint((self.cursor_row, self.cursor_col))
+        self.reader.call_later(config.EDITOR_SWAP_INTERVAL, self.flush_swap)
+
+    def request_save(self):
+        """Save without blocking input; the status line reports when it is done."""
+        if self.reader is None:
+            self.save_file()
+            self.show_message('Saved')
+            return
+        if self.buffer.loading:
+            # Saving now would drop the part of the file not indexed yet
+            self.save_requested = True
+            self.show_message('Waiting for the file to finish loading before saving...', 60)
+            return
+        self.buffer.sync_source()
+        snapshot = self.buffer.snapshot()
+        offset = self.swap.checkpoint((self.cursor_row, self.cursor_col)) if self.swap else 0
+        self.saves.append((self.saver.submit(self._write_snapshot, snapshot), offset))
+        self.show_message('Saving...', 60)
+        self.reader.call_later(SAVE_POLL, self.poll_saves)
+
+    def _write_snapshot(self, snapshot):
+        try:
+            return self.write_lines(iter_snapshot_lines(snapshot))
+        except Exception as e:
+            logging.error(f"Error saving '{self.filepath}': {e}")
+            raise
+
+    def poll_saves(self):
+        """Timer: report finished background saves on the status line."""
+        while self.saves and self.saves[0][0].done():
+            future, offset = self.saves.pop(0)
+            self.last_save_ok = future.exception() is None
+            if future.exception():
+                self.show_message(f'Save failed: {future.exception()}', 3.0)
+                continue
+            if self.swap:
+                self.swap.saved(offset)
+            if not self.saves:
+                self.show_message(f'Saved {future.result()} lines')
+        if self.saves:
+            self.reader.call_later(SAVE_POLL, self.poll_saves)
+
+    def show_message(self, text, duration=1.0):
+        """Show `text` on the status line until `duration` seconds pass."""
+        if self.message_timer:
+            self.message_timer.cancel()
+        self.message = text
+        if self.reader:
+            self.message_timer = self.reader.call_later(duration, self.clear_message)
+
+    def clear_message(self):
+        self.message = ''
+        self.message_timer = None
+
+    def write_lines(self, lines):
+        """Write the document to its sink: the in-memory document or the file."""
+        if self.document:
+            return self.document.write(lines)
+        return write_lines_atomic(self.filepath, lines)
 
     def save_file(self):
-        content = ''
-        for line in self.buffer:
-            content += ''.join([chr(c) for c in line]) + '\n'
-        with open(self.filepath, 'w') as file:
-            file.write(content)
+        """Save synchronously, streaming lines into an atomically replaced file."""
+        if self.buffer.loading:
+            self.buffer.source.wait()
+        self.buffer.sync_source()
+        offset = self.swap.checkpoint((self.cursor_row, self.cursor_col)) if self.swap else 0
+        count = self.write_lines(self.buffer.lines())
+        if self.swap:
+            self.swap.saved(offset)
+        return count
 
 
 if __name__ == '__main__':
@@ -301,4 +604,4 @@ if __name__ == '__main__':
     args = parser.parse_args()
 
     editor = TerminalTextEditor(filepath=args.filepath)
-    editor.run()
\ No newline at end of file
+    editor.run()
@@ -0,0 +1,61 @@
+import os
+import tempfile
+
+# How documents are read and written. Bytes that are not valid UTF-8 decode to
+# lone surrogates and encode back unchanged, so untouched lines round-trip.
+ENCODING = 'utf-8'
+ERRORS = 'surrogateescape'
+
+
+def iter_snapshot_lines(pieces):
+    """Yield the lines of a TextBuffer snapshot in document order."""
+    for source, start, count in pieces:
+        for index in range(start, start + count):
+            yield source[index]
+
+
+def write_lines_atomic(filepath, lines):
+    """
+    Stream `lines` into `filepath` without ever leaving it half written.
+
+    The text goes to a temporary file in the same directory, which is flushed,
+    fsynced and then renamed over the target, so a crash leaves either the old
+    or the new document on disk. Returns the number of lines written.
+    """
+    directory = os.path.dirname(os.path.abspath(filepath))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f'.{os.path.basename(filepath)}.', suffix='.tmp')
+    count = 0
+    try:
+        with os.fdopen(fd, 'w', encoding=ENCODING, errors=ERRORS) as file:
+            for line in lines:
+                file.write(line)
+                file.write('\n')
+                count += 1
+            file.flush()
+            os.fsync(file.fileno())
+        try:
+            mode = os.stat(filepath).st_mode & 0o7777
+        except FileNotFoundError:
+            # mkstemp creates 0600 files; match what open() would have created
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, filepath)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    _fsync_directory(directory)
+    return count
+
+
+def _fsync_directory(directory):
+    """Persist the rename itself (not supported on Windows)."""
+    if os.name == 'nt':
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
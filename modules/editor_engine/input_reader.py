@@ -0,0 +1,116 @@
+import heapq
+import itertools
+import math
+import os
+import selectors
+import sys
+import time
+
+# Upper bound on how long we block, so curses can still report KEY_RESIZE
+MAX_WAIT = 0.5
+
+
+class Timer:
+    """Handle returned by `InputReader.call_later`."""
+
+    __slots__ = ('deadline', 'callback', 'cancelled')
+
+    def __init__(self, deadline, callback):
+        self.deadline = deadline
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class InputReader:
+    """
+    Event-driven key source for the editor.
+
+    Instead of spinning on a non-blocking `getch`, the reader sleeps in
+    `select` on the terminal file descriptor until a key arrives or the next
+    timer is due, so an idle editor uses practically no CPU. Timers (status
+    message expiry, autosave, ...) run on the editor thread between keys.
+    On Windows, where `select` only takes sockets, curses does the waiting.
+    """
+
+    def __init__(self, screen, fd=None):
+        self.screen = screen
+        self.fd = sys.stdin.fileno() if fd is None else fd
+        if os.name == 'nt':
+            self.selector = None
+        else:
+            self.selector = selectors.DefaultSelector()
+            self.selector.register(self.fd, selectors.EVENT_READ)
+        self._timers = []
+        self._sequence = itertools.count()
+
+    def call_later(self, delay, callback):
+        """Run `callback()` after `delay` seconds; returns a cancellable Timer."""
+        timer = Timer(time.monotonic() + delay, callback)
+        heapq.heappush(self._timers, (timer.deadline, next(self._sequence), timer))
+        return timer
+
+    def _run_due_timers(self):
+        """Run expired timers and return the seconds until the next one (or None)."""
+        now = time.monotonic()
+        while self._timers:
+            deadline, _, timer = self._timers[0]
+            if timer.cancelled:
+                heapq.heappop(self._timers)
+            elif deadline <= now:
+                heapq.heappop(self._timers)
+                timer.callback()
+            else:
+                return deadline - now
+        return None
+
+    def read_key(self):
+        """Block until a key is available or a timer fires; returns the key or None."""
+        key = self.screen.getch()
+        if key != -1:
+            return key
+        next_timer = self._run_due_timers()
+        timeout = MAX_WAIT if next_timer is None else min(next_timer, MAX_WAIT)
+        if self.selector is None:
+            key = self._getch_within(timeout)
+            if key == -1:
+                self._run_due_timers()
+            return key if key != -1 else None
+        if self.selector.select(timeout):
+            key = self.screen.getch()
+            return key if key != -1 else None
+        self._run_due_timers()
+        # curses queues KEY_RESIZE without making the descriptor readable
+        key = self.screen.getch()
+        return key if key != -1 else None
+
+    def _getch_within(self, timeout):
+        """`getch` that waits up to `timeout` seconds, then back to non-blocking."""
+        self.screen.timeout(max(1, math.ceil(timeout * 1000)))
+        try:
+            return self.screen.getch()
+        finally:
+            self.screen.nodelay(1)
+
+    def read_keys(self, limit=1 << 16):
+        """Wait for input like `read_key`, then drain everything already queued.
+
+        Pastes and typed-ahead input come back as one list, so the editor can
+        apply them with a single edit and a single repaint.
+        """
+        key = self.read_key()
+        if key is None:
+            return []
+        keys = [key]
+        while len(keys) < limit:
+            key = self.screen.getch()
+            if key == -1:
+                break
+            keys.append(key)
+        return keys
+
+    def close(self):
+        if self.selector is not None:
+            self.selector.close()
@@ -2,8 +2,8 @@
 
 from modules.editor_engine.engine_init import TerminalTextEditor
 
-def e_main(filepath):
-    editor = TerminalTextEditor(filepath=filepath)
+def e_main(filepath=None, swap=True, document=None):
+    editor = TerminalTextEditor(filepath=filepath, swap=swap, document=document)
     editor.run()
     
 
@@ -0,0 +1,96 @@
+import mmap
+import threading
+from array import array
+
+from .file_io import ENCODING, ERRORS
+
+# Bytes scanned per indexing step; the first step runs before the editor opens
+INDEX_CHUNK = 4 * 1024 * 1024
+
+
+class MappedSource:
+    """
+    Line-indexed, memory-mapped view over a large file.
+
+    The file is never read as a whole: a background thread scans the mapping
+    for newlines and appends line offsets to `starts`, and lines are decoded
+    only when the editor asks for them. `len()` is the number of lines indexed
+    so far and only grows until `complete` is set.
+    """
+
+    def __init__(self, filepath, encoding=ENCODING):
+        self.filepath = filepath
+        self.encoding = encoding
+        with open(filepath, 'rb') as file:
+            self.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.size = len(self.mmap)
+        self.starts = array('q', [0])
+        self.lines = 0
+        self.complete = False
+        self._scanned = 0
+        self._closing = False
+        # Index enough up front that the document has at least one line
+        while self._index_step() and not self.lines:
+            pass
+        self._thread = threading.Thread(target=self._index_rest, daemon=True)
+        self._thread.start()
+
+    def __len__(self):
+        return self.lines
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.lines:
+            raise IndexError(index)
+        start = self.starts[index]
+        end = self.starts[index + 1] - 1 if index + 1 < len(self.starts) else self.size
+        data = self.mmap[start:end]
+        if data.endswith(b'\r'):
+            data = data[:-1]
+        return data.decode(self.encoding, ERRORS)
+
+    def lines_between(self, start, stop):
+        """Return lines `start` up to `stop` as a list, decoded in one pass."""
+        end = self.starts[stop] - 1 if stop < len(self.starts) else self.size
+        data = self.mmap[self.starts[start]:end]
+        lines = data.decode(self.encoding, ERRORS).split('\n')
+        if b'\r' in data:
+            lines = [line[:-1] if line.endswith('\r') else line for line in lines]
+        return lines
+
+    def _index_step(self):
+        """Index the next chunk of the mapping; returns False once the file is done."""
+        begin = self._scanned
+        end = min(begin + INDEX_CHUNK, self.size)
+        chunk = self.mmap[begin:end]
+        found = array('q')
+        pos = chunk.find(b'\n')
+        while pos != -1:
+            found.append(begin + pos + 1)
+            pos = chunk.find(b'\n', pos + 1)
+        self.starts.extend(found)
+        self._scanned = end
+        if end < self.size:
+            # Only lines whose terminating newline has been seen are complete
+            self.lines = len(self.starts) - 1
+            return True
+        # A trailing newline does not start another line
+        if self.starts[-1] == self.size and len(self.starts) > 1:
+            self.lines = len(self.starts) - 1
+        else:
+            self.lines = len(self.starts)
+        self.complete = True
+        return False
+
+    def _index_rest(self):
+        while not self._closing and self._index_step():
+            pass
+
+    def wait(self):
+        """Block until the whole file has been indexed."""
+        self._thread.join()
+
+    def close(self):
+        """Stop indexing and release the mapping and its file descriptor."""
+        self._closing = True
+        self._thread.join()
+        self.mmap.close()
@@ -0,0 +1,25 @@
+import pytest
+
+from configs import config
+from modules.editor_engine.engine_init import TerminalTextEditor
+from modules.editor_engine.mapped_source import MappedSource
+
+ESC = 27
+# Latin-1 text, a lone continuation byte and a truncated sequence: none of it is UTF-8
+INVALID = b'caf\xe9 \x80 end\xe2\x82\n'
+
+
+@pytest.mark.parametrize('threshold', [1, 1 << 30], ids=['mapped', 'in-memory'])
+def test_invalid_utf8_survives_a_save(tmp_path, monkeypatch, threshold):
+    monkeypatch.setattr(config, 'EDITOR_MMAP_THRESHOLD_BYTES', threshold)
+    filepath = tmp_path / 'doc.txt'
+    original = b'first line\n' + INVALID * 1000 + b'\xff\xfe last\r\n'
+    filepath.write_bytes(original)
+
+    editor = TerminalTextEditor(filepath=str(filepath), swap=False)
+    assert isinstance(editor.buffer.source, MappedSource) == (threshold == 1)
+    editor.handle_keys([ord('i')] + list(b'new ') + [ESC])
+    editor.save_file()
+    editor.close()
+
+    assert filepath.read_bytes() == b'new ' + original.replace(b'\r\n', b'\n')
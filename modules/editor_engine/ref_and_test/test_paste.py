@@ -0,0 +1,62 @@
+from modules.editor_engine.engine_init import TerminalTextEditor, PASTE_START, PASTE_END
+
+ESC = 27
+
+
+def make_editor(tmp_path, content=None):
+    filepath = tmp_path / 'doc.txt'
+    if content is not None:
+        filepath.write_text(content)
+    return TerminalTextEditor(filepath=str(filepath))
+
+
+def test_bracketed_paste_is_one_edit_and_one_undo_step(tmp_path):
+    editor = make_editor(tmp_path)
+    lines = [f'line {i}: some pasted text' for i in range(5000)]
+    payload = list('\r\n'.join(lines).encode())
+
+    editor.handle_keys([ord('i')] + PASTE_START + payload + PASTE_END + [ESC])
+
+    assert list(editor.buffer.lines()) == lines
+    assert len(editor.undo.undo_stack) == 1
+    editor.handle_keys([ord('u')])
+    assert list(editor.buffer.lines()) == ['']
+
+
+def test_paste_split_across_bursts(tmp_path):
+    editor = make_editor(tmp_path, 'ab\n')
+    payload = list('héllo\rworld'.encode())
+
+    editor.handle_keys([ord('a')] + PASTE_START + payload[:4])
+    editor.handle_keys(payload[4:] + PASTE_END + [ESC])
+
+    assert list(editor.buffer.lines()) == ['ahéllo', 'worldb']
+
+
+def test_typed_burst_matches_key_by_key(tmp_path):
+    keys = [ord('o')] + list(b'first\rsecond') + [8, 8] + list(b'nd!') + [ESC, ord('x')]
+
+    burst = make_editor(tmp_path, 'top\n')
+    burst.handle_keys(keys)
+
+    single = make_editor(tmp_path, 'top\n')
+    for key in keys:
+        single.handle_key(key)
+
+    assert list(burst.buffer.lines()) == list(single.buffer.lines()) == ['top', 'first', 'second']
+    assert (burst.cursor_row, burst.cursor_col) == (single.cursor_row, single.cursor_col)
+
+
+def test_quit_key_stops_burst(tmp_path):
+    editor = make_editor(tmp_path)
+    assert editor.handle_keys([ord('i'), ord('a'), ord('q') & 0x1f, ord('b')]) is False
+    assert editor.buffer.line(0) == 'a'
+
+
+def test_paste_overwrites_in_replace_mode(tmp_path):
+    editor = make_editor(tmp_path, 'abcdef\n')
+    payload = list(b'XY\rZ')
+
+    editor.handle_keys([ord('R')] + PASTE_START + payload + PASTE_END + [ESC])
+
+    assert list(editor.buffer.lines()) == ['XY', 'Zdef']
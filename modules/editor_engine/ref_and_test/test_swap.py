@@ -0,0 +1,71 @@
+import os
+
+from modules.editor_engine.engine_init import TerminalTextEditor
+from modules.editor_engine.swap import SwapJournal
+
+ESC = 27
+
+
+def crash(editor):
+    """Leave the editor the way a crash would: journal flushed, nothing saved or discarded."""
+    editor.swap.checkpoint((editor.cursor_row, editor.cursor_col))
+    editor.swap.file.close()
+
+
+def test_replay_restores_unsaved_edits(tmp_path):
+    filepath = tmp_path / 'doc.txt'
+    filepath.write_text('one\ntwo\nthree\n')
+    editor = TerminalTextEditor(filepath=str(filepath))
+    editor.handle_keys([ord('i')] + list(b'new ') + [ESC, ord('j'), ord('d'), ord('d'), ord('o')] + list(b'x\ry') + [ESC])
+    edited = list(editor.buffer.lines())
+    crash(editor)
+
+    recovered = TerminalTextEditor(filepath=str(filepath))
+    assert recovered.mode == 'recover'
+    recovered.recover_swap()
+
+    assert list(recovered.buffer.lines()) == edited == ['new one', 'three', 'x', 'y']
+    assert filepath.read_text() == 'one\ntwo\nthree\n'
+
+
+def test_torn_tail_is_ignored(tmp_path):
+    filepath = tmp_path / 'doc.txt'
+    filepath.write_text('abc\n')
+    editor = TerminalTextEditor(filepath=str(filepath))
+    editor.handle_keys([ord('i'), ord('X'), ESC])
+    crash(editor)
+    with open(editor.swap.path, 'ab') as file:
+        file.write(b'\x01\x00\x00')
+
+    recovered = TerminalTextEditor(filepath=str(filepath))
+    recovered.recover_swap()
+
+    assert list(recovered.buffer.lines()) == ['Xabc']
+
+
+def test_swap_for_a_changed_document_is_stale(tmp_path):
+    filepath = tmp_path / 'doc.txt'
+    filepath.write_text('abc\n')
+    editor = TerminalTextEditor(filepath=str(filepath))
+    editor.handle_keys([ord('i'), ord('X'), ESC])
+    crash(editor)
+    filepath.write_text('changed elsewhere\n')
+
+    assert not SwapJournal(str(filepath)).recoverable()
+
+
+def test_saved_edits_are_not_replayed(tmp_path):
+    filepath = tmp_path / 'doc.txt'
+    filepath.write_text('abc\n')
+    editor = TerminalTextEditor(filepath=str(filepath))
+    editor.handle_keys([ord('i'), ord('X'), ESC, ord('s') & 0x1f])
+    editor.handle_keys([ord('A'), ord('Y'), ESC])
+    crash(editor)
+
+    recovered = TerminalTextEditor(filepath=str(filepath))
+    recovered.recover_swap()
+
+    assert filepath.read_text() == 'Xabc\n'
+    assert list(recovered.buffer.lines()) == ['XabcY']
+    recovered.close()
+    assert not os.path.exists(recovered.swap.path)
@@ -0,0 +1,113 @@
+from modules.editor_engine.engine_init import TerminalTextEditor
+from modules.editor_engine.text_buffer import TextBuffer
+from modules.editor_engine.undo import UndoHistory, OP_OVERHEAD
+
+ESC = 27
+
+
+def make_editor(tmp_path, content):
+    filepath = tmp_path / 'doc.txt'
+    filepath.write_text(content)
+    return TerminalTextEditor(filepath=str(filepath), swap=False)
+
+
+def type_text(history, buffer, row, col, text):
+    """Type `text` one character per key, as the editor reports it."""
+    for char in text:
+        history.mark((row, col))
+        row, col = buffer.insert_text(row, col, char)
+    return row, col
+
+
+def test_newline_ends_a_group(tmp_path):
+    editor = make_editor(tmp_path, 'end\n')
+    editor.handle_key(ord('i'))
+    for key in list(b'one\rtwo'):
+        editor.handle_key(key)
+    editor.handle_key(ESC)
+
+    assert list(editor.buffer.lines()) == ['one', 'twoend']
+    assert len(editor.undo.undo_stack) == 2
+    editor.handle_key(ord('u'))
+    assert list(editor.buffer.lines()) == ['one', 'end']
+    editor.handle_key(ord('u'))
+    assert list(editor.buffer.lines()) == ['end']
+
+
+def test_cursor_jump_ends_a_group():
+    buffer = TextBuffer('first\nsecond')
+    history = UndoHistory(buffer, 1 << 20)
+
+    type_text(history, buffer, 0, 0, 'ab')
+    type_text(history, buffer, 1, 0, 'cd')
+    history.commit((1, 2))
+
+    assert len(history.undo_stack) == 2
+    assert history.undo() == (1, 0)
+    assert list(buffer.lines()) == ['abfirst', 'second']
+    assert history.undo() == (0, 0)
+    assert list(buffer.lines()) == ['first', 'second']
+
+
+def test_backspace_and_delete_stay_in_the_group():
+    buffer = TextBuffer('xy')
+    history = UndoHistory(buffer, 1 << 20)
+
+    row, col = type_text(history, buffer, 0, 1, 'abc')
+    history.mark((row, col))
+    buffer.delete_text(0, col - 1, 0, col)
+    history.mark((0, col - 1))
+    buffer.delete_text(0, col - 1, 0, col)
+    history.commit((0, col - 1))
+
+    assert list(buffer.lines()) == ['xab']
+    assert len(history.undo_stack) == 1
+    history.undo()
+    assert list(buffer.lines()) == ['xy']
+
+
+def test_oldest_groups_are_evicted_past_the_cap():
+    buffer = TextBuffer()
+    history = UndoHistory(buffer, 3 * (11 + OP_OVERHEAD))
+
+    for row in range(5):
+        history.mark((row, 0))
+        buffer.insert_text(row, 0, f'{row}' * 10 + '\n')
+        history.commit((row + 1, 0))
+
+    assert len(history.undo_stack) == 3
+    assert history.size <= history.max_bytes
+    while history.undo():
+        pass
+    # The two oldest lines can no longer be undone
+    assert list(buffer.lines()) == ['0' * 10, '1' * 10, '']
+
+
+def test_undo_all_restores_the_original(tmp_path):
+    original = 'alpha\nbeta\ngamma\n'
+    editor = make_editor(tmp_path, original)
+    editor.handle_keys([ord('x'), ord('j'), ord('d'), ord('d'), ord('o')] + list(b'new\rlines') + [ESC])
+    editor.handle_keys([ord('g'), ord('R')] + list(b'ALP') + [ESC, ord('p')])
+    assert list(editor.buffer.lines()) != ['alpha', 'beta', 'gamma']
+
+    while editor.undo.undo_stack:
+        editor.handle_key(ord('u'))
+
+    assert list(editor.buffer.lines()) == ['alpha', 'beta', 'gamma']
+
+
+def test_new_edit_clears_redo():
+    buffer = TextBuffer('text')
+    history = UndoHistory(buffer, 1 << 20)
+    type_text(history, buffer, 0, 0, 'ab')
+    history.commit((0, 2))
+    history.undo()
+    assert history.redo_stack
+
+    type_text(history, buffer, 0, 4, '!')
+    history.commit((0, 5))
+
+    assert history.redo_stack == []
+    assert history.redo() is None
+    assert list(buffer.lines()) == ['text!']
+    assert history.size == 1 + OP_OVERHEAD
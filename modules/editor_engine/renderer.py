@@ -0,0 +1,134 @@
+import re
+import curses
+
+# Undecodable bytes are kept as lone surrogates, which curses cannot encode
+ESCAPED_BYTE = re.compile('[\udc80-\udcff]')
+
+
+class ScreenRenderer:
+    """
+    Redraws only the parts of the editor screen that changed.
+
+    The renderer keeps the text it last wrote to every viewport row. Buffer
+    edits (reported through the TextBuffer listener hook) mark buffer rows
+    dirty, vertical scrolling shifts the cached rows with the terminal's
+    insert/delete-line support, and each changed row is written with a single
+    call. Nothing is repainted when a key does not change what is visible.
+
+    An optional highlighter (see BufferSearch) supplies match spans per row;
+    they are drawn in reverse video and every row is re-checked when the
+    highlighter's version changes.
+    """
+
+    def __init__(self, screen, buffer):
+        self.screen = screen
+        self.buffer = buffer
+        self.rows = 0
+        self.cols = 0
+        self.view_y = 0
+        self.view_x = 0
+        self.drawn = []
+        self.status = None
+        self.dirty_rows = set()
+        self.dirty_from = None
+        self.highlight_key = None
+        buffer.listeners.append(self.buffer_changed)
+        screen.idlok(True)
+
+    def buffer_changed(self, kind, row, col, text):
+        """TextBuffer listener: mark the buffer rows an edit touched."""
+        if '\n' in text:
+            # Lines below the edit shift up or down
+            self.dirty_from = row if self.dirty_from is None else min(self.dirty_from, row)
+        else:
+            self.dirty_rows.add(row)
+
+    def invalidate(self):
+        """Forget everything on screen so the next frame is a full repaint."""
+        self.drawn = [None] * self.rows
+        self.status = None
+
+    def resize(self, rows, cols):
+        self.rows, self.cols = rows, cols
+        self.screen.clear()
+        self.invalidate()
+
+    def _scroll(self, delta):
+        """Shift the cached rows by `delta` lines using the terminal scroll region."""
+        if abs(delta) >= self.rows:
+            self.drawn = [None] * self.rows
+            return
+        try:
+            self.screen.scrollok(True)
+            self.screen.setscrreg(0, self.rows - 1)
+            self.screen.scroll(delta)
+            self.screen.scrollok(False)
+        except curses.error:
+            self.drawn = [None] * self.rows
+            return
+        if delta > 0:
+            self.drawn = self.drawn[delta:] + [None] * delta
+        else:
+            self.drawn = [None] * -delta + self.drawn[:delta]
+
+    def draw(self, view_y, view_x, status, cursor, highlight=None):
+        """Bring the screen up to date for the given viewport and status line."""
+        highlight_key = (id(highlight), highlight.version) if highlight else None
+        if len(self.drawn) != self.rows or view_x != self.view_x or highlight_key != self.highlight_key:
+            self.drawn = [None] * self.rows
+            self.highlight_key = highlight_key
+        elif view_y != self.view_y:
+            self._scroll(view_y - self.view_y)
+        self.view_y, self.view_x = view_y, view_x
+
+        stale = []
+        for row in range(self.rows):
+            buffer_row = row + view_y
+            if (self.drawn[row] is None or buffer_row in self.dirty_rows
+                    or (self.dirty_from is not None and buffer_row >= self.dirty_from)):
+                stale.append(row)
+        self.dirty_rows.clear()
+        self.dirty_from = None
+
+        if stale:
+            visible = list(self.buffer.lines(view_y, view_y + stale[-1] + 1))
+            for row in stale:
+                spans = ()
+                if row < len(visible):
+                    text = visible[row][view_x:view_x + self.cols]
+                    if highlight:
+                        spans = self._visible_spans(highlight.spans(row + view_y, visible[row]), view_x)
+                else:
+                    text = '~'
+                if (text, spans) != self.drawn[row]:
+                    self._write(row, text, spans)
+
+        if status != self.status:
+            self._write(self.rows, status)
+            self.status = status
+
+        self.screen.move(*cursor)
+        self.screen.noutrefresh()
+        curses.doupdate()
+
+    def _visible_spans(self, spans, view_x):
+        """Clip buffer-column spans to the viewport, as (screen column, width) pairs."""
+        visible = []
+        for start, end in spans:
+            start, end = max(start - view_x, 0), min(end - view_x, self.cols)
+            if end > start:
+                visible.append((start, end - start))
+        return tuple(visible)
+
+    def _write(self, row, text, spans=()):
+        try:
+            self.screen.addnstr(row, 0, ESCAPED_BYTE.sub('\ufffd', text), self.cols)
+        except curses.error:
+            # Writing the bottom-right cell moves the cursor off screen
+            pass
+        if len(text) < self.cols:
+            self.screen.clrtoeol()
+        for start, width in spans:
+            self.screen.chgat(row, start, width, curses.A_REVERSE)
+        if row < self.rows:
+            self.drawn[row] = (text, spans)
@@ -0,0 +1,119 @@
+import re
+
+# Lines joined and tested with a single regex call before matching line by line
+BLOCK_LINES = 512
+
+
+class BufferSearch:
+    """
+    Regex search over a TextBuffer with a per-line match cache.
+
+    Match spans are cached by row the first time a line is scanned. Buffer
+    edits (through the TextBuffer listener hook) drop only the rows they
+    touched and shift the rows below a multi-line edit, so repeated `n`/`N`
+    presses and match highlighting never rescan unchanged lines. Patterns
+    are case-insensitive unless they contain an uppercase letter.
+
+    Uncached stretches of the document are scanned in blocks: the lines are
+    joined and tested with one MULTILINE search, and only blocks that can
+    contain a match are split into per-line spans.
+    """
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.pattern = ''
+        self.regex = None
+        self.block_regex = None
+        self.error = None
+        self.version = 0
+        self._cache = {}
+        buffer.listeners.append(self.buffer_changed)
+
+    def set_pattern(self, pattern):
+        """Compile `pattern`; an invalid regex leaves `regex` as None and sets `error`."""
+        if pattern == self.pattern and (self.regex or self.error):
+            return
+        self.pattern = pattern
+        self.version += 1
+        self._cache = {}
+        self.regex = None
+        self.block_regex = None
+        self.error = None
+        if not pattern:
+            return
+        flags = 0 if any(c.isupper() for c in pattern) else re.IGNORECASE
+        try:
+            self.regex = re.compile(pattern, flags)
+        except re.error as e:
+            self.error = str(e)
+            return
+        # ^ and $ behave per line under MULTILINE; \A and \Z do not, so skip the prefilter
+        if '\\A' not in pattern and '\\Z' not in pattern:
+            self.block_regex = re.compile(pattern, flags | re.MULTILINE)
+
+    def buffer_changed(self, kind, row, col, text):
+        """TextBuffer listener: forget matches for edited rows and shift the rest."""
+        if not self._cache:
+            return
+        newlines = text.count('\n')
+        if not newlines:
+            self._cache.pop(row, None)
+            return
+        shift = -newlines if kind == 'delete' else newlines
+        last_touched = row + newlines if kind == 'delete' else row
+        self._cache = {
+            cached_row if cached_row < row else cached_row + shift: spans
+            for cached_row, spans in self._cache.items()
+            if cached_row < row or cached_row > last_touched
+        }
+
+    def spans(self, row, line=None):
+        """Return the (start, end) spans matching on `row`."""
+        spans = self._cache.get(row)
+        if spans is None:
+            if self.regex is None:
+                return ()
+            if line is None:
+                line = self.buffer.line(row)
+            spans = tuple(match.span() for match in self.regex.finditer(line))
+            self._cache[row] = spans
+        return spans
+
+    def _matching_rows(self, start, stop, reverse=False):
+        """Yield (row, spans) for rows in [start, stop) that have matches."""
+        blocks = range(start, stop, BLOCK_LINES)
+        for block_start in (reversed(blocks) if reverse else blocks):
+            block_stop = min(block_start + BLOCK_LINES, stop)
+            lines = list(self.buffer.lines(block_start, block_stop))
+            if self.block_regex and not self.block_regex.search('\n'.join(lines)):
+                continue
+            rows = range(len(lines))
+            for offset in (reversed(rows) if reverse else rows):
+                spans = self.spans(block_start + offset, lines[offset])
+                if spans:
+                    yield block_start + offset, spans
+
+    def find(self, row, col, forward=True):
+        """
+        Return (row, col, wrapped) of the next match after (row, col) in the
+        given direction, wrapping around the document, or None.
+        """
+        if self.regex is None:
+            return None
+        if forward:
+            for start, _ in self.spans(row):
+                if start > col:
+                    return row, start, False
+            for index, spans in self._matching_rows(row + 1, len(self.buffer)):
+                return index, spans[0][0], False
+            for index, spans in self._matching_rows(0, row + 1):
+                return index, spans[0][0], True
+        else:
+            for start, _ in reversed(self.spans(row)):
+                if start < col:
+                    return row, start, False
+            for index, spans in self._matching_rows(0, row, reverse=True):
+                return index, spans[-1][0], False
+            for index, spans in self._matching_rows(row, len(self.buffer), reverse=True):
+                return index, spans[-1][0], True
+        return None
@@ -0,0 +1,163 @@
+import os
+import struct
+import zlib
+import logging
+
+from .text_buffer import text_end
+
+MAGIC = b'ALLCLI-SWAP\x01'
+# Size and mtime of the document the journal applies to
+HEADER = struct.Struct('<QQ')
+# kind, row, col, length of the UTF-8 text that follows; a CRC32 closes each record
+RECORD = struct.Struct('<BIII')
+CRC = struct.Struct('<I')
+
+INSERT, DELETE, CHECKPOINT = 1, 2, 3
+KINDS = {'insert': INSERT, 'delete': DELETE}
+
+
+def swap_path(filepath):
+    """Return the swap file used for `filepath` (a hidden file next to it)."""
+    directory, name = os.path.split(os.path.abspath(filepath))
+    return os.path.join(directory, f'.{name}.swp')
+
+
+def _identity(filepath):
+    try:
+        stat = os.stat(filepath)
+    except FileNotFoundError:
+        return 0, 0
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _encode(kind, row, col, text):
+    data = text.encode('utf-8', 'surrogateescape')
+    record = RECORD.pack(kind, row, col, len(data)) + data
+    return record + CRC.pack(zlib.crc32(record))
+
+
+class SwapJournal:
+    """
+    Append-only journal of the edits made to a document since it was last saved.
+
+    Every insert/delete reported by the TextBuffer is encoded as a small
+    binary record and buffered in memory; `checkpoint` appends the buffered
+    records plus the cursor position and fsyncs, which is cheap compared to
+    rewriting the document. After a crash the records are replayed on top of
+    the unchanged file on disk. Each record carries a CRC so a torn write at
+    the end of the journal is simply ignored.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.path = swap_path(filepath)
+        self.pending = bytearray()
+        self.file = None
+        # Positions handed out by checkpoint() stay valid across saved() rewrites
+        self.base = 0
+
+    def _read(self):
+        """Return (identity, records) from an existing swap file, or None."""
+        try:
+            with open(self.path, 'rb') as file:
+                data = file.read()
+        except FileNotFoundError:
+            return None
+        if not data.startswith(MAGIC) or len(data) < len(MAGIC) + HEADER.size:
+            return None
+        identity = HEADER.unpack_from(data, len(MAGIC))
+        records = []
+        pos = len(MAGIC) + HEADER.size
+        while pos + RECORD.size <= len(data):
+            kind, row, col, length = RECORD.unpack_from(data, pos)
+            end = pos + RECORD.size + length
+            if end + CRC.size > len(data) or CRC.unpack_from(data, end)[0] != zlib.crc32(data[pos:end]):
+                break  # Torn or corrupt tail
+            text = data[pos + RECORD.size:end].decode('utf-8', 'surrogateescape')
+            records.append((kind, row, col, text))
+            pos = end + CRC.size
+        return identity, records
+
+    def recoverable(self):
+        """True if a swap file with edits for the current version of the document exists."""
+        found = self._read()
+        if found is None:
+            return False
+        identity, records = found
+        if tuple(identity) != _identity(self.filepath):
+            logging.info(f"Ignoring stale swap file '{self.path}': the document changed since it was written.")
+            return False
+        return any(kind != CHECKPOINT for kind, _, _, _ in records)
+
+    def replay(self, buffer):
+        """Apply the journalled edits to `buffer`; returns the cursor of the last checkpoint."""
+        _, records = self._read()
+        cursor = None
+        for kind, row, col, text in records:
+            if kind == INSERT:
+                buffer.insert_text(row, col, text)
+            elif kind == DELETE:
+                buffer.delete_text(row, col, *text_end(row, col, text))
+            else:
+                cursor = (row, col)
+        return cursor
+
+    def start(self, keep=False):
+        """Open the journal for appending, starting a fresh one unless `keep` is set."""
+        if not keep:
+            self._rewrite(b'')
+        self.file = open(self.path, 'ab')
+
+    def _rewrite(self, records):
+        """Atomically replace the swap file with a new header followed by `records`."""
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'wb') as file:
+            file.write(MAGIC + HEADER.pack(*_identity(self.filepath)) + records)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.path)
+
+    def record(self, kind, row, col, text):
+        """Buffer listener: queue an edit record."""
+        if kind in KINDS:
+            self.pending += _encode(KINDS[kind], row, col, text)
+
+    def checkpoint(self, cursor=(0, 0)):
+        """Append queued records and the cursor position, then fsync; returns the journal position."""
+        if self.file is None:
+            return 0
+        if self.pending:
+            self.pending += _encode(CHECKPOINT, cursor[0], cursor[1], '')
+            self.file.write(self.pending)
+            self.pending = bytearray()
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        return self.base + self.file.tell()
+
+    def saved(self, offset):
+        """The document was saved with every edit up to journal `offset`; drop those records."""
+        if self.file is None:
+            return
+        self.checkpoint()
+        self.file.close()
+        with open(self.path, 'rb') as file:
+            file.seek(offset - self.base)
+            tail = file.read()
+        self._rewrite(tail)
+        self.base = offset - len(MAGIC) - HEADER.size
+        self.file = open(self.path, 'ab')
+
+    def close(self):
+        """Close the journal and leave it on disk for the next session to recover."""
+        if self.file is not None:
+            self.checkpoint()
+            self.file.close()
+            self.file = None
+
+    def discard(self):
+        """Close and delete the journal."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        if os.path.exists(self.path):
+            os.remove(self.path)
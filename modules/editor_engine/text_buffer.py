@@ -0,0 +1,291 @@
+import random
+from array import array
+
+
+class LineSource:
+    """Read-only, line-indexed view over the original text of a document."""
+
+    def __init__(self, text=''):
+        self.text = text
+        starts = array('q', [0])
+        find = text.find
+        pos = find('\n')
+        while pos != -1:
+            starts.append(pos + 1)
+            pos = find('\n', pos + 1)
+        self.starts = starts
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        start = self.starts[index]
+        end = self.starts[index + 1] - 1 if index + 1 < len(self.starts) else len(self.text)
+        return self.text[start:end]
+
+    def lines_between(self, start, stop):
+        """Return lines `start` up to `stop` as a list, split in one pass."""
+        end = self.starts[stop] - 1 if stop < len(self.starts) else len(self.text)
+        return self.text[self.starts[start]:end].split('\n')
+
+
+class _Piece:
+    """Treap node referencing `count` consecutive lines of an immutable source."""
+
+    __slots__ = ('source', 'start', 'count', 'total', 'priority', 'left', 'right')
+
+    def __init__(self, source, start, count):
+        self.source = source
+        self.start = start
+        self.count = count
+        self.total = count
+        self.priority = random.random()
+        self.left = None
+        self.right = None
+
+
+def _total(node):
+    return node.total if node is not None else 0
+
+
+def _update(node):
+    node.total = node.count + _total(node.left) + _total(node.right)
+
+
+def _merge(first, second):
+    """Concatenate two treaps, keeping every line of `first` before `second`."""
+    if first is None:
+        return second
+    if second is None:
+        return first
+    if first.priority > second.priority:
+        first.right = _merge(first.right, second)
+        _update(first)
+        return first
+    second.left = _merge(first, second.left)
+    _update(second)
+    return second
+
+
+def _split(node, count):
+    """Split a treap into (first `count` lines, remaining lines)."""
+    if node is None:
+        return None, None
+    left_total = _total(node.left)
+    if count <= left_total:
+        first, rest = _split(node.left, count)
+        node.left = rest
+        _update(node)
+        return first, node
+    count -= left_total
+    if count >= node.count:
+        first, rest = _split(node.right, count - node.count)
+        node.right = first
+        _update(node)
+        return node, rest
+    # The split point falls inside this piece: cut it in two, sharing the source.
+    tail = _Piece(node.source, node.start + count, node.count - count)
+    right = node.right
+    node.count = count
+    node.right = None
+    _update(node)
+    return node, _merge(tail, right)
+
+
+def _source_lines(source, start, stop):
+    """Return lines `start` up to `stop` of a piece source."""
+    if isinstance(source, tuple):
+        return source[start:stop]
+    return source.lines_between(start, stop)
+
+
+def text_end(row, col, text):
+    """Return the position just after `text` once it is inserted at (row, col)."""
+    newlines = text.count('\n')
+    if not newlines:
+        return row, col + len(text)
+    return row + newlines, len(text) - text.rfind('\n') - 1
+
+
+class TextBuffer:
+    """
+    Line-oriented piece table for the editor.
+
+    The document is a treap of pieces, each pointing at a run of lines in an
+    immutable source: the original file text (`LineSource`) or a tuple of
+    lines created by an edit. Splitting a piece only copies its bounds, so
+    inserting, deleting or joining lines costs O(log n) in the number of
+    pieces, and unchanged text is stored once as a plain string.
+    """
+
+    def __init__(self, text='', source=None):
+        self.listeners = []
+        self.source = source if source is not None else LineSource(text)
+        self._loaded = len(self.source)
+        self._root = _Piece(self.source, 0, self._loaded)
+
+    @property
+    def loading(self):
+        """True while the original source is still growing (see MappedSource)."""
+        return not getattr(self.source, 'complete', True)
+
+    def sync_source(self):
+        """Append lines the original source indexed since the last call.
+
+        They always go at the end of the document, so rows that already exist
+        (and the positions recorded by the undo history) never shift.
+        """
+        available = len(self.source)
+        if available <= self._loaded:
+            return
+        row = len(self)
+        piece = _Piece(self.source, self._loaded, available - self._loaded)
+        self._root = _merge(self._root, piece)
+        self._loaded = available
+        self._notify('load', row, 0, '\n')
+
+    def __len__(self):
+        return _total(self._root)
+
+    def line(self, row):
+        """Return the text of line `row`."""
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        node = self._root
+        while True:
+            left_total = _total(node.left)
+            if row < left_total:
+                node = node.left
+            elif row < left_total + node.count:
+                return node.source[node.start + row - left_total]
+            else:
+                row -= left_total + node.count
+                node = node.right
+
+    def lines(self, start=0, stop=None):
+        """Yield lines `start` up to (not including) `stop` in document order."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return
+        stack = []
+        node = self._root
+        offset = start
+        while node is not None:
+            left_total = _total(node.left)
+            if offset < left_total:
+                stack.append(node)
+                node = node.left
+            elif offset < left_total + node.count:
+                offset -= left_total
+                break
+            else:
+                offset -= left_total + node.count
+                node = node.right
+        remaining = stop - start
+        while node is not None and remaining > 0:
+            end = min(node.count, offset + remaining)
+            yield from _source_lines(node.source, node.start + offset, node.start + end)
+            remaining -= end - offset
+            offset = 0
+            if node.right is not None:
+                node = node.right
+                while node.left is not None:
+                    stack.append(node)
+                    node = node.left
+            else:
+                node = stack.pop() if stack else None
+
+    def text(self):
+        """Return the whole document as a single string."""
+        return '\n'.join(self.lines())
+
+    def _replace(self, row, count, new_lines):
+        """Replace `count` lines starting at `row` with `new_lines`."""
+        head, rest = _split(self._root, row)
+        _, tail = _split(rest, count)
+        if new_lines:
+            head = _merge(head, _Piece(tuple(new_lines), 0, len(new_lines)))
+        self._root = _merge(head, tail)
+
+    def _notify(self, kind, row, col, text):
+        # kind is 'insert' or 'delete' for edits, 'load' when source lines arrive
+        for listener in self.listeners:
+            listener(kind, row, col, text)
+
+    def insert_text(self, row, col, text):
+        """Insert `text` (which may span lines) at (row, col) and return the end position."""
+        line = self.line(row)
+        parts = text.split('\n')
+        if len(parts) == 1:
+            new_lines = [line[:col] + text + line[col:]]
+        else:
+            new_lines = [line[:col] + parts[0]]
+            new_lines.extend(parts[1:-1])
+            new_lines.append(parts[-1] + line[col:])
+        self._replace(row, 1, new_lines)
+        self._notify('insert', row, col, text)
+        return text_end(row, col, text)
+
+    def delete_text(self, row, col, end_row, end_col):
+        """Delete the text between (row, col) and (end_row, end_col) and return it."""
+        first = self.line(row)
+        if end_row == row:
+            deleted = first[col:end_col]
+            remainder = first[:col] + first[end_col:]
+        else:
+            last = self.line(end_row)
+            parts = [first[col:]]
+            parts.extend(self.lines(row + 1, end_row))
+            parts.append(last[:end_col])
+            deleted = '\n'.join(parts)
+            remainder = first[:col] + last[end_col:]
+        if deleted:
+            self._replace(row, end_row - row + 1, [remainder])
+            self._notify('delete', row, col, deleted)
+        return deleted
+
+    def insert_lines(self, row, new_lines):
+        """Insert whole lines so that the first one becomes line `row`."""
+        if not new_lines:
+            return
+        if row < len(self):
+            self.insert_text(row, 0, '\n'.join(new_lines) + '\n')
+        else:
+            last = len(self) - 1
+            self.insert_text(last, len(self.line(last)), '\n' + '\n'.join(new_lines))
+
+    def delete_lines(self, row, count):
+        """Delete up to `count` whole lines starting at `row` and return them."""
+        count = min(count, len(self) - row)
+        removed = list(self.lines(row, row + count))
+        if row + count < len(self):
+            self.delete_text(row, 0, row + count, 0)
+        elif row > 0:
+            self.delete_text(row - 1, len(self.line(row - 1)), len(self) - 1, len(removed[-1]))
+        else:
+            self.delete_text(0, 0, len(self) - 1, len(removed[-1]))
+        return removed
+
+    def set_char(self, row, col, char):
+        """Overwrite the character at (row, col), appending at the end of the line."""
+        if col < len(self.line(row)):
+            self.delete_text(row, col, row, col + 1)
+        self.insert_text(row, col, char)
+
+    def snapshot(self):
+        """Return the document as a list of (source, start, count) pieces.
+
+        Sources are immutable, so the snapshot stays valid while the buffer is
+        edited and can be read from another thread (see file_io).
+        """
+        pieces = []
+        stack = []
+        node = self._root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            pieces.append((node.source, node.start, node.count))
+            node = node.right
+        return pieces
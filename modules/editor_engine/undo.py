@@ -0,0 +1,114 @@
+from collections import deque
+
+from .text_buffer import text_end
+
+# Rough per-operation bookkeeping cost, counted against the memory cap.
+OP_OVERHEAD = 64
+# Typed text is merged into a single operation up to this many characters.
+MAX_MERGED_TEXT = 4096
+
+
+class UndoHistory:
+    """
+    Operation-log undo/redo for a TextBuffer.
+
+    Every buffer edit is recorded as an ('insert' | 'delete', row, col, text)
+    operation. Operations are collected into a pending group until the editor
+    calls `commit`, so a whole insert session is undone in one step; moving
+    the cursor away from the pending edits also closes the group. Undo
+    replays the inverse operations; memory is capped by evicting the oldest
+    groups once the recorded text exceeds `max_bytes`.
+    """
+
+    def __init__(self, buffer, max_bytes):
+        self.buffer = buffer
+        self.max_bytes = max_bytes
+        self.undo_stack = deque()
+        self.redo_stack = []
+        self.size = 0
+        self._pending = []
+        self._cursor_before = (0, 0)
+        self._replaying = False
+        buffer.listeners.append(self.record)
+
+    def mark(self, cursor):
+        """
+        Called before every key: remember the cursor position in case the next
+        edit opens a group. A cursor that left the pending edits jumped, so
+        what was typed before the jump becomes its own group.
+        """
+        if self._pending and cursor not in _edges(self._pending[-1]):
+            self.commit(_edges(self._pending[-1])[1])
+        if not self._pending:
+            self._cursor_before = cursor
+
+    def record(self, kind, row, col, text):
+        """Buffer listener: append an edit to the pending group."""
+        if self._replaying or kind == 'load':
+            return
+        if self._pending:
+            last = self._pending[-1]
+            if len(last[3]) < MAX_MERGED_TEXT and last[0] == kind:
+                if kind == 'insert' and text_end(last[1], last[2], last[3]) == (row, col):
+                    last[3] += text
+                    return
+                if kind == 'delete' and (last[1], last[2]) == (row, col):
+                    last[3] += text
+                    return
+                if kind == 'delete' and text_end(row, col, text) == (last[1], last[2]):
+                    last[1:] = [row, col, text + last[3]]
+                    return
+        self._pending.append([kind, row, col, text])
+
+    def commit(self, cursor):
+        """Close the pending group as one undo step ending at `cursor`."""
+        if not self._pending:
+            return
+        ops = self._pending
+        self._pending = []
+        self.undo_stack.append((ops, self._cursor_before, cursor))
+        self.size += _group_size(ops)
+        for ops_, _, _ in self.redo_stack:
+            self.size -= _group_size(ops_)
+        self.redo_stack.clear()
+        while self.size > self.max_bytes and len(self.undo_stack) > 1:
+            self.size -= _group_size(self.undo_stack.popleft()[0])
+
+    def undo(self):
+        """Revert the latest group and return the cursor to restore, or None."""
+        if not self.undo_stack:
+            return None
+        group = self.undo_stack.pop()
+        self._apply(reversed(group[0]), inverse=True)
+        self.redo_stack.append(group)
+        return group[1]
+
+    def redo(self):
+        """Re-apply the latest undone group and return the cursor to restore, or None."""
+        if not self.redo_stack:
+            return None
+        group = self.redo_stack.pop()
+        self._apply(group[0], inverse=False)
+        self.undo_stack.append(group)
+        return group[2]
+
+    def _apply(self, ops, inverse):
+        self._replaying = True
+        try:
+            for kind, row, col, text in ops:
+                if (kind == 'insert') != inverse:
+                    self.buffer.insert_text(row, col, text)
+                else:
+                    self.buffer.delete_text(row, col, *text_end(row, col, text))
+        finally:
+            self._replaying = False
+
+
+def _edges(op):
+    """Positions where the cursor may be after `op`: its start and its end."""
+    kind, row, col, text = op
+    return (row, col), (text_end(row, col, text) if kind == 'insert' else (row, col))
+
+
+def _group_size(ops):
+    return sum(len(op[3]) + OP_OVERHEAD for op in ops)
@@ -1,59 +1,376 @@
 import os
+import io
 import base64
 import getpass
 import logging
-from cryptography.fernet import Fernet
+import struct
+import tempfile
+import time
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.backends import default_backend
+from configs import config
 
-def derive_key_from_password(password: str, salt: bytes) -> bytes:
+SALT_SIZE = 16
+KDF_PBKDF2_SHA256 = 1
+KDF_ITERATIONS = 100_000
+
+# Container format: MAGIC, HEADER, then AES-GCM chunks of at most `chunk_size`
+# plaintext bytes plus a TAG_SIZE tag each. Files without MAGIC are legacy
+# salt + Fernet token files.
+MAGIC = b'ALLCLI-ENC'
+VERSION = 2
+# version, KDF id, KDF iterations, chunk size, salt, nonce prefix
+HEADER = struct.Struct('<BBII16s8s')
+TAG_SIZE = 16
+
+def derive_key_from_password(password: str, salt: bytes, iterations: int = KDF_ITERATIONS) -> bytes:
     """Derives a cryptographic key from the given password and salt."""
     kdf = PBKDF2HMAC(
         algorithm=hashes.SHA256(),
         length=32,
         salt=salt,
-        iterations=100_000,
+        iterations=iterations,
         backend=default_backend()
     )
     key = base64.urlsafe_b64encode(kdf.derive(password.encode()))
     return key
 
-def encrypt_file(filepath: str):
+class KeyRing:
+    """
+    In-process cache of the session password and the keys derived from it.
+
+    The password is asked for once and kept for `ttl` seconds after its last
+    use; keys are derived once per salt, so repeated reads of the same file
+    and every file written this session (they share one session salt) skip
+    PBKDF2 entirely. `lock` forgets the password and all keys.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.password = None
+        self.expires = 0
+        self.keys = {}
+        self.session_salt = None
+
+    @property
+    def locked(self):
+        return self.password is None or time.monotonic() >= self.expires
+
+    def unlock(self, prompt="Enter password: "):
+        """Return the session password, asking for it if the keyring is locked."""
+        if self.locked:
+            self.lock()
+            self.password = self.ask(prompt=prompt)
+        self.expires = time.monotonic() + self.ttl
+        return self.password
+
+    def ask(self, prompt):
+        """Ask for a password on the terminal; the daemon swaps this to ask its client."""
+        return getpass.getpass(prompt=prompt)
+
+    def use_password(self, password):
+        """Unlock with `password` instead of asking, e.g. one given to the command line."""
+        if self.locked or password != self.password:
+            self.lock()
+            self.password = password
+        self.expires = time.monotonic() + self.ttl
+
+    def key_for(self, salt: bytes, iterations: int = KDF_ITERATIONS, prompt="Enter decryption password: ") -> bytes:
+        """Return the key for `salt`, deriving it only the first time."""
+        password = self.unlock(prompt)
+        key = self.keys.get((salt, iterations))
+        if key is None:
+            key = self.keys[salt, iterations] = derive_key_from_password(password, salt, iterations)
+        return key
+
+    def write_key(self, prompt="Enter encryption password: "):
+        """Return (key, salt) for encrypting a new file this session."""
+        if self.locked or self.session_salt is None:
+            self.unlock(prompt)
+            self.session_salt = os.urandom(SALT_SIZE)
+        return self.key_for(self.session_salt, prompt=prompt), self.session_salt
+
+    def lock(self):
+        """Forget the password and every derived key."""
+        self.password = None
+        self.expires = 0
+        self.keys.clear()
+        self.session_salt = None
+
+keyring = KeyRing(config.KEYRING_TTL)
+
+def lock_keyring():
+    """Wipe the cached password and keys, so the next access asks again."""
+    keyring.lock()
+    logging.info("Encryption keyring locked.")
+
+def _temp_file(filepath: str):
+    """Open a temp file next to `filepath`; returns (file, temp_path)."""
+    directory = os.path.dirname(os.path.abspath(filepath))
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    return os.fdopen(fd, 'wb'), temp_path
+
+def _replace_with(filepath: str, write):
+    """Call `write(file)` on a temp file, fsync it and rename it over `filepath`."""
+    file, temp_path = _temp_file(filepath)
+    try:
+        with file:
+            write(file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, filepath)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def _chunk_cipher(key: bytes, header: bytes, nonce_prefix: bytes):
+    """Return encrypt/decrypt functions for chunk `index` of a container."""
+    aesgcm = AESGCM(base64.urlsafe_b64decode(key))
+
+    def nonce(index):
+        return nonce_prefix + index.to_bytes(4, 'big')
+
+    def aad(final):
+        # The header and a final-chunk flag are authenticated with every chunk,
+        # so parameters cannot be swapped and truncation is detected
+        return header + (b'\x01' if final else b'\x00')
+
+    def encrypt(index, data, final):
+        return aesgcm.encrypt(nonce(index), data, aad(final))
+
+    def decrypt(index, data, final):
+        return aesgcm.decrypt(nonce(index), data, aad(final))
+
+    return encrypt, decrypt
+
+def is_legacy_file(filepath: str) -> bool:
+    """True for files in the old salt + Fernet token format."""
+    with open(filepath, 'rb') as file:
+        return file.read(len(MAGIC)) != MAGIC
+
+def read_header(file):
+    """Read the container header from `file`; returns (header_bytes, fields)."""
+    header = file.read(len(MAGIC) + HEADER.size)
+    if len(header) < len(MAGIC) + HEADER.size or not header.startswith(MAGIC):
+        raise ValueError("not an encrypted container")
+    version, kdf, iterations, chunk_size, salt, nonce_prefix = HEADER.unpack_from(header, len(MAGIC))
+    if version != VERSION or kdf != KDF_PBKDF2_SHA256:
+        raise ValueError(f"unsupported container version {version} / KDF {kdf}")
+    return header, (iterations, chunk_size, salt, nonce_prefix)
+
+def _rechunk(blocks, size: int):
+    """Regroup byte `blocks` into pieces of exactly `size` bytes (the last may be shorter)."""
+    pending = bytearray()
+    for block in blocks:
+        pending += block
+        # Slice by offset and drop the used bytes once per block: trimming
+        # after every piece would copy a large block's tail over and over
+        start = 0
+        while len(pending) - start >= size:
+            yield bytes(pending[start:start + size])
+            start += size
+        del pending[:start]
+    if pending:
+        yield bytes(pending)
+
+def encrypt_chunks(blocks, filepath: str, key: bytes, salt: bytes, chunk_size: int = None):
+    """
+    Encrypt the byte `blocks` into a container at `filepath`, one chunk at a
+    time, so memory use does not depend on the file size.
+    """
+    chunk_size = chunk_size or config.ENCRYPTION_CHUNK_SIZE
+    header = MAGIC + HEADER.pack(VERSION, KDF_PBKDF2_SHA256, KDF_ITERATIONS, chunk_size, salt, os.urandom(8))
+    encrypt, _ = _chunk_cipher(key, header, header[-8:])
+    chunks = _rechunk(blocks, chunk_size)
+
+    def write(file):
+        file.write(header)
+        index = 0
+        chunk = next(chunks, b'')
+        while True:
+            # Look one chunk ahead to know which chunk is the last
+            following = next(chunks, None)
+            file.write(encrypt(index, chunk, final=following is None))
+            if following is None:
+                break
+            chunk = following
+            index += 1
+
+    _replace_with(filepath, write)
+
+def encrypt_stream(source, filepath: str, key: bytes, salt: bytes, chunk_size: int = None):
+    """Encrypt the binary file object `source` into a container at `filepath`."""
+    chunk_size = chunk_size or config.ENCRYPTION_CHUNK_SIZE
+    encrypt_chunks(iter(lambda: source.read(chunk_size), b''), filepath, key, salt, chunk_size)
+
+def _chunk_count(filepath: str, header_size: int, chunk_size: int) -> int:
+    body = os.path.getsize(filepath) - header_size
+    return -(-body // (chunk_size + TAG_SIZE))
+
+def decrypt_stream(filepath: str, key: bytes):
+    """Yield the decrypted chunks of a container in order."""
+    with open(filepath, 'rb') as file:
+        header, (_, chunk_size, _, nonce_prefix) = read_header(file)
+        _, decrypt = _chunk_cipher(key, header, nonce_prefix)
+        count = _chunk_count(filepath, len(header), chunk_size)
+        if count < 1:
+            # Even empty plaintext has a final chunk; only the header is left
+            raise ValueError("wrong password or corrupted file")
+        for index in range(count):
+            # The last chunk only authenticates if it was written as the final one
+            yield decrypt(index, file.read(chunk_size + TAG_SIZE), final=index == count - 1)
+
+def read_chunk(filepath: str, key: bytes, index: int) -> bytes:
+    """Decrypt only chunk `index` of a container."""
+    with open(filepath, 'rb') as file:
+        header, (_, chunk_size, _, nonce_prefix) = read_header(file)
+        _, decrypt = _chunk_cipher(key, header, nonce_prefix)
+        count = _chunk_count(filepath, len(header), chunk_size)
+        if not 0 <= index < count:
+            raise IndexError(f"chunk {index} out of range (0-{count - 1})")
+        file.seek(len(header) + index * (chunk_size + TAG_SIZE))
+        return decrypt(index, file.read(chunk_size + TAG_SIZE), final=index == count - 1)
+
+def is_encrypted(filepath: str) -> bool:
+    """True for containers and legacy salt + Fernet files (a Fernet token starts with 'gA')."""
+    with open(filepath, 'rb') as file:
+        start = file.read(max(len(MAGIC), SALT_SIZE + 2))
+    return start.startswith(MAGIC) or start[SALT_SIZE:SALT_SIZE + 2] == b'gA'
+
+def key_params(filepath: str):
+    """Return the (salt, iterations) a file's key is derived with."""
+    with open(filepath, 'rb') as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            file.seek(0)
+            return file.read(SALT_SIZE), KDF_ITERATIONS
+        file.seek(0)
+        _, (iterations, _, salt, _) = read_header(file)
+        return salt, iterations
+
+def decrypt_chunks(filepath: str, key: bytes):
+    """Yield the plaintext of a container or legacy file; wrong keys raise ValueError."""
     try:
-        password = getpass.getpass(prompt="Enter encryption password: ")
-        salt = os.urandom(16)
-        key = derive_key_from_password(password, salt)
+        if is_legacy_file(filepath):
+            with open(filepath, 'rb') as file:
+                file.seek(SALT_SIZE)
+                yield Fernet(key).decrypt(file.read())
+        else:
+            yield from decrypt_stream(filepath, key)
+    except (InvalidToken, InvalidTag):
+        raise ValueError("wrong password or corrupted file")
+
+def decrypt_to_file(filepath: str, destination: str, key: bytes):
+    """Write the plaintext of `filepath` to `destination`, atomically."""
+    chunks = decrypt_chunks(filepath, key)
+
+    def write(file):
+        for chunk in chunks:
+            file.write(chunk)
 
-        with open(filepath, 'rb') as file:
-            data = file.read()
+    _replace_with(destination, write)
 
-        fernet = Fernet(key)
-        encrypted = fernet.encrypt(data)
+def rekey_file(filepath: str, old_key: bytes, new_key: bytes, new_salt: bytes):
+    """Re-encrypt `filepath` under a new key without writing its plaintext anywhere."""
+    encrypt_chunks(decrypt_chunks(filepath, old_key), filepath, new_key, new_salt)
+
+def _file_key(salt: bytes, iterations: int, password: str = None) -> bytes:
+    if password is None:
+        return keyring.key_for(salt, iterations)
+    return derive_key_from_password(password, salt, iterations)
+
+def read_encrypted(filepath: str, password: str = None, lock_on_failure: bool = True):
+    """
+    Decrypt a file into memory without writing anything back.
+    Returns (data, key, salt) so the caller can re-encrypt with `write_encrypted`
+    without running the key derivation again. Without an explicit `password`
+    the session keyring is used, and locked again if the file does not
+    decrypt unless `lock_on_failure` is off. Legacy Fernet files are migrated
+    to the container format on first read.
+    """
+    try:
+        try:
+            if is_legacy_file(filepath):
+                with open(filepath, 'rb') as file:
+                    salt = file.read(SALT_SIZE)
+                    encrypted_data = file.read()
+                key = _file_key(salt, KDF_ITERATIONS, password)
+                data = Fernet(key).decrypt(encrypted_data)
+                write_encrypted(filepath, data, key, salt)
+                logging.info(f"File '{filepath}' migrated to the chunked container format.")
+                return data, key, salt
 
-        with open(filepath, 'wb') as file:
-            file.write(salt + encrypted)
+            with open(filepath, 'rb') as file:
+                _, (iterations, _, salt, _) = read_header(file)
+            key = _file_key(salt, iterations, password)
+            data = b''.join(decrypt_stream(filepath, key))
+        except (InvalidToken, InvalidTag):
+            if password is None and lock_on_failure:
+                # Most likely a mistyped password; ask again next time
+                keyring.lock()
+            raise ValueError("wrong password or corrupted file")
 
+        if iterations != KDF_ITERATIONS:
+            # Older KDF parameters: hand out a current key so saves upgrade the file
+            if password is None:
+                key, salt = keyring.write_key()
+            else:
+                salt = os.urandom(SALT_SIZE)
+                key = derive_key_from_password(password, salt)
+
+        logging.info(f"File '{filepath}' decrypted in memory.")
+        return data, key, salt
+    except Exception as e:
+        logging.error(f"Error decrypting file '{filepath}': {e}")
+        raise
+
+def write_encrypted(filepath: str, data: bytes, key: bytes, salt: bytes):
+    """Encrypt in-memory `data` with an already derived key and atomically replace `filepath`."""
+    try:
+        encrypt_stream(io.BytesIO(data), filepath, key, salt)
         logging.info(f"File '{filepath}' encrypted successfully.")
     except Exception as e:
         logging.error(f"Error encrypting file '{filepath}': {e}")
         raise
 
-def decrypt_file(filepath: str):
-    try:
-        password = getpass.getpass(prompt="Enter decryption password: ")
+def _password_key(password: str = None):
+    """Return (key, salt) for a new file under the session (or the given) password."""
+    if password is None:
+        return keyring.write_key()
+    salt = os.urandom(SALT_SIZE)
+    return derive_key_from_password(password, salt), salt
 
-        with open(filepath, 'rb') as file:
-            salt = file.read(16)
-            encrypted_data = file.read()
+def encrypt_data_to_file(filepath: str, data: bytes, password: str = None):
+    """Encrypt in-memory `data` under the session (or the given) password and write it to `filepath`."""
+    key, salt = _password_key(password)
+    write_encrypted(filepath, data, key, salt)
 
-        key = derive_key_from_password(password, salt)
+def encrypt_file(filepath: str, password: str = None):
+    """Encrypt `filepath` in place, streaming it chunk by chunk."""
+    try:
+        key, salt = _password_key(password)
+        with open(filepath, 'rb') as source:
+            encrypt_stream(source, filepath, key, salt)
 
-        fernet = Fernet(key)
-        decrypted = fernet.decrypt(encrypted_data)
+        logging.info(f"File '{filepath}' encrypted successfully.")
+    except Exception as e:
+        logging.error(f"Error encrypting file '{filepath}': {e}")
+        raise
 
-        with open(filepath, 'wb') as file:
-            file.write(decrypted)
+def decrypt_file(filepath: str, password: str = None):
+    """Decrypt `filepath` in place; containers are streamed chunk by chunk."""
+    try:
+        salt, iterations = key_params(filepath)
+        try:
+            decrypt_to_file(filepath, filepath, _file_key(salt, iterations, password))
+        except ValueError:
+            if password is None:
+                keyring.lock()
+            raise
 
         logging.info(f"File '{filepath}' decrypted successfully.")
     except Exception as e:
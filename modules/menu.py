@@ -1,64 +1,31 @@
-import questionary
-
-from .ui import display_welcome_message, display_panel, display_exit_message
+from .ui import display_panel, display_exit_message
+from .shell import Shell, Menu, EXIT
 from modules.folder_init import logging
 
-from modules.custom_modules.personal_menu import personal
-from modules.custom_modules.mission.mission_logs import mission
-from modules.settings_modules.settings_menu import settings_main
-
-from modules.custom_modules.work_menu import work_menu
-
-# Centralized style configuration
-STYLE = questionary.Style([
-    ('qmark', 'fg:#E91E63 bold'),
-    ('question', 'fg:#673AB7 bold'),
-    ('answer', 'fg:#2196F3 bold'),
-    ('pointer', 'fg:#03A9F4 bold'),
-    ('highlighted', 'fg:#03A9F4 bold'),
-    ('selected', 'fg:#4CAF50 bold'),
-    ('separator', 'fg:#E0E0E0'),
-    ('instruction', 'fg:#9E9E9E'),
-    ('text', 'fg:#FFFFFF'),
-    ('disabled', 'fg:#757575 italic')
+MAIN_MENU = Menu("Main Menu", [
+    ("1: Personal", 'personal'),
+    ("2: Work", 'work'),  # Mission logs, etc.
+    ("3: Settings", 'settings'),  # Configs, Templates, Preferences
+    ("4: Support Development", 'modules.menu:donate'),  # Donation option
+    ("5: Exit", EXIT),
 ])
 
-def main_menu():
-    
-    """Display the main menu and handle user selection."""
-    display_welcome_message()
-
-    options = [
-        "1: Personal",
-        "2: Work",  # Mission logs, etc.
-        "3: Settings",   # Configs, Templates, Preferences
-        "4: Support Development",  # Donation option
-        "5: Exit"
-    ]
-
-    choice = questionary.select(
-        "Choose an action:",
-        choices=options,
-        style=STYLE
-    ).ask()
-
-    # Handling the user's choice
-    menu_actions = {
-        options[0]: personal,
-        options[1]: work_menu,
-        options[2]: settings_main,
-        options[3]: donate,
-        options[4]: exit_app
-    }
-
-    action = menu_actions.get(choice)
-    if action:
-        action()
-    else:
-        display_exit_message()
-        exit()
-
+# The menu tree. Submenus are imported the first time they are opened, so
+# the main menu shows up without loading the editor, encryption, templates
+# and every feature module first
+MENUS = {
+    'main': MAIN_MENU,
+    'personal': 'modules.custom_modules.personal_menu:PERSONAL_MENU',
+    'journal': 'modules.custom_modules.journal.journals:JOURNAL_MENU',
+    'work': 'modules.custom_modules.work_menu:WORK_MENU',
+    'mission': 'modules.custom_modules.mission.mission_logs:MISSION_MENU',
+    'settings': 'modules.settings_modules.settings_menu:SETTINGS_MENU',
+}
 
+def main_menu():
+    """Run the menu shell until the user exits."""
+    Shell(MENUS).run()
+    exit_app()
 
 def donate():
     """Provide users with an option to donate to support development."""
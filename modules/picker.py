@@ -0,0 +1,169 @@
+import re
+
+from prompt_toolkit.application import Application
+from prompt_toolkit.buffer import Buffer
+from prompt_toolkit.key_binding import KeyBindings
+from prompt_toolkit.layout import Layout, HSplit, VSplit, Window
+from prompt_toolkit.layout.controls import BufferControl, FormattedTextControl
+from prompt_toolkit.styles import Style
+
+from configs import config
+
+PICKER_PAGE_SIZE = config.PICKER_PAGE_SIZE
+
+# The questionary palette used by the menus
+STYLE = Style.from_dict({
+    'qmark': 'fg:#E91E63 bold',
+    'question': 'fg:#673AB7 bold',
+    'pointer': 'fg:#03A9F4 bold',
+    'highlighted': 'fg:#03A9F4 bold',
+    'instruction': 'fg:#9E9E9E',
+    'text': 'fg:#FFFFFF',
+    'disabled': 'fg:#757575 italic',
+})
+
+
+class FuzzyIndex:
+    """
+    Fuzzy matcher over a fixed list of labels.
+
+    Labels are lowercased once up front. A query matches a label when its
+    characters appear in order; labels containing the query as one piece
+    come first, otherwise the original order is kept. Each result is
+    remembered with its query, so typing one more character filters the
+    previous matches instead of every label, and backspace is a lookup.
+    """
+
+    def __init__(self, labels):
+        self.keys = [label.lower() for label in labels]
+        everything = list(range(len(self.keys)))
+        # Stack of (query, contiguous matches, loose matches), each a prefix of the next
+        self._results = [('', everything, [])]
+
+    def filter(self, query):
+        """Indexes of the labels matching `query`, best first."""
+        query = ''.join(query.lower().split())
+        while not query.startswith(self._results[-1][0]):
+            self._results.pop()
+        base_query, contiguous, loose = self._results[-1]
+        if query != base_query:
+            keys = self.keys
+            # "[^a]*a[^b]*b...": matches the characters in order, without backtracking
+            match = re.compile(''.join(f'[^{re.escape(c)}]*{re.escape(c)}' for c in query)).match
+            # Contiguous matches for the longer query can only come from the contiguous ones
+            new_contiguous, demoted = [], []
+            for i in contiguous:
+                if query in keys[i]:
+                    new_contiguous.append(i)
+                elif match(keys[i]):
+                    demoted.append(i)
+            new_loose = [i for i in loose if match(keys[i])]
+            if demoted:
+                new_loose = sorted(demoted + new_loose)
+            self._results.append((query, new_contiguous, new_loose))
+        _, contiguous, loose = self._results[-1]
+        return contiguous + loose
+
+
+class Picker:
+    """
+    Type-to-filter list picker for long lists (a questionary.select stand-in).
+
+    Only the visible page of rows is rendered, so the cost of a keystroke is
+    the filtering, not the list size.
+    """
+
+    def __init__(self, message, choices, page_size=PICKER_PAGE_SIZE, input=None, output=None):
+        self.choices = [choice if isinstance(choice, tuple) else (choice, choice) for choice in choices]
+        self.index = FuzzyIndex(label for label, _ in self.choices)
+        self.page_size = page_size
+        self.matches = self.index.filter('')
+        self.selected = self.top = 0
+
+        self.buffer = Buffer(multiline=False, on_text_changed=self._refilter)
+        prompt = Window(
+            FormattedTextControl([('class:qmark', '? '), ('class:question', f'{message} ')]),
+            dont_extend_width=True
+        )
+        self.app = Application(
+            layout=Layout(HSplit([
+                VSplit([prompt, Window(BufferControl(self.buffer), height=1)]),
+                Window(FormattedTextControl(self._rows), height=page_size),
+                Window(FormattedTextControl(self._status), height=1),
+            ]), focused_element=self.buffer),
+            key_bindings=self._bindings(),
+            style=STYLE,
+            input=input,
+            output=output,
+        )
+
+    def _refilter(self, _buffer):
+        self.matches = self.index.filter(self.buffer.text)
+        self.selected = self.top = 0
+
+    def _move(self, step):
+        if not self.matches:
+            return
+        self.selected = max(0, min(len(self.matches) - 1, self.selected + step))
+        if self.selected < self.top:
+            self.top = self.selected
+        elif self.selected >= self.top + self.page_size:
+            self.top = self.selected - self.page_size + 1
+
+    def _rows(self):
+        rows = []
+        for position in range(self.top, min(self.top + self.page_size, len(self.matches))):
+            label = self.choices[self.matches[position]][0]
+            if position == self.selected:
+                rows.append(('class:pointer', f'» {label}\n'))
+            else:
+                rows.append(('class:text', f'  {label}\n'))
+        return rows
+
+    def _status(self):
+        return [('class:instruction',
+                 f'  {len(self.matches)}/{len(self.choices)}  (type to filter, ↑↓ PgUp PgDn, Enter to pick, Esc to cancel)')]
+
+    def _bindings(self):
+        bindings = KeyBindings()
+
+        @bindings.add('up')
+        @bindings.add('c-p')
+        def _(event):
+            self._move(-1)
+
+        @bindings.add('down')
+        @bindings.add('c-n')
+        def _(event):
+            self._move(1)
+
+        @bindings.add('pageup')
+        def _(event):
+            self._move(-self.page_size)
+
+        @bindings.add('pagedown')
+        def _(event):
+            self._move(self.page_size)
+
+        @bindings.add('enter')
+        def _(event):
+            if self.matches:
+                event.app.exit(result=self.choices[self.matches[self.selected]][1])
+
+        @bindings.add('escape', eager=True)
+        @bindings.add('c-c')
+        def _(event):
+            event.app.exit(result=None)
+
+        return bindings
+
+    def run(self):
+        return self.app.run()
+
+
+def pick(message, choices, page_size=PICKER_PAGE_SIZE):
+    """
+    Let the user pick one of `choices` (labels, or (label, value) tuples) by
+    typing to fuzzy-filter them. Returns the value, or None when cancelled.
+    """
+    return Picker(message, choices, page_size).run()
@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from modules.encryption import keyring, encrypt_data_to_file
+from modules.custom_modules.mission.catalog import sync_catalogs
+from modules.custom_modules.mission.manifest import MissionManifest
+from modules.custom_modules.mission.search_index import MissionIndex
+from modules.custom_modules.mission.records import new_record, encode_record
+
+
+@pytest.fixture
+def logs(tmp_path):
+    directory = tmp_path / 'mission_logs'
+    directory.mkdir()
+    keyring.use_password('session password')
+    yield directory
+    keyring.lock()
+
+
+def write_log(directory, name, mission_name, password=None):
+    record = new_record({'mission_name': mission_name, 'objective': f"survey {mission_name}"})
+    encrypt_data_to_file(str(directory / name), encode_record(record), password)
+
+
+def catalogs(directory):
+    return (MissionIndex(str(directory) + '.index', str(directory)),
+            MissionManifest(str(directory) + '.manifest', str(directory)))
+
+
+def test_log_under_another_password_is_listed_by_name_only(logs):
+    write_log(logs, 'mission_log_2024-01-01_00-00-00.txt', 'Alpha')
+    index, manifest = catalogs(logs)
+    sync_catalogs(index, manifest)
+    write_log(logs, 'mission_log_2024-01-02_00-00-00.txt', 'Bravo')
+    write_log(logs, 'mission_log_2024-01-03_00-00-00.txt', 'Foreign', password='left by a rekey')
+    os.utime(logs)  # A new directory mtime, even within the same clock tick
+
+    assert sync_catalogs(index, manifest) == 1
+
+    entries = dict(manifest.listing())
+    assert entries['mission_log_2024-01-03_00-00-00.txt'] is None
+    assert entries['mission_log_2024-01-02_00-00-00.txt']['mission_name'] == 'Bravo'
+    assert index.search('bravo') == ['mission_log_2024-01-02_00-00-00.txt']
+    assert not keyring.locked
+
+
+def test_wrong_password_without_catalogs_is_an_error(logs):
+    write_log(logs, 'mission_log_2024-01-01_00-00-00.txt', 'Alpha')
+    keyring.use_password('mistyped')
+    index, manifest = catalogs(logs)
+
+    with pytest.raises(ValueError):
+        sync_catalogs(index, manifest)
+
+    assert keyring.locked
+    assert not os.path.exists(manifest.path)
@@ -0,0 +1,87 @@
+import os
+
+import pytest
+
+from modules.dir_manifest import DirectoryManifest, first_line_title
+
+
+@pytest.fixture
+def directory(tmp_path):
+    directory = tmp_path / 'journals'
+    directory.mkdir()
+    (directory / 'journal_2024-01-01_08-00-00.txt').write_text('First\nbody\n')
+    return directory
+
+
+def set_dir_mtime(directory, mtime_ns):
+    os.utime(directory, ns=(mtime_ns, mtime_ns))
+
+
+def test_file_added_within_the_same_mtime_tick_is_picked_up(directory):
+    manifest = DirectoryManifest(str(directory))
+    manifest.refresh()
+    tick = os.stat(directory).st_mtime_ns
+
+    # A second change that the filesystem timestamp cannot tell apart from the first
+    (directory / 'journal_2024-01-02_08-00-00.txt').write_text('Second\n')
+    set_dir_mtime(directory, tick)
+
+    assert manifest.dir_mtime is None
+    assert manifest.refresh()
+    assert manifest.names() == {'journal_2024-01-01_08-00-00.txt', 'journal_2024-01-02_08-00-00.txt'}
+
+
+def test_old_directory_mtime_is_trusted(directory):
+    old = 1_600_000_000 * 10**9
+    set_dir_mtime(directory, old)
+    manifest = DirectoryManifest(str(directory))
+    manifest.refresh()
+    assert manifest.dir_mtime == old
+
+    # Only the directory is stat'ed while its mtime is unchanged
+    (directory / 'journal_2024-01-02_08-00-00.txt').write_text('Second\n')
+    set_dir_mtime(directory, old)
+    assert not manifest.refresh()
+    assert len(manifest.names()) == 1
+
+
+def test_generation_changes_only_with_the_listing(directory):
+    manifest = DirectoryManifest(str(directory))
+    manifest.refresh()
+    generation = manifest.generation
+
+    manifest.refresh()
+    os.utime(directory)  # Rescanned, but nothing in it changed
+    manifest.refresh()
+    (directory / '.journal.txt.swp').write_bytes(b'swap')
+    (directory / 'journal.txt.1234.tmp').write_text('half saved')
+    manifest.refresh()
+    assert manifest.generation == generation
+
+    (directory / 'journal_2024-01-01_08-00-00.txt').write_text('First, edited\n')
+    manifest.refresh()
+    assert manifest.generation == generation + 1
+
+    os.remove(directory / 'journal_2024-01-01_08-00-00.txt')
+    manifest.refresh()
+    assert manifest.generation == generation + 2
+    assert manifest.names() == set()
+
+
+def test_listing_is_newest_first_and_survives_a_restart(directory):
+    (directory / 'journal_2024-03-01_08-00-00.txt').write_text('\n  Third  \n')
+    (directory / 'notes.txt').write_text('Undated\n')
+    old = 1_600_000_000 * 10**9
+    os.utime(directory / 'notes.txt', ns=(old, old))  # Undated files are ordered by mtime
+    set_dir_mtime(directory, old)
+    manifest = DirectoryManifest(str(directory), title=first_line_title)
+    listing = manifest.listing()
+
+    assert [name for name, _ in listing] == ['journal_2024-03-01_08-00-00.txt', 'journal_2024-01-01_08-00-00.txt', 'notes.txt']
+    assert dict(listing)['journal_2024-03-01_08-00-00.txt']['title'] == 'Third'
+
+    def no_reads(filepath):
+        raise AssertionError(f"re-read {filepath}")
+
+    restarted = DirectoryManifest(str(directory), title=no_reads)
+    assert restarted.listing() == listing
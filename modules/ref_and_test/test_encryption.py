@@ -0,0 +1,110 @@
+import io
+import os
+
+import pytest
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet
+
+from modules.encryption import (
+    MAGIC, HEADER, TAG_SIZE, SALT_SIZE,
+    derive_key_from_password, encrypt_stream, decrypt_stream, read_encrypted, is_legacy_file,
+)
+
+PASSWORD = 'correct horse'
+SALT = b's' * SALT_SIZE
+CHUNK = 64
+HEADER_SIZE = len(MAGIC) + HEADER.size
+
+
+@pytest.fixture(scope='module')
+def key():
+    return derive_key_from_password(PASSWORD, SALT)
+
+
+def write_container(tmp_path, key, data):
+    filepath = str(tmp_path / 'log.txt')
+    encrypt_stream(io.BytesIO(data), filepath, key, SALT, chunk_size=CHUNK)
+    return filepath
+
+
+@pytest.mark.parametrize('size', [0, 1, CHUNK, CHUNK + 1, 5 * CHUNK])
+def test_round_trip(tmp_path, key, size):
+    data = os.urandom(size)
+    filepath = write_container(tmp_path, key, data)
+
+    assert b''.join(decrypt_stream(filepath, key)) == data
+    assert read_encrypted(filepath, PASSWORD)[0] == data
+
+
+def test_wrong_password(tmp_path, key):
+    filepath = write_container(tmp_path, key, b'secret')
+
+    with pytest.raises(ValueError):
+        read_encrypted(filepath, 'wrong')
+
+
+@pytest.mark.parametrize('offset', [HEADER_SIZE - 1, HEADER_SIZE, HEADER_SIZE + CHUNK + TAG_SIZE + 3, -1])
+def test_tampered_byte_is_rejected(tmp_path, key, offset):
+    filepath = write_container(tmp_path, key, os.urandom(3 * CHUNK))
+    with open(filepath, 'r+b') as file:
+        file.seek(offset, os.SEEK_SET if offset >= 0 else os.SEEK_END)
+        byte = file.read(1)
+        file.seek(-1, os.SEEK_CUR)
+        file.write(bytes([byte[0] ^ 1]))
+
+    with pytest.raises(InvalidTag):
+        b''.join(decrypt_stream(filepath, key))
+    with pytest.raises(ValueError):
+        read_encrypted(filepath, PASSWORD)
+
+
+def test_swapped_chunks_are_rejected(tmp_path, key):
+    filepath = write_container(tmp_path, key, os.urandom(3 * CHUNK))
+    with open(filepath, 'rb') as file:
+        data = file.read()
+    size = CHUNK + TAG_SIZE
+    first, second = data[HEADER_SIZE:HEADER_SIZE + size], data[HEADER_SIZE + size:HEADER_SIZE + 2 * size]
+    with open(filepath, 'wb') as file:
+        file.write(data[:HEADER_SIZE] + second + first + data[HEADER_SIZE + 2 * size:])
+
+    with pytest.raises(ValueError):
+        read_encrypted(filepath, PASSWORD)
+
+
+def test_dropping_the_last_chunk_is_detected(tmp_path, key):
+    # Whole chunks only, so what is left is a valid sequence missing its final chunk
+    filepath = write_container(tmp_path, key, os.urandom(3 * CHUNK))
+    with open(filepath, 'r+b') as file:
+        file.truncate(HEADER_SIZE + 2 * (CHUNK + TAG_SIZE))
+
+    with pytest.raises(InvalidTag):
+        b''.join(decrypt_stream(filepath, key))
+    with pytest.raises(ValueError):
+        read_encrypted(filepath, PASSWORD)
+
+
+def test_container_cut_after_its_header_is_rejected(tmp_path, key):
+    filepath = write_container(tmp_path, key, b'')
+    with open(filepath, 'r+b') as file:
+        file.truncate(HEADER_SIZE)
+
+    with pytest.raises(ValueError):
+        b''.join(decrypt_stream(filepath, key))
+    with pytest.raises(ValueError):
+        read_encrypted(filepath, PASSWORD)
+    with pytest.raises(ValueError):
+        read_encrypted(filepath, 'wrong')
+
+
+def test_legacy_fernet_file_is_migrated_on_read(tmp_path, key):
+    filepath = str(tmp_path / 'legacy.txt')
+    data = b'written by an older version\n' * 1000
+    with open(filepath, 'wb') as file:
+        file.write(SALT + Fernet(key).encrypt(data))
+
+    assert read_encrypted(filepath, PASSWORD)[0] == data
+
+    assert not is_legacy_file(filepath)
+    with open(filepath, 'rb') as file:
+        assert file.read(len(MAGIC)) == MAGIC
+    assert b''.join(decrypt_stream(filepath, key)) == data
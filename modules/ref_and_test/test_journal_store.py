@@ -0,0 +1,47 @@
+import pytest
+
+from modules.custom_modules.journal.journal_store import JournalStore, fts_query
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JournalStore(str(tmp_path / 'journals.db'))
+    yield store
+    store.close()
+
+
+def test_search_follows_edits_and_deletes(store):
+    first = store.add('first', 'Walked along the ridge at dawn', '2024-01-01T08:00:00')
+    store.add('second', 'Rain all day', '2024-01-02T08:00:00')
+
+    assert [row['name'] for row in store.search('ridge')] == ['first']
+    assert [row['name'] for row in store.search('rid*')] == ['first']
+
+    store.update(first, 'Stayed in')
+    assert store.search('ridge') == []
+
+    store.delete(first)
+    assert [row['name'] for row in store.search('rain')] == ['second']
+
+
+def test_search_within_dates(store):
+    store.add('old', 'survey notes', '2023-06-01T08:00:00')
+    store.add('new', 'survey notes', '2024-06-01T08:00:00')
+
+    assert [row['name'] for row in store.search('survey', start='2024-01-01')] == ['new']
+    assert [row['name'] for row in store.search('survey', end='2024-01-01')] == ['old']
+
+
+def test_tags_follow_the_body(store):
+    entry = store.add('trip', 'Camp #Hike #gear')
+
+    assert [row['name'] for row in store.tagged('hike', '#GEAR')] == ['trip']
+    store.update(entry, 'Camp #hike')
+    assert store.tagged('hike', 'gear') == []
+
+
+def test_query_punctuation_cannot_break_fts_syntax(store):
+    store.add('quote', 'She said "AND" (twice)')
+
+    assert fts_query('"AND" (twice') == '"""AND""" "(twice"'
+    assert [row['name'] for row in store.search('"AND" (twice')] == ['quote']
@@ -0,0 +1,44 @@
+from modules.picker import FuzzyIndex
+
+LABELS = ['Beta alpha', 'alpine', 'a-l-p-s', 'gamma', 'ALPHA']
+
+
+def test_contiguous_matches_rank_first_in_original_order():
+    index = FuzzyIndex(LABELS)
+
+    assert index.filter('') == [0, 1, 2, 3, 4]
+    assert index.filter('alp') == [0, 1, 4, 2]
+    assert index.filter('A L P H') == [0, 4]
+    assert index.filter('zzz') == []
+
+
+def test_longer_query_narrows_the_previous_matches():
+    index = FuzzyIndex(LABELS)
+    assert index.filter('al') == [0, 1, 4, 2]
+    # Only the previous matches are scanned again, so this key is never looked at
+    index.keys[3] = 'alpaca'
+
+    assert index.filter('alp') == [0, 1, 4, 2]
+    assert [query for query, _, _ in index._results] == ['', 'al', 'alp']
+
+
+def test_contiguous_match_can_become_loose():
+    index = FuzzyIndex(['xa-b', 'ab'])
+
+    assert index.filter('a') == [0, 1]
+    assert index.filter('ab') == [1, 0]
+
+
+def test_shorter_or_changed_query_is_recomputed():
+    index = FuzzyIndex(LABELS)
+
+    assert index.filter('alpx') == []
+    assert index.filter('al') == [0, 1, 4, 2]
+    assert [query for query, _, _ in index._results] == ['', 'al']
+
+    assert index.filter('gam') == [3]
+    assert [query for query, _, _ in index._results] == ['', 'gam']
+    # Backspace reuses the cached result
+    index.filter('gamm')
+    index.keys[0] = 'gamma ray'
+    assert index.filter('gam') == [3]
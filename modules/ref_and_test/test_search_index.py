@@ -0,0 +1,79 @@
+import os
+
+import pytest
+
+from modules.encryption import keyring, encrypt_data_to_file
+from modules.custom_modules.mission import search_index
+from modules.custom_modules.mission.catalog import sync_catalogs
+from modules.custom_modules.mission.search_index import MissionIndex
+from modules.custom_modules.mission.records import record_from_json, encode_record
+
+LOGS = {
+    'mission_log_2024-01-01_00-00-00.txt': {'mission_name': 'Ridge', 'objective': 'Survey the northern ridge at dawn'},
+    'mission_log_2024-01-02_00-00-00.txt': {'mission_name': 'Harbor', 'objective': 'Chart the harbor at dawn'},
+    'mission_log_2024-01-03_00-00-00.txt': {'mission_name': 'Ridgeline', 'objective': 'Resupply the camp'},
+}
+RIDGE, HARBOR, RIDGELINE = sorted(LOGS)
+
+
+@pytest.fixture
+def index(tmp_path):
+    directory = tmp_path / 'mission_logs'
+    directory.mkdir()
+    keyring.use_password('session password')
+    for name, data in LOGS.items():
+        encrypt_data_to_file(str(directory / name), encode_record(record_from_json(data)))
+    index = MissionIndex(str(directory) + '.index', str(directory))
+    sync_catalogs(index)
+    yield index
+    keyring.lock()
+
+
+def test_words_are_stored_only_as_keyed_hashes(index):
+    tokens = {token for entry in index.files.values() for token in entry['tokens']}
+
+    assert tokens and all(len(token) == 16 and int(token, 16) >= 0 for token in tokens)
+    assert not {'ridge', 'w:ridge', 'harbor'} & tokens
+    with open(index.path, 'rb') as file:
+        assert b'harbor' not in file.read().lower()
+
+    # Another index key gives unrelated tokens for the same word
+    other = MissionIndex(index.path + '.other', index.directory)
+    other._loaded({})
+    assert other._token('w', 'harbor') != index._token('w', 'harbor')
+
+
+def test_search_is_case_insensitive_and_needs_every_word(index):
+    assert index.search('DAWN') == [RIDGE, HARBOR]
+    assert index.search('dawn ridge') == [RIDGE]
+    assert index.search('dawn camp') == []
+    assert index.search('') == []
+
+
+def test_trailing_star_matches_a_prefix(index):
+    assert index.search('ridge') == [RIDGE]
+    assert index.search('ridge*') == [RIDGE, RIDGELINE]
+    assert index.search('ri* dawn') == [RIDGE]
+    # Prefixes shorter than MIN_PREFIX are not indexed and are ignored
+    assert index.search('r* harbor') == [HARBOR]
+
+
+def test_deleted_log_leaves_the_results(index):
+    os.remove(os.path.join(index.directory, RIDGE))
+    os.utime(index.directory)  # A new directory mtime, even within the same clock tick
+    sync_catalogs(index)
+
+    assert index.search('dawn') == [HARBOR]
+    assert index.search('ridge*') == [RIDGELINE]
+    assert not any(RIDGE in names for names in index.postings.values())
+
+
+def test_token_cache_is_bounded(index, monkeypatch):
+    monkeypatch.setattr(search_index, 'TOKEN_CACHE_SIZE', 4)
+    index.token_cache.clear()
+
+    for word in ['one', 'two', 'three', 'four', 'five']:
+        index._token('w', word)
+
+    assert len(index.token_cache) <= 4
+    assert index.search('harbor') == [HARBOR]
@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+from modules.custom_modules.journal.tag_index import TagIndex, parse_tags
+
+
+@pytest.fixture
+def journals(tmp_path):
+    directory = tmp_path / 'journals'
+    directory.mkdir()
+    (directory / 'hike.txt').write_text('Camp #Hike #gear, not a#b or ##\n')
+    (directory / 'run.txt').write_text('Ten km #health #hike\n')
+    return directory
+
+
+def make_index(directory):
+    return TagIndex(str(directory) + '.tags.json', str(directory))
+
+
+def test_parse_tags():
+    assert parse_tags('#Health #2024 #side-project a#b ##x #health') == ['2024', 'health', 'side-project']
+
+
+def test_tag_removed_from_a_journal(journals):
+    index = make_index(journals)
+    assert index.tagged('hike', '#GEAR') == ['hike.txt']
+
+    (journals / 'hike.txt').write_text('Camp #hike, new entry\n')
+    index.update_file(str(journals / 'hike.txt'))
+
+    assert index.tagged('gear') == []
+    assert 'gear' not in index.counts()
+    assert index.tagged('hike') == ['hike.txt', 'run.txt']
+
+
+def test_deleted_journal_leaves_the_index(journals):
+    index = make_index(journals)
+    index.load()
+
+    os.remove(journals / 'run.txt')
+    index.update_file(str(journals / 'run.txt'))
+    assert index.counts() == {'gear': 1, 'hike': 1}
+
+    # Deleted behind the index's back: a sync notices
+    os.remove(journals / 'hike.txt')
+    reopened = make_index(journals)
+    reopened.load()
+    reopened.sync()
+    assert reopened.counts() == {}
+    assert reopened.entries == {}
+
+
+def test_swap_and_temp_files_are_skipped(journals):
+    (journals / '.hike.txt.swp').write_bytes(b'#swap')
+    (journals / '.hike.txt.abc123.tmp').write_text('#tmp')
+    (journals / 'hike.txt.abc123.tmp').write_text('#tmp')
+
+    index = make_index(journals)
+    index.load()
+
+    assert set(index.entries) == {'hike.txt', 'run.txt'}
+    assert index.tagged('swap') == index.tagged('tmp') == []
+
@@ -32,6 +32,10 @@ def display_help():
             [bold]l[/bold]      - Move cursor right
             [bold]k[/bold]      - Move cursor up
             [bold]j[/bold]      - Move cursor down
+            [bold]/[/bold]      - Search forward (regex, highlighted as you type)
+            [bold]?[/bold]      - Search backward
+            [bold]n[/bold]      - Jump to the next match
+            [bold]N[/bold]      - Jump to the previous match
             [bold]Ctrl+S[/bold] - Save the document
             [bold]Ctrl+Q[/bold] - Quit the editor
         """
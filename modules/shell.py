@@ -0,0 +1,229 @@
+import logging
+import importlib
+
+from prompt_toolkit.application import Application
+from prompt_toolkit.key_binding import KeyBindings
+from prompt_toolkit.layout import Layout, HSplit, Window, DynamicContainer
+from prompt_toolkit.layout.controls import FormattedTextControl
+from prompt_toolkit.styles import Style
+
+from .ui import clear_screen, take_last_message
+
+# Item targets besides menu ids and actions
+BACK = '<back>'
+EXIT = '<exit>'
+
+# Colours of the questionary palette the menus used before the shell
+STYLE = Style.from_dict({
+    'title': 'fg:#2196F3 bold',
+    'breadcrumb': 'fg:#673AB7 bold',
+    'pointer': 'fg:#03A9F4 bold',
+    'text': 'fg:#FFFFFF',
+    'disabled': 'fg:#757575 italic',
+    'instruction': 'fg:#9E9E9E',
+    'status': 'fg:#4CAF50 bold',
+    'error': 'fg:#E91E63 bold',
+})
+HELP = "↑↓ move  Enter open  Esc back  q quit"
+# Redraws between flushes of the screen content caches
+CACHE_TRIM_INTERVAL = 100
+
+
+class ReturnToMainMenu(Exception):
+    """Raised by an action to leave its menu for the main menu."""
+
+
+class Menu:
+    """
+    One screen of the shell: a title and (label, target) items. A target is
+    a menu id, an action (a function, or "package.module:function" imported
+    when it is picked), BACK, EXIT, or None for features not built yet.
+    """
+
+    def __init__(self, title, items):
+        self.title = title
+        self.items = items
+
+
+def resolve(reference):
+    """Import "package.module:name" and return the named attribute."""
+    module, _, name = reference.partition(':')
+    return getattr(importlib.import_module(module), name)
+
+
+class _View:
+    """The cached screen of one menu, remembering its highlighted item."""
+
+    def __init__(self, shell, menu):
+        self.menu = menu
+        self.selected = 0
+        self.build(shell)
+
+    def build(self, shell):
+        """(Re)create the controls, dropping everything they cached."""
+        self.controls = [
+            FormattedTextControl(shell._header),
+            FormattedTextControl(self._rows),
+            FormattedTextControl(shell._footer),
+        ]
+        self.container = HSplit([
+            Window(self.controls[0], height=2),
+            Window(self.controls[1]),
+            # Grows to fit multi-line messages such as search results
+            Window(self.controls[2], dont_extend_height=True, wrap_lines=True),
+        ])
+
+    def _rows(self):
+        rows = []
+        for position, (label, target) in enumerate(self.menu.items):
+            if position == self.selected:
+                rows.append(('class:pointer', f' » {label}\n'))
+            else:
+                rows.append(('class:disabled' if target is None else 'class:text', f'   {label}\n'))
+        return rows
+
+
+class Shell:
+    """
+    The app's single full-screen menu application.
+
+    `menus` maps menu ids to Menu objects or "package.module:NAME" references,
+    imported the first time the menu is opened. Moving between menus only
+    swaps the cached view inside the running application; the navigation
+    path is a stack, so nothing recurses however long the session runs. The
+    application exits only to run an action on the normal screen, and is
+    started again when the action returns.
+    """
+
+    def __init__(self, menus, root='main', input=None, output=None):
+        self.menus = menus
+        self.stack = [root]
+        self.views = {}
+        self.status = None
+        self.renders = 0
+        self.app = Application(
+            layout=Layout(DynamicContainer(lambda: self._view().container)),
+            key_bindings=self._bindings(),
+            style=STYLE,
+            full_screen=True,
+            input=input,
+            output=output,
+        )
+        self.app.after_render += self._trim_caches
+
+    def _trim_caches(self, _app):
+        # Content that did not change is reused across redraws, and
+        # prompt_toolkit keeps per-redraw line heights on it, so a long
+        # session would grow without this. Fresh controls start with empty
+        # caches; the layout picks up the new containers on the next redraw.
+        self.renders += 1
+        if self.renders % CACHE_TRIM_INTERVAL == 0:
+            for view in self.views.values():
+                view.build(self)
+
+    def _view(self, menu_id=None):
+        menu_id = menu_id or self.stack[-1]
+        if menu_id not in self.views:
+            menu = self.menus[menu_id]
+            self.views[menu_id] = _View(self, resolve(menu) if isinstance(menu, str) else menu)
+        return self.views[menu_id]
+
+    def _header(self):
+        path = ' › '.join(self._view(menu_id).menu.title for menu_id in self.stack)
+        return [('class:title', ' All CLI\n'), ('class:breadcrumb', f' {path}')]
+
+    def _footer(self):
+        text, style = self.status or ('', 'status')
+        return [(f'class:{style}', f' {text}\n'), ('class:instruction', f' {HELP}')]
+
+    def open(self, menu_id):
+        """Show menu `menu_id`; a menu already on the path is returned to, not stacked again."""
+        if menu_id in self.stack:
+            del self.stack[self.stack.index(menu_id) + 1:]
+        else:
+            self.stack.append(menu_id)
+
+    def back(self):
+        if len(self.stack) > 1:
+            self.stack.pop()
+
+    def _activate(self, position):
+        view = self._view()
+        if not 0 <= position < len(view.menu.items):
+            return
+        view.selected = position
+        target = view.menu.items[position][1]
+        self.status = None
+        if target is None:
+            self.status = ("Not available yet.", 'status')
+        elif target == BACK:
+            self.back()
+        elif target == EXIT:
+            self.app.exit(result=EXIT)
+        elif callable(target) or ':' in target:
+            self.app.exit(result=target)
+        else:
+            self.open(target)
+
+    def _bindings(self):
+        bindings = KeyBindings()
+
+        @bindings.add('up')
+        @bindings.add('k')
+        def _(event):
+            view = self._view()
+            view.selected = (view.selected - 1) % len(view.menu.items)
+
+        @bindings.add('down')
+        @bindings.add('j')
+        def _(event):
+            view = self._view()
+            view.selected = (view.selected + 1) % len(view.menu.items)
+
+        @bindings.add('enter')
+        @bindings.add('right')
+        def _(event):
+            self._activate(self._view().selected)
+
+        for digit in '123456789':
+            @bindings.add(digit)
+            def _(event):
+                self._activate(int(event.data) - 1)
+
+        @bindings.add('escape', eager=True)
+        @bindings.add('left')
+        @bindings.add('backspace')
+        def _(event):
+            self.status = None
+            self.back()
+
+        @bindings.add('q')
+        @bindings.add('c-c')
+        def _(event):
+            event.app.exit(result=EXIT)
+
+        return bindings
+
+    def run_action(self, action):
+        """Run a menu action on the normal screen and keep its last message for the status line."""
+        clear_screen()
+        try:
+            (resolve(action) if isinstance(action, str) else action)()
+        except ReturnToMainMenu:
+            del self.stack[1:]
+        except KeyboardInterrupt:
+            self.status = ("Cancelled.", 'status')
+        except Exception as e:
+            logging.error(f"An unexpected error occurred in '{action}': {e}", exc_info=True)
+            self.status = (f"ERROR: {e}", 'error')
+        message = take_last_message()
+        if message:
+            self.status = message
+
+    def run(self):
+        """Run the shell until the user quits."""
+        while True:
+            result = self.app.run()
+            if result in (None, EXIT):
+                return
+            self.run_action(result)
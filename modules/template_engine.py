@@ -0,0 +1,57 @@
+import os
+import logging
+
+from configs import config
+
+TEMPLATE_DIRECTORY = config.TEMPLATE_DIRECTORY
+TEMPLATE_BYTECODE_CACHE_DIRECTORY = config.TEMPLATE_BYTECODE_CACHE_DIRECTORY
+
+_environment = None
+
+def get_environment():
+    """
+    Return the shared Jinja environment.
+
+    Compiled templates are cached in memory and recompiled only when the
+    template file's mtime changes (`auto_reload`); with a bytecode cache
+    directory configured, the compiled code also survives restarts.
+    """
+    global _environment
+    if _environment is None:
+        # Imported here: jinja2 is only needed once something is rendered
+        from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
+        bytecode_cache = None
+        if TEMPLATE_BYTECODE_CACHE_DIRECTORY:
+            try:
+                os.makedirs(TEMPLATE_BYTECODE_CACHE_DIRECTORY, exist_ok=True)
+                bytecode_cache = FileSystemBytecodeCache(TEMPLATE_BYTECODE_CACHE_DIRECTORY)
+            except OSError as e:
+                logging.error(f"Template bytecode cache disabled: {e}")
+        _environment = Environment(
+            loader=FileSystemLoader(TEMPLATE_DIRECTORY),
+            auto_reload=True,
+            bytecode_cache=bytecode_cache,
+        )
+    return _environment
+
+def template_name(path):
+    """Turn a template path from the config into a loader name."""
+    return os.path.relpath(path, TEMPLATE_DIRECTORY).replace(os.sep, '/')
+
+def get_template(path):
+    """Return the compiled template for `path` (a path under TEMPLATE_DIRECTORY)."""
+    return get_environment().get_template(template_name(path))
+
+def render_template(path, data):
+    """Render one template with `data`."""
+    return get_template(path).render(data)
+
+def render_many(path, records):
+    """
+    Render every record in the iterable `records` through one compiled
+    template, yielding the texts one by one so large batches are never held
+    in memory together.
+    """
+    template = get_template(path)
+    for record in records:
+        yield template.render(record)
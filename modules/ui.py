@@ -2,13 +2,20 @@ from rich.console import Console
 from rich.panel import Panel
 from rich.text import Text
 import time
-import os
 
 console = Console()
+# (message, style) of the last panel or error shown, for the shell's status line
+_last_message = None
 
 def clear_screen():
-    """Clear the terminal screen."""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    """Clear the terminal screen (an escape sequence, no `clear` subprocess)."""
+    console.clear()
+
+def take_last_message():
+    """Return and forget the last message shown by display_panel or display_error_message."""
+    global _last_message
+    message, _last_message = _last_message, None
+    return message
 
 def display_welcome_message():
     """Display the welcome message."""
@@ -17,8 +24,10 @@ def display_welcome_message():
 
 def display_panel(message, title=None, style="bold green"):
     """Display a panel with a custom message."""
+    global _last_message
     clear_screen()
     console.print(Panel(message, title=title, style=style))
+    _last_message = (f"{title}: {message}" if title else message, 'status')
 
 def display_exit_message():
     """Display exit message."""
@@ -45,5 +54,6 @@ def display_journal_saved_message(filename):
 
 def display_error_message(error):
     """Display an error message."""
+    global _last_message
     console.print(Panel(f"ERROR: {error}", style="bold red"))
-    time.sleep(1.3)
+    _last_message = (f"ERROR: {error}", 'error')